@@ -1,55 +1,145 @@
 """The schluter integration."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
 import logging
-from typing import Any
-
-from aiohttp.client_exceptions import ClientConnectorError
-from .api import (
-    ApiError,
-    InvalidSessionIdError,
-    InvalidUserPasswordError,
-    SchluterApi,
-)
-import async_timeout
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.core_config import Config
-from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.exceptions import ConfigEntryNotReady
+
+from .const import (
+    API_MAX_CONNECTIONS,
+    CONF_ALIGNED_REFRESH,
+    CONF_DEDICATED_SESSION,
+    CONF_ENERGY_INTERVAL,
+    CONF_HISTORY_DAYS,
+    CONF_MAX_CONCURRENCY,
+    CONF_OFFLINE_ESTIMATION,
+    CONF_REFRESH_SCOPES,
+    CONF_SHARDS,
+    CONF_TARIFF,
+    CONF_TIMEOUT,
+    CONF_UPDATE_INTERVAL,
+    DATA_ORCHESTRATOR,
+    DEFAULT_HISTORY_DAYS,
+    DOMAIN,
+    FLEET_SHARD_SIZE,
+    MAX_SHARDS,
+)
+from .services import async_setup_services
+
+if TYPE_CHECKING:
+    from homeassistant.core_config import Config
 
-from .const import DOMAIN
+    from .api import SchluterApi
+    from .coordinator import (
+        RefreshScope,
+        RefreshSettings,
+        SchluterDataUpdateCoordinator,
+    )
+    from .cost import Tariff
+    from .fleet import SchluterFleet
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.CLIMATE, Platform.SENSOR]
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.CLIMATE, Platform.SENSOR]
+
+# Options applied to the running coordinator instead of reloading the entry
+LIVE_OPTIONS = {
+    CONF_ENERGY_INTERVAL,
+    CONF_HISTORY_DAYS,
+    CONF_MAX_CONCURRENCY,
+    CONF_OFFLINE_ESTIMATION,
+    CONF_REFRESH_SCOPES,
+    CONF_TARIFF,
+    CONF_TIMEOUT,
+    CONF_UPDATE_INTERVAL,
+}
 
 
 async def async_setup(hass: HomeAssistant, config: Config):
     """Set up this integration using YAML is not supported."""
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up schluter from a config entry."""
+    # pylint: disable=import-outside-toplevel
+    # The API client and coordinator are only needed once an entry is set up,
+    # keep them out of the import of the integration.
+    from .account import async_acquire_account, async_release_account
+    from .fleet import SchluterFleet, setpoints_storage_key
+    from .orchestrator import async_get_orchestrator
 
     username: str = entry.data[CONF_USERNAME]
     password: str = entry.data[CONF_PASSWORD]
 
     _LOGGER.debug("Using username %s to connect to Schluter Api", username)
 
-    websession = async_get_clientsession(hass)
-    api = SchluterApi(websession)
-
-    coordinator = SchluterDataUpdateCoordinator(hass, api, username, password)
-    await coordinator.async_config_entry_first_refresh()
-
-    schluter_data = SchluterData(api, coordinator)
+    account = async_acquire_account(hass, username, password)
+    account.async_use_dedicated_session(
+        entry.options.get(CONF_DEDICATED_SESSION, False)
+    )
+    account.api.set_max_concurrency(
+        entry.options.get(CONF_MAX_CONCURRENCY, API_MAX_CONNECTIONS)
+    )
+    shard_count: int = entry.options.get(CONF_SHARDS, 1)
+    history_days: int = entry.options.get(CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS)
+    try:
+        if account.fleet is not None and account.fleet.shard_count != shard_count:
+            await account.fleet.async_shutdown()
+            account.fleet = None
+        if account.fleet is None:
+            account.fleet = SchluterFleet(
+                hass,
+                account,
+                _refresh_scopes(entry),
+                shard_count,
+                _tariff(entry),
+                history_days,
+                _refresh_settings(entry),
+                setpoints_storage_key(entry.entry_id),
+            )
+            await account.fleet.async_config_entry_first_refresh()
+        else:
+            account.fleet.async_set_refresh_scopes(_refresh_scopes(entry))
+            account.fleet.async_set_tariff(_tariff(entry))
+            account.fleet.async_set_history_days(history_days)
+            account.fleet.async_set_refresh_settings(_refresh_settings(entry))
+        if not account.fleet.last_update_success:
+            # The coordinators belong to the entry that created them, so their
+            # first refresh helper cannot be used for this entry.
+            await account.fleet.async_refresh()
+            if not account.fleet.last_update_success:
+                raise ConfigEntryNotReady(account.fleet.last_exception)
+    except BaseException:
+        async_release_account(account)
+        raise
+    entry.async_on_unload(lambda: async_release_account(account))
+
+    # Sharded accounts keep spreading their refreshes over the interval
+    if entry.options.get(CONF_ALIGNED_REFRESH, False) and shard_count == 1:
+        orchestrator = async_get_orchestrator(hass)
+        fleet = account.fleet
+        orchestrator.async_add(fleet)
+        entry.async_on_unload(lambda: orchestrator.async_remove(fleet))
+
+    thermostat_count = sum(
+        len(coordinator.data) for coordinator in account.fleet.coordinators
+    )
+    if thermostat_count > FLEET_SHARD_SIZE * shard_count:
+        _LOGGER.info(
+            "%s thermostats in %s shards, consider %s shards in the options",
+            thermostat_count,
+            shard_count,
+            min(MAX_SHARDS, -(-thermostat_count // FLEET_SHARD_SIZE)),
+        )
+
+    schluter_data = SchluterData(account.api, account.fleet, dict(entry.options))
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = schluter_data
 
@@ -69,66 +159,71 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored scheduled setpoints of a removed entry."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.helpers.storage import Store
+
+    from .fleet import SETPOINTS_STORAGE_VERSION, setpoints_storage_key
+
+    await Store(
+        hass, SETPOINTS_STORAGE_VERSION, setpoints_storage_key(entry.entry_id)
+    ).async_remove()
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Update listener."""
     _LOGGER.debug("Update Listener for entry %s", entry.entry_id)
+    data: SchluterData = hass.data[DOMAIN][entry.entry_id]
+    changed = {
+        key
+        for key in data.options.keys() | entry.options.keys()
+        if data.options.get(key) != entry.options.get(key)
+    }
+    data.options = dict(entry.options)
+    if changed and changed <= LIVE_OPTIONS:
+        # Options the running coordinator can take over without a reload
+        data.fleet.async_set_refresh_scopes(_refresh_scopes(entry))
+        data.fleet.async_set_tariff(_tariff(entry))
+        data.fleet.async_set_history_days(
+            entry.options.get(CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS)
+        )
+        data.fleet.async_set_refresh_settings(_refresh_settings(entry))
+        data.api.set_max_concurrency(
+            entry.options.get(CONF_MAX_CONCURRENCY, API_MAX_CONNECTIONS)
+        )
+        if (orchestrator := hass.data[DOMAIN].get(DATA_ORCHESTRATOR)) is not None:
+            # The interval of the aligned refreshes may have changed
+            orchestrator.async_reschedule()
+        return
     await hass.config_entries.async_reload(entry.entry_id)
 
 
-class SchluterDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Class to manage fetching Schluter temperature data from API."""
-
-    def __init__(
-        self,
-        hass: HomeAssistant,
-        api: SchluterApi,
-        username: str,
-        password: str,
-    ) -> None:
-        """Initialize."""
-        self._username = username
-        self._password = password
-        self._api = api
-        self._sessionid = None
-        self._counter = 0
-
-        update_interval = timedelta(minutes=1)
-        _LOGGER.debug("Data will be update every %s", update_interval)
-
-        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=update_interval)
-
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Update data via schluter library."""
-        try:
-            async with async_timeout.timeout(10):
-                if self._sessionid is None:
-                    _LOGGER.info("No Schluter Sessionid found, authenticating")
-                    self._sessionid = await self._api.async_get_sessionid(
-                        self._username, self._password
-                    )
-                # add 1 day to the session timestamp to be able to check against
-                # the current time. if the time is expired renew the sessionid.
-                # This workaround mediates the missing long lived tokens on
-                # this Schluter API side.
-                expiration_timestamp = self._api.sessionid_timestamp + timedelta(
-                    days=+1
-                )
-                _LOGGER.debug(
-                    "Sessionid expiration timestamp is: %s",
-                    expiration_timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                )
-                if expiration_timestamp <= datetime.now():
-                    _LOGGER.info("Schluter Sessionid is expired, authenticating again")
-                    self._sessionid = await self._api.async_get_sessionid(
-                        self._username, self._password
-                    )
-                return await self._api.async_get_current_thermostats(self._sessionid)
-        except InvalidSessionIdError as err:
-            raise ConfigEntryAuthFailed from err
-        except InvalidUserPasswordError as err:
-            raise ConfigEntryAuthFailed from err
-        except (ApiError, ClientConnectorError) as err:
-            raise UpdateFailed(err) from err
+def _refresh_scopes(entry: ConfigEntry) -> list[RefreshScope]:
+    """Refresh scopes configured for the entry."""
+    # pylint: disable=import-outside-toplevel
+    from .coordinator import RefreshScope
+
+    return [
+        RefreshScope.from_dict(scope)
+        for scope in entry.options.get(CONF_REFRESH_SCOPES, [])
+    ]
+
+
+def _refresh_settings(entry: ConfigEntry) -> RefreshSettings:
+    """Intervals and timeout configured for the entry."""
+    # pylint: disable=import-outside-toplevel
+    from .coordinator import RefreshSettings
+
+    return RefreshSettings.from_options(entry.options)
+
+
+def _tariff(entry: ConfigEntry) -> Tariff:
+    """Tariff configured for the entry, validated by the options flow."""
+    # pylint: disable=import-outside-toplevel
+    from .cost import Tariff
+
+    return Tariff.parse(entry.options.get(CONF_TARIFF))
 
 
 @dataclass
@@ -136,4 +231,10 @@ class SchluterData:
     """Data for the schluter integration."""
 
     api: SchluterApi
-    coordinator: SchluterDataUpdateCoordinator
+    fleet: SchluterFleet
+    options: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def coordinators(self) -> list[SchluterDataUpdateCoordinator]:
+        """Coordinators of the account, one per shard."""
+        return self.fleet.coordinators
@@ -0,0 +1,195 @@
+"""Per-account sharing of the Schluter API session and coordinators."""
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from aiohttp import ClientSession, TCPConnector
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util.ssl import get_default_context
+
+from .api import ConnectionStats, SchluterApi
+from .const import (
+    ACCOUNT_RELEASE_DELAY,
+    API_DNS_CACHE_TTL,
+    API_KEEPALIVE_TIMEOUT,
+    DATA_ACCOUNTS,
+    DOMAIN,
+    MAX_MAX_CONCURRENCY,
+)
+
+if TYPE_CHECKING:
+    from .fleet import SchluterFleet
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SchluterAccount:
+    """An authenticated Schluter account shared by its users in HA.
+
+    Config entries acquire the account for the time they need it. Once
+    nobody holds it anymore it is kept for a short grace period, so a reload
+    can reuse the session instead of logging in again. Config flows log in
+    on their own and only hand a validated password to the account.
+    """
+
+    def __init__(self, hass: HomeAssistant, username: str, password: str) -> None:
+        """Initialize the account."""
+        self.hass = hass
+        self.username = username
+        self.password = password
+        self.api = SchluterApi(async_get_clientsession(hass))
+        self.fleet: SchluterFleet | None = None
+        self._refs = 0
+        self._cancel_drop: CALLBACK_TYPE | None = None
+        self._dedicated_session: ClientSession | None = None
+        self._cancel_close_listener: CALLBACK_TYPE | None = None
+
+    @property
+    def refs(self) -> int:
+        """Number of holders of the account."""
+        return self._refs
+
+    async def async_ensure_sessionid(self) -> str | None:
+        """Return a valid sessionid for the account."""
+        return await self.api.async_ensure_sessionid(self.username, self.password)
+
+    @callback
+    def async_use_dedicated_session(self, enabled: bool) -> None:
+        """Switch between a dedicated client session and the one of HA.
+
+        The dedicated session has its own connection pool for the Schluter
+        host, so the polls do not compete with other integrations for the
+        connections of the shared session.
+        """
+        if enabled == (self._dedicated_session is not None):
+            return
+        if not enabled:
+            self.api.set_session(async_get_clientsession(self.hass))
+            self._async_close_dedicated_session()
+            return
+
+        _LOGGER.debug("Using a dedicated client session for %s", self.username)
+        connection_stats = ConnectionStats()
+        # The API client keeps fewer requests in flight, so the pool only
+        # opens as many connections as the max concurrency of the options
+        connector = TCPConnector(
+            limit=MAX_MAX_CONCURRENCY,
+            limit_per_host=MAX_MAX_CONCURRENCY,
+            ttl_dns_cache=API_DNS_CACHE_TTL,
+            keepalive_timeout=API_KEEPALIVE_TIMEOUT,
+            ssl=get_default_context(),
+        )
+        self._dedicated_session = ClientSession(
+            connector=connector,
+            headers={"Accept-Encoding": "gzip"},
+            trace_configs=[connection_stats.trace_config()],
+        )
+        self._cancel_close_listener = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, self._async_handle_close
+        )
+        self.api.set_session(self._dedicated_session, connection_stats)
+
+    @callback
+    def _async_handle_close(self, _event: Event) -> None:
+        """Close the dedicated session when HA stops."""
+        self._cancel_close_listener = None
+        self._async_close_dedicated_session()
+
+    @callback
+    def _async_close_dedicated_session(self) -> None:
+        """Close the dedicated session, if there is one."""
+        if self._cancel_close_listener is not None:
+            self._cancel_close_listener()
+            self._cancel_close_listener = None
+        if (session := self._dedicated_session) is not None:
+            self._dedicated_session = None
+            self.hass.async_create_task(session.close())
+
+    @callback
+    def async_set_password(self, password: str) -> None:
+        """Take over a password validated by a config flow."""
+        if self.password != password:
+            self.password = password
+            self.api.invalidate_sessionid()
+
+    @callback
+    def async_hold(self, password: str) -> None:
+        """Add a holder, taking over a password changed through reauth."""
+        self.async_set_password(password)
+        if self._cancel_drop is not None:
+            self._cancel_drop()
+            self._cancel_drop = None
+        self._refs += 1
+
+    @callback
+    def async_unhold(self) -> None:
+        """Remove a holder and drop the account after a grace period."""
+        self._refs -= 1
+        if self._refs <= 0:
+            self._cancel_drop = async_call_later(
+                self.hass, ACCOUNT_RELEASE_DELAY, self._async_drop
+            )
+
+    @callback
+    def _async_drop(self, _now) -> None:
+        """Remove the account from the registry if it is still unused."""
+        self._cancel_drop = None
+        if self._refs > 0:
+            return
+        _LOGGER.debug("Dropping shared Schluter account for %s", self.username)
+        accounts = self.hass.data.get(DOMAIN, {}).get(DATA_ACCOUNTS, {})
+        if accounts.get(account_key(self.username)) is self:
+            accounts.pop(account_key(self.username))
+        if self.fleet is not None:
+            self.hass.async_create_task(self.fleet.async_shutdown())
+            self.fleet = None
+        self._async_close_dedicated_session()
+
+
+def account_key(username: str) -> str:
+    """Email addresses are not case sensitive."""
+    return username.lower()
+
+
+@callback
+def async_acquire_account(
+    hass: HomeAssistant, username: str, password: str
+) -> SchluterAccount:
+    """Get the shared account for username, creating it if needed."""
+    accounts: dict[str, SchluterAccount] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(DATA_ACCOUNTS, {})
+    key = account_key(username)
+    if (account := accounts.get(key)) is None:
+        _LOGGER.debug("Creating shared Schluter account for %s", username)
+        account = accounts[key] = SchluterAccount(hass, username, password)
+    account.async_hold(password)
+    return account
+
+
+@callback
+def async_release_account(account: SchluterAccount) -> None:
+    """Release a hold on a shared account."""
+    account.async_unhold()
+
+
+async def async_validate_credentials(
+    hass: HomeAssistant, username: str, password: str
+) -> None:
+    """Log in to the account, raising the error of the API on failure.
+
+    The login uses an API client of its own, a wrong password must not
+    touch the session of a running entry. A shared account of the username
+    only takes over the password once it logged in.
+    """
+    await SchluterApi(async_get_clientsession(hass)).async_get_sessionid(
+        username, password
+    )
+    accounts = hass.data.get(DOMAIN, {}).get(DATA_ACCOUNTS, {})
+    if (account := accounts.get(account_key(username))) is not None:
+        account.async_set_password(password)
@@ -0,0 +1,148 @@
+"""Totals over the thermostats of a group or of a whole account."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .thermostat import Thermostat
+
+if TYPE_CHECKING:
+    from .coordinator import SchluterDataUpdateCoordinator
+
+# Days of the energy and cost totals: today, last 7 days and last 30 days
+TOTAL_DAYS = (1, 7, 30)
+
+
+@dataclass(slots=True)
+class ThermostatTotals:
+    """Totals over a set of thermostats."""
+
+    # Live values are summed up over the thermostats that are online
+    online: int = 0
+    heating: int = 0
+    power: float = 0.0
+    temperature_sum: float = 0.0
+    # Totals over TOTAL_DAYS, counting the thermostats with a history only
+    energy: list[float] = field(default_factory=lambda: [0.0] * len(TOTAL_DAYS))
+    cost: list[float] = field(default_factory=lambda: [0.0] * len(TOTAL_DAYS))
+    has_energy: bool = False
+    has_cost: bool = False
+
+    @property
+    def average_temperature(self) -> float | None:
+        """Average temperature of the thermostats."""
+        if not self.online:
+            return None
+        return self.temperature_sum / self.online
+
+    def add(self, thermostat: Thermostat) -> None:
+        """Add a thermostat to the totals."""
+        if thermostat.is_online:
+            self.online += 1
+            self.heating += thermostat.is_heating
+            self.power += thermostat.power
+            self.temperature_sum += thermostat.measured_temperature
+        if (usages := thermostat.day_energy_usages) is not None:
+            self.has_energy = True
+            _add_running_sums(
+                self.energy, [usage.total_kwh for usage in usages[: TOTAL_DAYS[-1]]]
+            )
+        if (costs := thermostat.day_energy_costs) is not None:
+            self.has_cost = True
+            _add_running_sums(self.cost, costs[: TOTAL_DAYS[-1]])
+
+
+def _add_running_sums(totals: list[float], daily: list[float]) -> None:
+    """Add the sums over TOTAL_DAYS of daily values, newest first, to totals."""
+    running = 0.0
+    start = 0
+    for index, days in enumerate(TOTAL_DAYS):
+        running += sum(daily[start:days])
+        totals[index] += running
+        start = days
+
+
+def summarize(
+    thermostats: Iterable[Thermostat],
+) -> tuple[ThermostatTotals, dict[int, ThermostatTotals]]:
+    """Return the totals of the account and of every group in one pass."""
+    account = ThermostatTotals()
+    groups: dict[int, ThermostatTotals] = {}
+    for thermostat in thermostats:
+        account.add(thermostat)
+        if (group := groups.get(thermostat.group_id)) is None:
+            group = groups[thermostat.group_id] = ThermostatTotals()
+        group.add(thermostat)
+    return account, groups
+
+
+class SchluterAggregator:
+    """Totals of the thermostats of an entry, computed once per update.
+
+    The totals are computed again whenever one of the coordinators of the
+    entry updates, and handed to every aggregate entity, instead of every
+    entity summing up the thermostats on its own.
+    """
+
+    def __init__(self, coordinators: list[SchluterDataUpdateCoordinator]) -> None:
+        """Initialize the aggregator from the coordinators of the entry."""
+        self._coordinators = coordinators
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsubscribe: list[CALLBACK_TYPE] = []
+        self.account = ThermostatTotals()
+        self.groups: dict[int, ThermostatTotals] = {}
+        self._summarize()
+
+    @property
+    def available(self) -> bool:
+        """Return True if every coordinator is up to date."""
+        return all(
+            coordinator.last_update_success for coordinator in self._coordinators
+        )
+
+    @property
+    def midnight(self) -> datetime:
+        """Start of the current day in the time zone of Home Assistant."""
+        return self._coordinators[0].day_boundaries.midnight(None)
+
+    def _summarize(self) -> None:
+        """Compute the totals from the latest thermostats.
+
+        Offline thermostats that are estimated count as last seen online.
+        """
+        self.account, self.groups = summarize(
+            coordinator.thermostat(serial_number)
+            for coordinator in self._coordinators
+            for serial_number in coordinator.data or {}
+        )
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Call update_callback with every new total."""
+        if not self._listeners:
+            self._unsubscribe = [
+                coordinator.async_add_listener(self._handle_coordinator_update)
+                for coordinator in self._coordinators
+            ]
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+            if not self._listeners:
+                for unsubscribe in self._unsubscribe:
+                    unsubscribe()
+                self._unsubscribe = []
+
+        return remove_listener
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Compute the totals again and push them to the entities."""
+        self._summarize()
+        for update_callback in list(self._listeners):
+            update_callback()
@@ -0,0 +1,186 @@
+"""Streaming detection of failing heating floors."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+import math
+
+# A floor heating this long without warming up this much has a failed mat
+NO_RISE_DURATION = timedelta(hours=3)
+NO_RISE_MIN_RISE = 0.3
+
+# Polls further apart than this end a heating run
+MAX_SAMPLE_GAP = timedelta(minutes=15)
+
+# The measured load is compared between a slow baseline, averaging about the
+# last 100 heating polls, and a fast average of about the last 5 of them.
+LOAD_BASELINE_ALPHA = 0.01
+LOAD_RECENT_ALPHA = 0.2
+LOAD_MIN_SAMPLES = 60
+LOAD_DRIFT_RATIO = 0.15
+
+# The energy of today is compared to the days of the last 30 days
+ENERGY_BASELINE_DAYS = 30
+ENERGY_MIN_DAYS = 7
+ENERGY_SIGMAS = 3
+ENERGY_MIN_RATIO = 1.5
+
+
+class RollingStats:
+    """Mean and standard deviation of the last values, O(1) per value."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty window of size values."""
+        self._values: deque[float] = deque(maxlen=size)
+        self._sum = 0.0
+        self._sum_of_squares = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of values in the window."""
+        return len(self._values)
+
+    @property
+    def mean(self) -> float:
+        """Mean of the values in the window."""
+        return self._sum / len(self._values) if self._values else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """Population standard deviation of the values in the window."""
+        if not self._values:
+            return 0.0
+        mean = self.mean
+        return math.sqrt(max(self._sum_of_squares / len(self._values) - mean**2, 0))
+
+    def add(self, value: float) -> None:
+        """Add a value, dropping the oldest one from a full window."""
+        if len(self._values) == self._values.maxlen:
+            oldest = self._values[0]
+            self._sum -= oldest
+            self._sum_of_squares -= oldest**2
+        self._values.append(value)
+        self._sum += value
+        self._sum_of_squares += value**2
+
+
+class Ewma:
+    """Exponentially weighted moving average, O(1) per value."""
+
+    def __init__(self, alpha: float) -> None:
+        """Initialize an average weighting a new value by alpha."""
+        self._alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a value to the average."""
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+        else:
+            self.mean += self._alpha * (value - self.mean)
+
+
+class AnomalyDetector:
+    """Signs of a failing floor, from the polls and the energy history.
+
+    - Heating without rise: the floor heats without getting warmer, a failed
+      heating mat or sensor.
+    - Load drift: the measured load moves away from its baseline, a damaged
+      mat or a failing relay.
+    - Energy above baseline: today used far more energy than the days
+      before, a relay stuck on.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the detector without any history."""
+        self._last_timestamp: datetime | None = None
+        self._run_start: tuple[datetime, float] | None = None
+        self._run_max_temperature = 0.0
+        self._load_baseline = Ewma(LOAD_BASELINE_ALPHA)
+        self._load_recent = Ewma(LOAD_RECENT_ALPHA)
+        self._energy_baseline = RollingStats(ENERGY_BASELINE_DAYS)
+        self._last_baseline_day: date | None = None
+        self._energy_today: float | None = None
+        self.heating_without_rise = False
+        self.load_drift = False
+        self.energy_above_baseline = False
+
+    @property
+    def heating_since(self) -> datetime | None:
+        """Start of the current heating run."""
+        return self._run_start[0] if self._run_start else None
+
+    @property
+    def load_baseline(self) -> float | None:
+        """Baseline of the measured load in W."""
+        return self._load_baseline.mean if self._load_baseline.count else None
+
+    @property
+    def energy_baseline(self) -> float | None:
+        """Average energy of the days before today in kWh."""
+        return self._energy_baseline.mean if self._energy_baseline.count else None
+
+    def add_sample(
+        self,
+        timestamp: datetime,
+        temperature: float,
+        heating: bool,
+        load_watt: float,
+    ) -> bool:
+        """Add a poll and return True if an anomaly appeared or cleared."""
+        before = (self.heating_without_rise, self.load_drift)
+        if (
+            self._last_timestamp is not None
+            and timestamp - self._last_timestamp > MAX_SAMPLE_GAP
+        ):
+            self._run_start = None
+        self._last_timestamp = timestamp
+
+        if not heating:
+            self._run_start = None
+        elif self._run_start is None:
+            self._run_start = (timestamp, temperature)
+            self._run_max_temperature = temperature
+        else:
+            self._run_max_temperature = max(self._run_max_temperature, temperature)
+        self.heating_without_rise = (
+            self._run_start is not None
+            and timestamp - self._run_start[0] >= NO_RISE_DURATION
+            and self._run_max_temperature - self._run_start[1] < NO_RISE_MIN_RISE
+        )
+
+        if heating and load_watt > 0:
+            self._load_baseline.add(load_watt)
+            self._load_recent.add(load_watt)
+        self.load_drift = (
+            self._load_baseline.count >= LOAD_MIN_SAMPLES
+            and abs(self._load_recent.mean - self._load_baseline.mean)
+            > LOAD_DRIFT_RATIO * self._load_baseline.mean
+        )
+        return before != (self.heating_without_rise, self.load_drift)
+
+    def add_energy_history(self, today: date, day_totals: Sequence[float]) -> bool:
+        """Add the daily energy in kWh, today first.
+
+        Every completed day enters the baseline once. Return True if the
+        energy above baseline anomaly appeared or cleared.
+        """
+        before = self.energy_above_baseline
+        for index in range(len(day_totals) - 1, 0, -1):
+            day = today - timedelta(days=index)
+            if self._last_baseline_day is None or day > self._last_baseline_day:
+                self._energy_baseline.add(day_totals[index])
+                self._last_baseline_day = day
+        if day_totals:
+            self._energy_today = day_totals[0]
+        baseline = self._energy_baseline
+        self.energy_above_baseline = (
+            self._energy_today is not None
+            and baseline.count >= ENERGY_MIN_DAYS
+            and self._energy_today > baseline.mean + ENERGY_SIGMAS * baseline.stdev
+            and self._energy_today > baseline.mean * ENERGY_MIN_RATIO
+        )
+        return before != self.energy_above_baseline
@@ -1,27 +1,131 @@
 """Async Python wrapper to get data from schluter ditra heat thermostats."""
 
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import hashlib
+import json
 import logging
+import time
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, Optional
 
-from aiohttp import ClientSession
+from aiohttp import ClientResponse, ClientSession, TraceConfig
+from aiohttp.hdrs import ETAG, IF_MODIFIED_SINCE, IF_NONE_MATCH, LAST_MODIFIED
 
 from .const import (
     API_APPLICATION_ID,
-    API_AUTH_URL,
-    API_GET_THERMOSTATS_URL,
-    API_SET_THERMOSTAT_URL,
-    API_GET_ENERGY_USAGE_URL,
+    API_AUTH_PATH,
+    API_BASE_URL,
+    API_GET_THERMOSTAT_PATH,
+    API_GET_THERMOSTATS_PATH,
+    API_SET_THERMOSTAT_PATH,
+    API_GET_ENERGY_USAGE_PATH,
+    API_MAX_CONNECTIONS,
+    HTTP_NOT_MODIFIED,
     HTTP_OK,
     HTTP_UNAUTHORIZED,
 )
-from .thermostat import DayEnergyUsage, Thermostat
+from .recording import ApiRecorder
+from .schedule import WeeklySchedule
+from .scheduler import RequestPriority, RequestScheduler
+from .thermostat import DayEnergyUsage, Thermostat, Vacation
 
 _LOGGER = logging.getLogger(__name__)
 DAYS_OF_HISTORY = 29 # 29 + today, so 30 days total including today
 
 REGULATION_MODE = 2 # my app shows 2 (maybe that's for Canada?). Original code used 3
 
+# The Schluter API has no long lived tokens, a sessionid is renewed after a day
+SESSIONID_LIFETIME = timedelta(days=1)
+
+# An energy history request waiting longer than this for a slot is left to
+# the next refresh of the history, instead of piling up behind the polls.
+BACKFILL_MAX_WAIT = timedelta(seconds=5)
+
+class ConnectionStats:
+    """Connection usage of a client session, collected through aiohttp tracing."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        """Share of connections that were kept alive from an earlier request."""
+        connections = self.connections_created + self.connections_reused
+        if connections == 0:
+            return 0.0
+        return self.connections_reused / connections
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as a dictionary."""
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_rate": round(self.reuse_rate, 3),
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+        }
+
+    def trace_config(self) -> TraceConfig:
+        """Create a trace config that updates these statistics."""
+        # pylint: disable=unused-argument
+        async def on_request_start(session, context, params) -> None:
+            self.requests += 1
+
+        async def on_connection_create_end(session, context, params) -> None:
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params) -> None:
+            self.connections_reused += 1
+
+        async def on_dns_cache_hit(session, context, params) -> None:
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, context, params) -> None:
+            self.dns_cache_misses += 1
+
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+
+class PayloadStats:
+    """Sizes of the response bodies of the Schluter API, per endpoint."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._paths: dict[str, dict[str, int]] = {}
+
+    def add(self, path: str, size: int) -> None:
+        """Count a response body of size bytes."""
+        if (stats := self._paths.get(path)) is None:
+            stats = self._paths[path] = {
+                "responses": 0,
+                "total_bytes": 0,
+                "last_bytes": 0,
+                "max_bytes": 0,
+            }
+        stats["responses"] += 1
+        stats["total_bytes"] += size
+        stats["last_bytes"] = size
+        stats["max_bytes"] = max(stats["max_bytes"], size)
+
+    def as_dict(self) -> dict[str, dict[str, int]]:
+        """Return the statistics per endpoint."""
+        return {path: dict(stats) for path, stats in self._paths.items()}
+
+
 class SchluterApi:
     """Main class to perform Schluter API requests."""
 
@@ -31,13 +135,41 @@ class SchluterApi:
     def __init__(
         self,
         session: ClientSession,
+        connection_stats: Optional[ConnectionStats] = None,
+        base_url: str = API_BASE_URL,
+        max_concurrency: int = API_MAX_CONNECTIONS,
     ):
         """Initialize."""
+        self._base_url = base_url
+        # Caps the requests in flight, so a large energy fan-out cannot open
+        # more connections than the connection pool holds, and lets commands
+        # of the user pass the polls and the energy history.
+        self._scheduler = RequestScheduler(max_concurrency)
+        self._payload_stats = PayloadStats()
+        self._recorder: Optional[ApiRecorder] = None
         self._username: Optional[str] = None
         self._password: Optional[str] = None
         self._session = session
+        self._connection_stats = connection_stats
         self._sessionid: Optional[str] = None
         self._sessionid_timestamp: Optional[datetime] = None
+        self._auth_lock = asyncio.Lock()
+        # Last thermostats response, to skip parsing an unchanged one
+        self._thermostats: Optional[dict[str, Thermostat]] = None
+        self._thermostats_hash: Optional[bytes] = None
+        self._thermostats_etag: Optional[str] = None
+        self._thermostats_last_modified: Optional[str] = None
+        self._thermostats_parses = 0
+        self._thermostats_parses_saved = 0
+        self._thermostats_lock = asyncio.Lock()
+        self._thermostats_fetched = 0.0
+        self._thermostats_requests_saved = 0
+        # Last known schedule of the thermostats it was read or written for
+        self._schedules: dict[str, WeeklySchedule] = {}
+        # Monotonic time the API last confirmed each cached schedule
+        self._schedules_confirmed: dict[str, float] = {}
+        self._schedule_changes = 0
+        self._schedule_writes_saved = 0
 
     @property
     def username(self):
@@ -54,28 +186,159 @@ class SchluterApi:
         """SessionId."""
         return self._sessionid
 
+    @property
+    def session(self) -> ClientSession:
+        """Client session used for the requests."""
+        return self._session
+
+    @property
+    def connection_stats(self) -> Optional[ConnectionStats]:
+        """Connection statistics, if collected for the client session."""
+        return self._connection_stats
+
+    @property
+    def response_cache_stats(self) -> dict[str, int]:
+        """How often the thermostats were parsed, found unchanged or reused."""
+        return {
+            "thermostats_parses": self._thermostats_parses,
+            "thermostats_parses_saved": self._thermostats_parses_saved,
+            "thermostats_requests_saved": self._thermostats_requests_saved,
+            "schedules_cached": len(self._schedules),
+            "schedule_changes": self._schedule_changes,
+            "schedule_writes_saved": self._schedule_writes_saved,
+        }
+
+    @property
+    def scheduler_stats(self) -> dict[str, int]:
+        """Requests in flight and waiting, and requests dropped as stale."""
+        return {
+            "max_concurrency": self._scheduler.max_concurrency,
+            "in_flight": self._scheduler.in_flight,
+            "waiting": self._scheduler.waiting,
+            "stale_requests": self._scheduler.stale_requests,
+        }
+
+    def set_max_concurrency(self, max_concurrency: int) -> None:
+        """Change the number of requests in flight at once."""
+        self._scheduler.set_max_concurrency(max_concurrency)
+
+    @property
+    def payload_stats(self) -> dict[str, dict[str, int]]:
+        """Sizes of the successful responses, per endpoint."""
+        return self._payload_stats.as_dict()
+
+    @property
+    def recorder(self) -> Optional[ApiRecorder]:
+        """Recorder of the requests, while recording."""
+        return self._recorder
+
+    def start_recording(self) -> ApiRecorder:
+        """Record every request and its response from now on.
+
+        Save the recorder to replay the requests offline with a
+        ReplaySession in place of the client session.
+        """
+        self._recorder = ApiRecorder()
+        return self._recorder
+
+    def stop_recording(self) -> Optional[ApiRecorder]:
+        """Stop recording and return the recorder."""
+        recorder, self._recorder = self._recorder, None
+        return recorder
+
+    def set_session(
+        self,
+        session: ClientSession,
+        connection_stats: Optional[ConnectionStats] = None,
+    ) -> None:
+        """Send the following requests through another client session."""
+        self._session = session
+        self._connection_stats = connection_stats
+
     @property
     def sessionid_timestamp(self):
         """Timestamp the session was created on."""
         return self._sessionid_timestamp
 
-    async def _extract_thermostats_from_data(self, data: dict[str, Any]) -> dict[str, Any]:
+    @asynccontextmanager
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        priority: RequestPriority = RequestPriority.POLL,
+        max_wait: Optional[timedelta] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ClientResponse]:
+        """Send a request once the scheduler hands out a slot to it."""
+        async with self._scheduler.slot(priority, max_wait):
+            started = time.monotonic()
+            async with self._session.request(
+                method, self._base_url + path, **kwargs
+            ) as resp:
+                if self._recorder is not None:
+                    self._recorder.record(
+                        method,
+                        path,
+                        kwargs,
+                        started,
+                        resp.status,
+                        resp.headers,
+                        await resp.read(),
+                    )
+                yield resp
+                # The body was read by the caller and is cached by aiohttp
+                self._payload_stats.add(path, len(await resp.read()))
+
+    def _extract_thermostats_from_data(self, data: dict[str, Any]) -> dict[str, Any]:
         thermostats = {}
         for group in data["Groups"]:
             for tdata in group["Thermostats"]:
-                tstat = Thermostat(tdata)
-                updated_tstat = await self.async_get_energy_usage(tstat)
-                thermostats[tdata["SerialNumber"]] = updated_tstat
+                thermostats[tdata["SerialNumber"]] = Thermostat(tdata)
         return thermostats
 
+    @property
+    def sessionid_expired(self) -> bool:
+        """Return True if there is no sessionid or it has to be renewed."""
+        if self._sessionid is None or self._sessionid_timestamp is None:
+            return True
+        expiration_timestamp = self._sessionid_timestamp + SESSIONID_LIFETIME
+        _LOGGER.debug(
+            "Sessionid expiration timestamp is: %s",
+            expiration_timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        return expiration_timestamp <= datetime.now()
+
+    async def async_ensure_sessionid(self, username, password) -> Optional[str]:
+        """Return a valid sessionid, authenticating only when required.
+
+        Concurrent callers share a single authentication request.
+        """
+        async with self._auth_lock:
+            if (
+                username != self._username
+                or password != self._password
+                or self.sessionid_expired
+            ):
+                _LOGGER.info("No valid Schluter Sessionid found, authenticating")
+                await self.async_get_sessionid(username, password)
+            return self._sessionid
+
+    def invalidate_sessionid(self) -> None:
+        """Forget the sessionid so the next request authenticates again."""
+        self._sessionid = None
+        self._sessionid_timestamp = None
+
     async def async_get_sessionid(self, username, password) -> Optional[str]:
         """Validate the username and password for the Schluter API."""
 
         self._username = username
         self._password = password
 
-        async with self._session.post(
-            API_AUTH_URL,
+        # Every other request waits for the authentication
+        async with self._request(
+            "POST",
+            API_AUTH_PATH,
+            RequestPriority.COMMAND,
             json={
                 "Email": username,
                 "Password": password,
@@ -88,7 +351,7 @@ class SchluterApi:
                 raise ApiError(f"Invalid Response from Schluter API: {resp.status}")
 
             _LOGGER.debug(
-                "Data retrieved from %s, status: %s", API_AUTH_URL, resp.status
+                "Data retrieved from %s, status: %s", API_AUTH_PATH, resp.status
             )
             self._sessionid_timestamp = datetime.now()
             data = await resp.json()
@@ -105,37 +368,128 @@ class SchluterApi:
         self._sessionid = data["SessionId"]
         return self._sessionid
 
-    async def async_get_current_thermostats(self, sessionid) -> dict[str, Any]:
-        """Get the current settings for all thermostats."""
+    async def async_get_current_thermostats(
+        self, sessionid, max_age: Optional[timedelta] = None
+    ) -> dict[str, Any]:
+        """Get the current settings for all thermostats.
+
+        When the response is unchanged since the last call, either because the
+        server answered 304 or because the body hashes the same, the
+        thermostats of the last call are returned as the very same object.
+        With max_age, thermostats fetched less than max_age ago are returned
+        without a request, so callers refreshing parts of the account in turn
+        share one request. Concurrent callers wait for the running request.
+        """
         if len(sessionid) == 0:
             raise InvalidSessionIdError("Invalid Session Id")
 
+        async with self._thermostats_lock:
+            if (
+                max_age is not None
+                and self._thermostats is not None
+                and time.monotonic() - self._thermostats_fetched
+                < max_age.total_seconds()
+            ):
+                self._thermostats_requests_saved += 1
+                return self._thermostats
+            thermostats = await self._async_fetch_thermostats(sessionid)
+            self._thermostats_fetched = time.monotonic()
+            # Unchanged responses confirm the cached schedules as well
+            for serialnumber in self._schedules.keys() & thermostats.keys():
+                if thermostats[serialnumber].schedule is not None:
+                    self._schedules_confirmed[serialnumber] = self._thermostats_fetched
+            fetched_at = datetime.now(timezone.utc)
+            for thermostat in thermostats.values():
+                thermostat.fetched_at = fetched_at
+            return thermostats
+
+    async def _async_fetch_thermostats(self, sessionid) -> dict[str, Any]:
+        """Request the thermostats, skipping the parsing of an unchanged body."""
         self._sessionid = sessionid
         params = {"sessionId": sessionid}
-        async with self._session.get(API_GET_THERMOSTATS_URL, params=params) as resp:
+        headers = {}
+        if self._thermostats is not None:
+            if self._thermostats_etag is not None:
+                headers[IF_NONE_MATCH] = self._thermostats_etag
+            if self._thermostats_last_modified is not None:
+                headers[IF_MODIFIED_SINCE] = self._thermostats_last_modified
+        async with self._request(
+            "GET", API_GET_THERMOSTATS_PATH, params=params, headers=headers
+        ) as resp:
             if resp.status == HTTP_UNAUTHORIZED:
                 raise InvalidSessionIdError(
                     "An invalid or expired sessionid was supplied"
                 )
+            if resp.status == HTTP_NOT_MODIFIED and self._thermostats is not None:
+                self._thermostats_parses_saved += 1
+                return self._thermostats
             if resp.status != HTTP_OK:
                 raise ApiError(f"Invalid Response: {resp.status}")
 
             _LOGGER.debug(
                 "Data retrieved from %s, status: %s",
-                API_GET_THERMOSTATS_URL,
+                API_GET_THERMOSTATS_PATH,
                 resp.status,
             )
-            data = await resp.json()
-            return await self._extract_thermostats_from_data(data)
+            body = await resp.read()
+            etag = resp.headers.get(ETAG)
+            last_modified = resp.headers.get(LAST_MODIFIED)
 
-            # for group in data["Groups"]:
-            #     for tdata in group["Thermostats"]:
-            #         tstat = thermostats[tdata["SerialNumber"]]
-            #         await self.async_get_energy_usage([tstat])
+        body_hash = hashlib.blake2b(body, digest_size=16).digest()
+        if self._thermostats is not None and body_hash == self._thermostats_hash:
+            self._thermostats_parses_saved += 1
+            _LOGGER.debug(
+                "Thermostats unchanged, %s parses saved so far",
+                self._thermostats_parses_saved,
+            )
+            return self._thermostats
+
+        thermostats = self._extract_thermostats_from_data(json.loads(body))
+        for serialnumber in self._schedules.keys() & thermostats.keys():
+            if (schedule := thermostats[serialnumber].schedule) is not None:
+                self._remember_schedule(serialnumber, schedule)
+        self._thermostats = thermostats
+        self._thermostats_hash = body_hash
+        self._thermostats_etag = etag
+        self._thermostats_last_modified = last_modified
+        self._thermostats_parses += 1
+        return thermostats
 
+    async def async_get_thermostat(
+        self,
+        sessionid,
+        serialnumber,
+        priority: RequestPriority = RequestPriority.POLL,
+    ) -> Thermostat:
+        """Get the current settings of a single thermostat.
+
+        Pass RequestPriority.COMMAND to confirm a command of the user.
+        """
+        if len(sessionid) == 0:
+            raise InvalidSessionIdError("Invalid Session Id")
 
-            # return await self.async_get_energy_usage(thermostats)
+        self._sessionid = sessionid
+        params = {"sessionId": sessionid, "serialnumber": serialnumber}
+        async with self._request(
+            "GET", API_GET_THERMOSTAT_PATH, priority, params=params
+        ) as resp:
+            if resp.status == HTTP_UNAUTHORIZED:
+                raise InvalidSessionIdError(
+                    "An invalid or expired sessionid was supplied"
+                )
+            if resp.status != HTTP_OK:
+                raise ApiError(f"Invalid Response: {resp.status}")
 
+            _LOGGER.debug(
+                "Thermostat %s retrieved from %s, status: %s",
+                serialnumber,
+                API_GET_THERMOSTAT_PATH,
+                resp.status,
+            )
+            data = await resp.json()
+        thermostat = Thermostat(data)
+        thermostat.fetched_at = datetime.now(timezone.utc)
+        return thermostat
 
     async def async_set_temperature(self, sessionid, serialnumber, temperature) -> bool:
         """Set the temperature for a thermostat."""
@@ -152,13 +506,14 @@ class SchluterApi:
         #
         # ManualTemperature was also showing some odd values like 2278 when app showed 20.5C.
         # Looking at schedule values with .5 values, the are never round numbers: ex. 2333, 2778
-        async with self._session.post(
-            API_SET_THERMOSTAT_URL,
+        async with self._request(
+            "POST",
+            API_SET_THERMOSTAT_PATH,
+            RequestPriority.COMMAND,
             params=params,
             json={
                 "ComfortTemperature": adjusted_temp, 
                 "RegulationMode": REGULATION_MODE,
-                "VacationEnabled": False,
             },
         ) as resp:
             if resp.status == HTTP_UNAUTHORIZED:
@@ -170,7 +525,7 @@ class SchluterApi:
 
             _LOGGER.debug(
                 "Temperature set via %s, status: %s",
-                API_SET_THERMOSTAT_URL,
+                API_SET_THERMOSTAT_PATH,
                 resp.status,
             )
             data = await resp.json()
@@ -181,8 +536,10 @@ class SchluterApi:
         self._sessionid = sessionid
         params = {"sessionId": sessionid, "serialnumber": serialnumber}
 
-        async with self._session.post(
-            API_SET_THERMOSTAT_URL,
+        async with self._request(
+            "POST",
+            API_SET_THERMOSTAT_PATH,
+            RequestPriority.COMMAND,
             params=params,
             json={"SerialNumber": serialnumber, "RegulationMode": mode},
         ) as resp:
@@ -195,18 +552,163 @@ class SchluterApi:
 
             _LOGGER.debug(
                 "HVAC mode set via %s, status: %s",
-                API_SET_THERMOSTAT_URL,
+                API_SET_THERMOSTAT_PATH,
                 resp.status,
             )
             data = await resp.json()
         return data["Success"]
     
-    async def async_get_energy_usage(self, thermostat):
-        """test"""
-        today = date.today()
+    async def async_set_vacation(
+        self, sessionid, serialnumber, vacation: Optional[Vacation]
+    ) -> bool:
+        """Start a vacation of a thermostat, or end it when vacation is None."""
+        if len(sessionid) == 0:
+            raise InvalidSessionIdError("Invalid Session Id")
+
+        self._sessionid = sessionid
+        params = {"sessionId": sessionid, "serialnumber": serialnumber}
+        if vacation is None:
+            data: dict[str, Any] = {"VacationEnabled": False}
+        else:
+            data = {
+                "VacationEnabled": True,
+                "VacationBeginDay": vacation.begin.isoformat(timespec="seconds"),
+                "VacationEndDay": vacation.end.isoformat(timespec="seconds"),
+                "VacationTemperature": int(vacation.temperature * 100),
+            }
+        async with self._request(
+            "POST",
+            API_SET_THERMOSTAT_PATH,
+            RequestPriority.COMMAND,
+            params=params,
+            json=data,
+        ) as resp:
+            if resp.status == HTTP_UNAUTHORIZED:
+                raise InvalidSessionIdError(
+                    "An invalid or expired sessionid was supplied"
+                )
+            if resp.status != HTTP_OK:
+                raise ApiError(f"Invalid Response from Schluter API: {resp.status}")
+
+            _LOGGER.debug(
+                "Vacation of %s set via %s, status: %s",
+                serialnumber,
+                API_SET_THERMOSTAT_PATH,
+                resp.status,
+            )
+            data = await resp.json()
+        return data["Success"]
+
+    def _remember_schedule(self, serialnumber, schedule: WeeklySchedule) -> None:
+        """Cache the schedule of a thermostat, noting when it changed."""
+        previous = self._schedules.get(serialnumber)
+        if previous is not None and previous != schedule:
+            self._schedule_changes += 1
+            _LOGGER.debug("Schedule of %s changed on the thermostat", serialnumber)
+        self._schedules[serialnumber] = schedule
+        self._schedules_confirmed[serialnumber] = time.monotonic()
+
+    async def async_get_schedule(
+        self, sessionid, serialnumber, refresh: bool = False
+    ) -> Optional[WeeklySchedule]:
+        """Get the weekly schedule of a thermostat.
+
+        The schedule is read once and cached, later polls of the thermostats
+        keep the cached schedule up to date. With refresh, the thermostat is
+        requested again.
+        """
+        if not refresh and (schedule := self._schedules.get(serialnumber)):
+            return schedule
+        thermostat = await self.async_get_thermostat(
+            sessionid, serialnumber, RequestPriority.COMMAND
+        )
+        if (schedule := thermostat.schedule) is not None:
+            self._remember_schedule(serialnumber, schedule)
+        return schedule
+
+    async def async_set_schedule(
+        self,
+        sessionid,
+        serialnumber,
+        schedule: WeeklySchedule,
+        max_age: Optional[timedelta] = None,
+    ) -> bool:
+        """Replace the weekly schedule of a thermostat in a single request.
+
+        With max_age, nothing is sent when the thermostat had this schedule
+        less than max_age ago. It may have been changed in the app since, so
+        max_age should not exceed the poll interval.
+        """
+        if len(sessionid) == 0:
+            raise InvalidSessionIdError("Invalid Session Id")
+
+        if (
+            max_age is not None
+            and self._schedules.get(serialnumber) == schedule
+            and time.monotonic() - self._schedules_confirmed[serialnumber]
+            < max_age.total_seconds()
+        ):
+            self._schedule_writes_saved += 1
+            _LOGGER.debug("Schedule of %s unchanged, not sent", serialnumber)
+            return True
+
+        self._sessionid = sessionid
+        params = {"sessionId": sessionid, "serialnumber": serialnumber}
+        async with self._request(
+            "POST",
+            API_SET_THERMOSTAT_PATH,
+            RequestPriority.COMMAND,
+            params=params,
+            json={"Schedule": schedule.as_json()},
+        ) as resp:
+            if resp.status == HTTP_UNAUTHORIZED:
+                raise InvalidSessionIdError(
+                    "An invalid or expired sessionid was supplied"
+                )
+            if resp.status != HTTP_OK:
+                raise ApiError(f"Invalid Response from Schluter API: {resp.status}")
+
+            _LOGGER.debug(
+                "Schedule of %s set via %s, status: %s",
+                serialnumber,
+                API_SET_THERMOSTAT_PATH,
+                resp.status,
+            )
+            data = await resp.json()
+        if data["Success"]:
+            self._schedules[serialnumber] = schedule
+            self._schedules_confirmed[serialnumber] = time.monotonic()
+        return data["Success"]
+
+    async def async_get_energy_usage(
+        self,
+        sessionid,
+        serialnumber,
+        days: int = DAYS_OF_HISTORY + 1,
+        today: date | None = None,
+    ) -> list[DayEnergyUsage]:
+        """Get the hourly energy usage of a thermostat for the last days.
+
+        Up to days days are returned, today first. Today is the current day
+        of the thermostat, the one of the host by default.
+
+        The request goes after the commands and the polls, and raises
+        StaleRequestError when it waited for longer than BACKFILL_MAX_WAIT.
+        """
+        if len(sessionid) == 0:
+            raise InvalidSessionIdError("Invalid Session Id")
+
+        self._sessionid = sessionid
+        today = today or date.today()
         today_param = today.strftime("%d/%m/%Y")
-        params = {"sessionId": self._sessionid, "serialnumber": thermostat.serial_number, "view": "day", "date": today_param, "history": str(DAYS_OF_HISTORY), "calc": "false", "weekstart": "monday"}
-        async with self._session.get(API_GET_ENERGY_USAGE_URL, params=params) as resp:
+        params = {"sessionId": sessionid, "serialnumber": serialnumber, "view": "day", "date": today_param, "history": str(days - 1), "calc": "false", "weekstart": "monday"}
+        async with self._request(
+            "GET",
+            API_GET_ENERGY_USAGE_PATH,
+            RequestPriority.BACKFILL,
+            BACKFILL_MAX_WAIT,
+            params=params,
+        ) as resp:
             if resp.status == HTTP_UNAUTHORIZED:
                 raise InvalidSessionIdError(
                     "An invalid or expired sessionid was supplied"
@@ -214,13 +716,13 @@ class SchluterApi:
             if resp.status != HTTP_OK:
                 raise ApiError(f"Invalid Response from Schluter API: {resp.status}")
 
+            _LOGGER.debug(
+                "Energy usage retrieved from %s, status: %s",
+                API_GET_ENERGY_USAGE_PATH,
+                resp.status,
+            )
             data = await resp.json()
-            energy_usage_jsons = data["EnergyUsage"]
-            day_energy_usages = []
-            for json in energy_usage_jsons:
-                day_energy_usages.append(DayEnergyUsage(json))
-                thermostat.update_energy_usage(day_energy_usages)
-        return thermostat
+        return [DayEnergyUsage(usage_json) for usage_json in data["EnergyUsage"]]
 
 
 class ApiError(Exception):
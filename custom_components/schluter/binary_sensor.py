@@ -0,0 +1,112 @@
+"""Problem sensors for the anomalies detected on Schluter thermostats."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import SchluterData
+from .const import DOMAIN, FIELD_ANOMALY
+from .entity import SchluterEntity
+
+if TYPE_CHECKING:
+    from .anomaly import AnomalyDetector
+    from .coordinator import SchluterDataUpdateCoordinator
+
+
+@dataclass(frozen=True, kw_only=True)
+class SchluterBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes an anomaly sensor of a Schluter thermostat."""
+
+    is_on_fn: Callable[[AnomalyDetector], bool]
+    attributes_fn: Callable[[AnomalyDetector], dict[str, Any]] = lambda detector: {}
+
+
+BINARY_SENSOR_DESCRIPTIONS: tuple[SchluterBinarySensorEntityDescription, ...] = (
+    SchluterBinarySensorEntityDescription(
+        key="heating-without-rise",
+        name="Heating Without Temperature Rise",
+        is_on_fn=lambda detector: detector.heating_without_rise,
+        attributes_fn=lambda detector: {"heating_since": detector.heating_since},
+    ),
+    SchluterBinarySensorEntityDescription(
+        key="load-drift",
+        name="Load Drift",
+        is_on_fn=lambda detector: detector.load_drift,
+        attributes_fn=lambda detector: {"load_baseline": detector.load_baseline},
+    ),
+    SchluterBinarySensorEntityDescription(
+        key="energy-above-baseline",
+        name="Energy Above Baseline",
+        is_on_fn=lambda detector: detector.energy_above_baseline,
+        attributes_fn=lambda detector: {"energy_baseline": detector.energy_baseline},
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add the anomaly sensors of the thermostats."""
+    data: SchluterData = hass.data[DOMAIN][config_entry.entry_id]
+    async_add_entities(
+        SchluterAnomalySensor(coordinator, thermostat_id, description)
+        for coordinator in data.coordinators
+        for thermostat_id in coordinator.data
+        for description in BINARY_SENSOR_DESCRIPTIONS
+    )
+
+
+class SchluterAnomalySensor(SchluterEntity, BinarySensorEntity):
+    """On while the detector of the thermostat reports an anomaly."""
+
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _signal_fields = (FIELD_ANOMALY,)
+    entity_description: SchluterBinarySensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: SchluterDataUpdateCoordinator,
+        thermostat_id: str,
+        description: SchluterBinarySensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, thermostat_id)
+        self.entity_description = description
+        thermostat = coordinator.data[thermostat_id]
+        self._attr_name = f"{thermostat.name} {description.name}"
+        self._attr_unique_id = f"{thermostat_id}-{description.key}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, thermostat_id)})
+        self._update_from_detector()
+
+    def _update_from_detector(self) -> None:
+        """Compute the state from the detector of the thermostat."""
+        detector = self.coordinator.anomaly_detectors.get(self._thermostat_id)
+        if detector is None:
+            self._attr_is_on = False
+            self._attr_extra_state_attributes = {}
+            return
+        self._attr_is_on = self.entity_description.is_on_fn(detector)
+        self._attr_extra_state_attributes = self.entity_description.attributes_fn(
+            detector
+        )
+
+    @callback
+    def _handle_thermostat_update(self) -> None:
+        """Handle a changed anomaly of the thermostat."""
+        self._update_from_detector()
+        super()._handle_thermostat_update()
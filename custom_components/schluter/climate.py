@@ -2,16 +2,28 @@
 from __future__ import annotations
 
 import logging
+from typing import TYPE_CHECKING, Any
 
-from aiohttp.client_exceptions import ClientConnectorError
-from .api import (
-    ApiError,
-    InvalidSessionIdError,
-    InvalidUserPasswordError,
-    SchluterApi,
-    Thermostat,
-)
+from aiohttp.client_exceptions import ClientError
+from .api import ApiError, InvalidSessionIdError, InvalidUserPasswordError
 from .const import (
+    ATTR_EARLY_START_OF_HEATING,
+    ATTR_ESTIMATED,
+    ATTR_HEAT_UP_RATE,
+    ATTR_LAST_SEEN,
+    ATTR_READY_BY,
+    ATTR_SCHEDULED_SETPOINT,
+    ATTR_TIME_TO_SETPOINT,
+    ATTR_VACATION_BEGIN,
+    ATTR_VACATION_END,
+    ATTR_VACATION_TEMPERATURE,
+    FIELD_HEATING,
+    FIELD_MODE,
+    FIELD_ONLINE,
+    FIELD_SCHEDULED_SETPOINT,
+    FIELD_SET_POINT,
+    FIELD_TEMPERATURE,
+    FIELD_VACATION,
     REGULATION_MODE_AWAY,
     REGULATION_MODE_MANUAL,
     REGULATION_MODE_SCHEDULE,
@@ -27,16 +39,19 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE
 from homeassistant.const import UnitOfTemperature
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
 
 from . import SchluterData
 from .const import DOMAIN
+from .entity import SchluterEntity
+from .scheduler import StaleRequestError
+
+if TYPE_CHECKING:
+    from .api import SchluterApi
+    from .coordinator import SchluterDataUpdateCoordinator
+    from .thermostat import Thermostat
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -49,12 +64,13 @@ async def async_setup_entry(
     """Set up device tracker for DITRA-HEAT-E-WIFI component."""
     data: SchluterData = hass.data[DOMAIN][config_entry.entry_id]
     async_add_entities(
-        SchluterThermostat(data.api, data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
+        SchluterThermostat(data.api, coordinator, thermostat_id)
+        for coordinator in data.coordinators
+        for thermostat_id in coordinator.data
     )
 
 
-class SchluterThermostat(CoordinatorEntity[DataUpdateCoordinator], ClimateEntity):
+class SchluterThermostat(SchluterEntity, ClimateEntity):
     """Define an Schluter Thermostat Entity."""
 
     _attr_hvac_modes = [HVACMode.HEAT, HVACMode.AUTO, HVACMode.OFF]
@@ -64,44 +80,49 @@ class SchluterThermostat(CoordinatorEntity[DataUpdateCoordinator], ClimateEntity
         | ClimateEntityFeature.TURN_OFF
     )
     _enable_turn_on_off_backwards_compatibility: bool = False
-
-    coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]]
+    # The heat-up attributes change with the temperature and heating state
+    _signal_fields = (
+        FIELD_TEMPERATURE,
+        FIELD_SET_POINT,
+        FIELD_HEATING,
+        FIELD_MODE,
+        FIELD_ONLINE,
+        FIELD_SCHEDULED_SETPOINT,
+        FIELD_VACATION,
+    )
 
     def __init__(
         self,
         api: SchluterApi,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
+        coordinator: SchluterDataUpdateCoordinator,
         thermostat_id: str,
     ) -> None:
         """Initialize Schluter Thermostat."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, thermostat_id)
         self._api = api
         self._name = coordinator.data[thermostat_id].name
         self._attr_unique_id = thermostat_id
         self._serial_number = coordinator.data[thermostat_id].serial_number
-        ClimateEntity.__init__(self)
-
-    @property
-    def device_info(self):
-        """Information about this entity/device."""
-        return {
-            "identifiers": {(DOMAIN, self._attr_unique_id)},
+        # Device info is only read when the entity is added, build it once
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, thermostat_id)},
             # If desired, the name for the device could be different to the entity
-            "name": self._name,
-            "sw_version": self.coordinator.data[self._attr_unique_id].sw_version,
-            "model": "DITRA-HEAT-E-Wifi",
-            "manufacturer": "Schluter",
-        }
+            name=self._name,
+            sw_version=coordinator.data[thermostat_id].sw_version,
+            model="DITRA-HEAT-E-Wifi",
+            manufacturer="Schluter",
+        )
+        ClimateEntity.__init__(self)
 
     @property
     def hvac_mode(self):
         if (
-            self.coordinator.data[self._attr_unique_id].regulation_mode
+            self.coordinator.thermostat(self._attr_unique_id).regulation_mode
             == REGULATION_MODE_SCHEDULE
         ):
             self._attr_hvac_mode = HVACMode.AUTO
         elif (
-            self.coordinator.data[self._attr_unique_id].regulation_mode
+            self.coordinator.thermostat(self._attr_unique_id).regulation_mode
             == REGULATION_MODE_MANUAL
         ):
             self._attr_hvac_mode = HVACMode.HEAT
@@ -127,43 +148,70 @@ class SchluterThermostat(CoordinatorEntity[DataUpdateCoordinator], ClimateEntity
     @property
     def current_temperature(self):
         """Return the current temperature."""
-        return self.coordinator.data[self._attr_unique_id].temperature
+        return self.coordinator.thermostat(self._attr_unique_id).temperature
 
     @property
     def hvac_action(self) -> HVACAction:
         """Return current operation. Can only be heating or idle."""
-        if self.coordinator.data[self._attr_unique_id].is_heating:
+        if self.coordinator.thermostat(self._attr_unique_id).is_heating:
             return HVACAction.HEATING
         return HVACAction.IDLE
 
     @property
     def target_temperature(self):
         """Return the temperature we try to reach."""
-        return self._attr_target_temperature or self.coordinator.data[self._attr_unique_id].set_point_temp
+        return self._attr_target_temperature or self.coordinator.thermostat(self._attr_unique_id).set_point_temp
 
     @property
     def min_temp(self):
         """Identify min_temp in Schluter API."""
-        return self.coordinator.data[self._attr_unique_id].min_temp
+        return self.coordinator.thermostat(self._attr_unique_id).min_temp
 
     @property
     def max_temp(self):
         """Identify max_temp in Schluter API."""
-        return self.coordinator.data[self._attr_unique_id].max_temp
+        return self.coordinator.thermostat(self._attr_unique_id).max_temp
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the learned heat-up, the scheduled setpoint and the vacation.
+
+        An offline thermostat that is estimated also tells when it was last seen.
+        """
+        thermostat: Thermostat = self.coordinator.thermostat(self._attr_unique_id)
+        attributes: dict[str, Any] = {
+            ATTR_EARLY_START_OF_HEATING: thermostat.is_early_start_of_heating
+        }
+        model = self.coordinator.heat_up_models.get(self._serial_number)
+        if model is not None and (rate := model.rate) is not None:
+            attributes[ATTR_HEAT_UP_RATE] = round(rate, 2)
+        if (duration := self.coordinator.time_to_setpoint(thermostat)) is not None:
+            attributes[ATTR_TIME_TO_SETPOINT] = round(duration.total_seconds() / 60)
+        if setpoint := self.coordinator.scheduled_setpoints.get(self._serial_number):
+            attributes[ATTR_SCHEDULED_SETPOINT] = setpoint.temperature
+            attributes[ATTR_READY_BY] = setpoint.ready_by.isoformat()
+        if (vacation := thermostat.vacation) is not None:
+            attributes[ATTR_VACATION_BEGIN] = vacation.begin.isoformat()
+            attributes[ATTR_VACATION_END] = vacation.end.isoformat()
+            attributes[ATTR_VACATION_TEMPERATURE] = vacation.temperature
+        if estimate := self.coordinator.offline_estimates.get(self._serial_number):
+            attributes[ATTR_ESTIMATED] = True
+            attributes[ATTR_LAST_SEEN] = estimate.last_seen.isoformat()
+        return attributes
 
     # This property is important to let HA know if this entity is online or not.
     # If an entity is offline (return False), the UI will refelect this.
     @property
     def available(self) -> bool:
-        """Return True if roller and hub is available."""
-        return self.coordinator.data[self._attr_unique_id].is_online
+        """Return True if roller and hub is available, or estimated."""
+        return self.coordinator.thermostat(self._attr_unique_id).is_online
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set the hvac mode"""
         if hvac_mode == self._attr_hvac_mode:
             return
 
-        serial_number = self.coordinator.data[self._attr_unique_id].serial_number
+        serial_number = self.coordinator.thermostat(self._attr_unique_id).serial_number
         _LOGGER.debug(
             "Setting HVAC mode of thermostat: %s to: %s", self._name, hvac_mode
         )
@@ -175,25 +223,18 @@ class SchluterThermostat(CoordinatorEntity[DataUpdateCoordinator], ClimateEntity
         else:
             regulation_mode = REGULATION_MODE_AWAY
 
-        try:
-            await self._api.async_set_regulation_mode(
-                self._api.sessionid, serial_number, regulation_mode
-            )
-            # self._attr_hvac_mode = hvac_mode
-            await self.coordinator.async_request_refresh()
-        except (
-            InvalidUserPasswordError,
-            InvalidSessionIdError,
-        ) as err:
-            raise ConfigEntryAuthFailed from err
-        except (ApiError, ClientConnectorError) as err:
-            raise UpdateFailed(err) from err
+        # Logs in again like the polls do when the session expired
+        await self.coordinator.async_set_regulation_mode(
+            serial_number, regulation_mode
+        )
+        # self._attr_hvac_mode = hvac_mode
+        await self._async_refresh_after_command(serial_number)
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
         original_temp = self.current_temperature
         target_temp = kwargs.get(ATTR_TEMPERATURE)
-        serial_number = self.coordinator.data[self._attr_unique_id].serial_number
+        serial_number = self.coordinator.thermostat(self._attr_unique_id).serial_number
         _LOGGER.debug("Setting thermostat temperature: %s", target_temp)
 
         try:
@@ -202,20 +243,42 @@ class SchluterThermostat(CoordinatorEntity[DataUpdateCoordinator], ClimateEntity
                 self._attr_target_temperature = target_temp
                 self.async_write_ha_state()  # Reflects the change immediately in the UI
 
-                await self._api.async_set_temperature(
-                    self._api.sessionid, serial_number, target_temp
+                await self.coordinator.async_set_temperature(
+                    serial_number, target_temp
                 )
                 # self._attr_hvac_mode = HVACMode.HEAT
-                await self.coordinator.async_request_refresh()
-        except (InvalidUserPasswordError, InvalidSessionIdError) as err:
+        except HomeAssistantError:
             # Revert on failure
             self._attr_target_temperature = original_temp
             self.async_write_ha_state()
-            raise ConfigEntryAuthFailed from err
-        except (ApiError, ClientConnectorError) as err:
-            self._attr_target_temperature = original_temp
-            self.async_write_ha_state()
-            raise UpdateFailed(err) from err
+            raise
+        else:
+            if target_temp is not None:
+                # The target stays until the refresh, whether it succeeds or not
+                await self._async_refresh_after_command(serial_number)
         finally:
             # Reset to None so future state relies on coordinator data
-            self._attr_target_temperature = None
\ No newline at end of file
+            self._attr_target_temperature = None
+
+    async def _async_refresh_after_command(self, serial_number: str) -> None:
+        """Refresh the thermostat a command was accepted by.
+
+        The command already succeeded, a failed refresh is only logged and
+        the next poll catches up.
+        """
+        try:
+            await self.coordinator.async_refresh_thermostat(serial_number)
+        except (
+            ApiError,
+            ClientError,
+            InvalidSessionIdError,
+            InvalidUserPasswordError,
+            StaleRequestError,
+            TimeoutError,
+        ) as err:
+            _LOGGER.warning(
+                "Refresh of thermostat %s after a command failed, "
+                "waiting for the next poll: %s",
+                serial_number,
+                err,
+            )
\ No newline at end of file
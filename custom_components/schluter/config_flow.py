@@ -8,15 +8,45 @@ from typing import Any
 
 from aiohttp import ClientError
 from aiohttp.client_exceptions import ClientConnectorError
-from .api import ApiError, InvalidUserPasswordError, SchluterApi
+from .api import ApiError, InvalidUserPasswordError
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
+from .account import account_key, async_validate_credentials
+from .const import (
+    API_MAX_CONNECTIONS,
+    CONF_ALIGNED_REFRESH,
+    CONF_DEDICATED_SESSION,
+    CONF_ENERGY_INTERVAL,
+    CONF_HISTORY_DAYS,
+    CONF_MAX_CONCURRENCY,
+    CONF_OFFLINE_ESTIMATION,
+    CONF_SHARDS,
+    CONF_TARIFF,
+    CONF_TIMEOUT,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_ENERGY_INTERVAL,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_TIMEOUT,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+    MAX_ENERGY_INTERVAL,
+    MAX_HISTORY_DAYS,
+    MAX_MAX_CONCURRENCY,
+    MAX_SHARDS,
+    MAX_TIMEOUT,
+    MAX_UPDATE_INTERVAL,
+    MIN_ENERGY_INTERVAL,
+    MIN_HISTORY_DAYS,
+    MIN_MAX_CONCURRENCY,
+    MIN_TIMEOUT,
+    MIN_UPDATE_INTERVAL,
+)
+from .cost import Tariff
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,6 +66,14 @@ class SchluterConfigFlowHandler(
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> SchluterOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return SchluterOptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -86,10 +124,8 @@ class SchluterConfigFlowHandler(
         self, username: str, password: str
     ) -> tuple[str | None, str | None]:
         """Try connecting to Schluter API."""
-        websession = async_get_clientsession(self.hass)
-        schluter = SchluterApi(websession)
         try:
-            await schluter.async_get_sessionid(username, password)
+            await async_validate_credentials(self.hass, username, password)
         except (ApiError, ClientConnectorError, asyncio.TimeoutError, ClientError):
             return None, "cannot_connect"
         except InvalidUserPasswordError:
@@ -97,4 +133,93 @@ class SchluterConfigFlowHandler(
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception("Unexpected exception")
             return None, "unknown"
-        return username, None
+        # The shared accounts do not tell apart the case of the username
+        return account_key(username), None
+
+
+class SchluterOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of a schluter config entry."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        options = self.config_entry.options
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            # An emptied optional field is left out of the input
+            user_input.setdefault(CONF_TARIFF, "")
+            try:
+                Tariff.parse(user_input[CONF_TARIFF])
+            except ValueError:
+                errors[CONF_TARIFF] = "invalid_tariff"
+            else:
+                # Keep the options set by services, like the refresh scopes
+                return self.async_create_entry(
+                    title="", data={**options, **user_input}
+                )
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_DEDICATED_SESSION,
+                        default=options.get(CONF_DEDICATED_SESSION, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_SHARDS, default=options.get(CONF_SHARDS, 1)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_SHARDS)),
+                    vol.Optional(
+                        CONF_TARIFF,
+                        description={"suggested_value": options.get(CONF_TARIFF)},
+                    ): str,
+                    vol.Required(
+                        CONF_HISTORY_DAYS,
+                        default=options.get(CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS),
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_HISTORY_DAYS, max=MAX_HISTORY_DAYS),
+                    ),
+                    vol.Required(
+                        CONF_UPDATE_INTERVAL,
+                        default=options.get(
+                            CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_UPDATE_INTERVAL, max=MAX_UPDATE_INTERVAL),
+                    ),
+                    vol.Required(
+                        CONF_ENERGY_INTERVAL,
+                        default=options.get(
+                            CONF_ENERGY_INTERVAL, DEFAULT_ENERGY_INTERVAL
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_ENERGY_INTERVAL, max=MAX_ENERGY_INTERVAL),
+                    ),
+                    vol.Required(
+                        CONF_TIMEOUT, default=options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=MIN_TIMEOUT, max=MAX_TIMEOUT)
+                    ),
+                    vol.Required(
+                        CONF_MAX_CONCURRENCY,
+                        default=options.get(CONF_MAX_CONCURRENCY, API_MAX_CONNECTIONS),
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_MAX_CONCURRENCY, max=MAX_MAX_CONCURRENCY),
+                    ),
+                    vol.Required(
+                        CONF_ALIGNED_REFRESH,
+                        default=options.get(CONF_ALIGNED_REFRESH, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_OFFLINE_ESTIMATION,
+                        default=options.get(CONF_OFFLINE_ESTIMATION, False),
+                    ): bool,
+                }
+            ),
+            errors=errors,
+        )
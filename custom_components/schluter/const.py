@@ -5,17 +5,110 @@ ZERO_WATTS = 0
 PRESET_MANUAL = "On Manual"
 PRESET_SCHEDULE = "On Schedule"
 
+# Key in hass.data[DOMAIN] of the accounts shared between config entries
+DATA_ACCOUNTS = "accounts"
+# Key in hass.data[DOMAIN] of the orchestrator of the aligned refreshes
+DATA_ORCHESTRATOR = "orchestrator"
+# Seconds an unused account is kept to survive reloads and config flows
+ACCOUNT_RELEASE_DELAY = 60
+
+CONF_DEDICATED_SESSION = "dedicated_session"
+CONF_REFRESH_SCOPES = "refresh_scopes"
+CONF_GROUP_ID = "group_id"
+CONF_SERIAL_NUMBER = "serial_number"
+CONF_INTERVAL = "interval"
+CONF_SHARDS = "shards"
+CONF_TARIFF = "tariff"
+CONF_HISTORY_DAYS = "history_days"
+CONF_UPDATE_INTERVAL = "update_interval"
+CONF_ENERGY_INTERVAL = "energy_interval"
+CONF_TIMEOUT = "timeout"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_ALIGNED_REFRESH = "aligned_refresh"
+CONF_OFFLINE_ESTIMATION = "offline_estimation"
+
+# Days of energy history retained per thermostat, today included
+DEFAULT_HISTORY_DAYS = 30
+MIN_HISTORY_DAYS = 7
+MAX_HISTORY_DAYS = 365
+
+# Seconds between two polls of the thermostats and their energy history,
+# seconds a request may take, and requests in flight at once per account
+DEFAULT_UPDATE_INTERVAL = 60
+MIN_UPDATE_INTERVAL = 15
+MAX_UPDATE_INTERVAL = 3600
+DEFAULT_ENERGY_INTERVAL = 60
+MIN_ENERGY_INTERVAL = 60
+MAX_ENERGY_INTERVAL = 86400
+DEFAULT_TIMEOUT = 10
+MIN_TIMEOUT = 5
+MAX_TIMEOUT = 60
+MIN_MAX_CONCURRENCY = 1
+MAX_MAX_CONCURRENCY = 16
+
+ATTR_EARLY_START_OF_HEATING = "early_start_of_heating"
+ATTR_HEAT_UP_RATE = "heat_up_rate"
+ATTR_TIME_TO_SETPOINT = "time_to_setpoint"
+ATTR_SCHEDULED_SETPOINT = "scheduled_setpoint"
+ATTR_READY_BY = "ready_by"
+ATTR_COUNT = "count"
+ATTR_VACATION_BEGIN = "vacation_begin"
+ATTR_VACATION_END = "vacation_end"
+ATTR_VACATION_TEMPERATURE = "vacation_temperature"
+ATTR_SCHEDULE = "schedule"
+ATTR_TIME = "time"
+ATTR_ESTIMATED = "estimated"
+ATTR_LAST_SEEN = "last_seen"
+
+# Thermostats updated at once by the vacation and schedule services
+UPDATE_CONCURRENCY = 4
+
+# Dispatcher signal of a changed field of a thermostat, by serial number and
+# field. The set of all fields changed by the same update is passed along.
+SIGNAL_THERMOSTAT_UPDATE = f"{DOMAIN}_thermostat_update_{{}}_{{}}"
+FIELD_TEMPERATURE = "temperature"
+# Set point and its limits
+FIELD_SET_POINT = "set_point"
+# Heating state and early start of heating
+FIELD_HEATING = "heating"
+FIELD_LOAD = "load"
+FIELD_MODE = "mode"
+FIELD_ONLINE = "online"
+FIELD_PRICE = "price"
+# Energy history and its costs
+FIELD_ENERGY = "energy"
+FIELD_ANOMALY = "anomaly"
+FIELD_SCHEDULED_SETPOINT = "scheduled_setpoint"
+FIELD_VACATION = "vacation"
+# Energy projected for an offline thermostat, on every poll
+FIELD_ESTIMATE = "estimate"
+# Every successful poll of a thermostat, whether it changed or not
+FIELD_POLL = "poll"
+
+# Accounts with many thermostats are split into shards of about this size
+FLEET_SHARD_SIZE = 50
+MAX_SHARDS = 20
+
+# Requests in flight at once unless set in the options. The keep-alive of
+# the dedicated client session outlasts the poll interval so connections
+# are reused between polls.
+API_MAX_CONNECTIONS = 4
+API_DNS_CACHE_TTL = 300
+API_KEEPALIVE_TIMEOUT = 90
+
 """ constants for aioschluter """
 
 # API_BASE_URL = "https://ditra-heat-e-wifi.schluter.com" - original code base url
 API_BASE_URL = "https://mythermostat.info" # my apps api (either worked)
-API_AUTH_URL = API_BASE_URL + "/api/authenticate/user"
-API_GET_THERMOSTATS_URL = API_BASE_URL + "/api/thermostats"
-API_SET_THERMOSTAT_URL = API_BASE_URL + "/api/thermostat"
-API_GET_ENERGY_USAGE_URL = API_BASE_URL + "/api/energyusage"
+API_AUTH_PATH = "/api/authenticate/user"
+API_GET_THERMOSTATS_PATH = "/api/thermostats"
+API_GET_THERMOSTAT_PATH = "/api/thermostat"
+API_SET_THERMOSTAT_PATH = "/api/thermostat"
+API_GET_ENERGY_USAGE_PATH = "/api/energyusage"
 API_APPLICATION_ID = 7
 HTTP_UNAUTHORIZED: int = 401
 HTTP_OK: int = 200
+HTTP_NOT_MODIFIED: int = 304
 REGULATION_MODE_SCHEDULE = 1
 REGULATION_MODE_MANUAL = 2
 REGULATION_MODE_AWAY = 3
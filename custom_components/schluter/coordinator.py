@@ -0,0 +1,1107 @@
+"""Data update coordinator for the schluter integration."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo
+import logging
+from typing import TYPE_CHECKING, Any, TypeVar
+import zlib
+
+from aiohttp.client_exceptions import ClientConnectorError
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .anomaly import AnomalyDetector
+from .api import (
+    ApiError,
+    InvalidSessionIdError,
+    InvalidUserPasswordError,
+    RequestPriority,
+)
+from .const import (
+    CONF_GROUP_ID,
+    CONF_INTERVAL,
+    CONF_OFFLINE_ESTIMATION,
+    CONF_ENERGY_INTERVAL,
+    CONF_SERIAL_NUMBER,
+    CONF_TIMEOUT,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_ENERGY_INTERVAL,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_TIMEOUT,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+    FIELD_ANOMALY,
+    FIELD_ENERGY,
+    FIELD_ESTIMATE,
+    FIELD_HEATING,
+    FIELD_LOAD,
+    FIELD_MODE,
+    FIELD_ONLINE,
+    FIELD_POLL,
+    FIELD_PRICE,
+    FIELD_SCHEDULED_SETPOINT,
+    FIELD_SET_POINT,
+    FIELD_TEMPERATURE,
+    FIELD_VACATION,
+    SIGNAL_THERMOSTAT_UPDATE,
+)
+from .cost import EnergyCostCalculator, Tariff
+from .days import DayBoundaries
+from .estimate import OfflineEstimate, hourly_profile
+from .heatup import HeatUpRateModel, heat_up_time
+from .history import EnergyHistory
+from .schedule import WeeklySchedule
+from .scheduler import StaleRequestError
+from .thermostat import DayEnergyUsage, Thermostat, Vacation
+from .timing import TIMINGS_KEPT, RefreshTiming
+
+if TYPE_CHECKING:
+    from .account import SchluterAccount
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+UPDATE_INTERVAL = timedelta(seconds=DEFAULT_UPDATE_INTERVAL)
+ENERGY_UPDATE_INTERVAL = timedelta(seconds=DEFAULT_ENERGY_INTERVAL)
+API_TIMEOUT = DEFAULT_TIMEOUT
+
+# The refresh timer does not fire exactly on time, a scope counts as due
+# when its interval has passed up to this margin.
+SCOPE_DUE_MARGIN = timedelta(seconds=1)
+
+# An offline thermostat is published with its last known state for this long,
+# its entities are unavailable afterwards.
+OFFLINE_ESTIMATION_MAX_AGE = timedelta(hours=24)
+
+# Heat-up rate in degrees per hour assumed until a floor has been observed,
+# on the slow side so a scheduled setpoint is rather reached early than late.
+DEFAULT_HEAT_UP_RATE = 1.0
+# Scheduled setpoints are sent this much earlier than the heat-up takes
+HEAT_UP_MARGIN = 1.2
+
+# Fields compared between refreshes, a change is signalled to the entities
+THERMOSTAT_FIELDS: dict[str, Callable[[Thermostat], Any]] = {
+    FIELD_TEMPERATURE: lambda thermostat: thermostat.temperature,
+    FIELD_SET_POINT: lambda thermostat: (
+        thermostat.set_point_temp,
+        thermostat.min_temp,
+        thermostat.max_temp,
+    ),
+    FIELD_HEATING: lambda thermostat: (
+        thermostat.is_heating,
+        thermostat.is_early_start_of_heating,
+    ),
+    FIELD_LOAD: lambda thermostat: thermostat.load_measured_watt,
+    FIELD_MODE: lambda thermostat: thermostat.regulation_mode,
+    FIELD_ONLINE: lambda thermostat: thermostat.is_online,
+    FIELD_PRICE: lambda thermostat: thermostat.kwh_charge,
+    FIELD_VACATION: lambda thermostat: thermostat.vacation,
+}
+# Fields that are not part of the thermostat data, signalled on their own
+ALL_FIELDS = frozenset(
+    {
+        *THERMOSTAT_FIELDS,
+        FIELD_ENERGY,
+        FIELD_ANOMALY,
+        FIELD_SCHEDULED_SETPOINT,
+        FIELD_ESTIMATE,
+        FIELD_POLL,
+    }
+)
+
+
+@dataclass
+class RefreshScope:
+    """A group or a single thermostat refreshed on its own interval."""
+
+    interval: timedelta
+    group_id: int | None = None
+    serial_number: str | None = None
+    last_refresh: datetime | None = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> RefreshScope:
+        """Create a scope from its config entry options."""
+        return cls(
+            interval=timedelta(seconds=data[CONF_INTERVAL]),
+            group_id=data.get(CONF_GROUP_ID),
+            serial_number=data.get(CONF_SERIAL_NUMBER),
+        )
+
+    def contains(self, thermostat: Thermostat) -> bool:
+        """Return True if the thermostat belongs to this scope."""
+        if self.serial_number is not None:
+            return thermostat.serial_number == self.serial_number
+        return thermostat.group_id == self.group_id
+
+    def is_due(self, now: datetime) -> bool:
+        """Return True if the scope has to be refreshed."""
+        return (
+            self.last_refresh is None
+            or now - self.last_refresh >= self.interval - SCOPE_DUE_MARGIN
+        )
+
+
+@dataclass(frozen=True)
+class RefreshSettings:
+    """Intervals, timeout and offline handling of the refreshes."""
+
+    update_interval: timedelta = UPDATE_INTERVAL
+    energy_interval: timedelta = ENERGY_UPDATE_INTERVAL
+    # Seconds a request to the API may take
+    timeout: float = API_TIMEOUT
+    # Keep publishing offline thermostats with their estimated energy
+    offline_estimation: bool = False
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> RefreshSettings:
+        """Create the settings from the config entry options."""
+        return cls(
+            update_interval=timedelta(
+                seconds=options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+            ),
+            energy_interval=timedelta(
+                seconds=options.get(CONF_ENERGY_INTERVAL, DEFAULT_ENERGY_INTERVAL)
+            ),
+            timeout=options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT),
+            offline_estimation=options.get(CONF_OFFLINE_ESTIMATION, False),
+        )
+
+
+@dataclass
+class ScheduledSetpoint:
+    """A setpoint a thermostat has to reach by a given time."""
+
+    temperature: float
+    ready_by: datetime
+
+
+def shard_of(serial_number: str, shard_count: int) -> int:
+    """Return the shard a thermostat belongs to, stable across restarts."""
+    return zlib.crc32(serial_number.encode()) % shard_count
+
+
+class SchluterDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Class to manage fetching Schluter temperature data from API.
+
+    A refresh only fetches the thermostat list. The energy history needs one
+    request per thermostat and is fetched by a background task, so neither
+    the setup nor the regular poll waits for it. The history is retained for
+    a number of days per thermostat, a refresh only fetches the days since
+    the newest retained one.
+
+    Thermostats can be put into refresh scopes, by group or serial number,
+    with their own interval. Thermostats outside of any scope are refreshed
+    every update interval of the settings. A serial number scope is fetched
+    on its own when the list is not due anyway. The settings, like the
+    scopes, are applied to the running coordinator without a reload.
+
+    A large account is split over several shard coordinators, each keeping
+    the thermostats of its shard. Shards are refreshed in turn by the fleet,
+    and share the thermostat list fetched by the first of them.
+
+    Every poll feeds the heat-up rate model of the thermostats, which decides
+    when a scheduled setpoint is sent: as late as possible to still reach
+    the temperature in time.
+
+    Polls and energy histories also feed the anomaly detectors of the
+    thermostats, from the data fetched anyway without any extra request.
+
+    Entities are not woken up by every refresh. The coordinator compares
+    the fields of every replaced thermostat and sends a dispatcher signal
+    per serial number and changed field, entities subscribe to the fields
+    they render.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        account: SchluterAccount,
+        scopes: Iterable[RefreshScope] = (),
+        shard: tuple[int, int] = (0, 1),
+        tariff: Tariff | None = None,
+        history_days: int = DEFAULT_HISTORY_DAYS,
+        settings: RefreshSettings | None = None,
+        on_setpoints_change: Callable[[], None] | None = None,
+    ) -> None:
+        """Initialize.
+
+        on_setpoints_change is called whenever a setpoint is scheduled or
+        sent, so the scheduled setpoints can be stored.
+        """
+        self._account = account
+        self._settings = settings or RefreshSettings()
+        self._shard_index, self._shard_count = shard
+        self._api = account.api
+        self._counter = 0
+        self._history_days = history_days
+        self._energy_histories: dict[str, EnergyHistory] = {}
+        self._energy_usages: dict[str, list[DayEnergyUsage]] = {}
+        self._energy_updated: dict[str, datetime] = {}
+        self._tariff = tariff or Tariff()
+        self._cost_calculators: dict[str, EnergyCostCalculator] = {}
+        self._energy_costs: dict[str, list[float]] = {}
+        self._energy_task: asyncio.Task | None = None
+        self._scopes: list[RefreshScope] = list(scopes)
+        self._last_full_refresh: datetime | None = None
+        self.heat_up_models: dict[str, HeatUpRateModel] = {}
+        self.scheduled_setpoints: dict[str, ScheduledSetpoint] = {}
+        self._on_setpoints_change = on_setpoints_change
+        self._setpoint_tasks: set[asyncio.Task] = set()
+        self.anomaly_detectors: dict[str, AnomalyDetector] = {}
+        # Thermostats as last seen online, and the estimates of offline ones
+        self._last_online: dict[str, tuple[Thermostat, datetime]] = {}
+        self.offline_estimates: dict[str, OfflineEstimate] = {}
+        # Estimates of thermostats back online until the outage is fetched,
+        # and the energy in kWh they were off by
+        self._reconciling: dict[str, OfflineEstimate] = {}
+        self.estimate_errors: dict[str, float] = {}
+        # Energy in kWh used during the last outage, until the energy sensor
+        # of the thermostat corrected its total with it
+        self.outage_energy: dict[str, float] = {}
+        # Current day of every time zone of the thermostats
+        self.day_boundaries = DayBoundaries(hass, self._async_day_rollover)
+        # Thermostats and field values of the last signalled update
+        self._signalled: dict[str, tuple[Thermostat, tuple[Any, ...]]] = {}
+        self._signalled_success = True
+        # Thermostats of the last poll that were not signalled as polled yet
+        self._polled: set[str] = set()
+        # Phases of the last successful refreshes and energy rounds
+        self.refresh_timings: deque[RefreshTiming] = deque(maxlen=TIMINGS_KEPT)
+        self.energy_timings: deque[RefreshTiming] = deque(maxlen=TIMINGS_KEPT)
+        # Times of the last two successful polls, including unchanged ones
+        self.last_poll_time: datetime | None = None
+        self.previous_poll_time: datetime | None = None
+
+        # Refreshed by the orchestrator along with the other accounts
+        self._aligned = False
+        self._updates_held = False
+        self._update_pending = False
+
+        self.refresh_interval = self._scoped_update_interval()
+        _LOGGER.debug("Data will be update every %s", self.refresh_interval)
+
+        # An unchanged thermostats response is returned as the same object by
+        # the API, always_update=False then skips waking up the entities.
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN if shard[1] == 1 else f"{DOMAIN} shard {shard[0]}",
+            update_interval=self._own_update_interval(),
+            always_update=False,
+        )
+        # The coordinator is its own listener, which also keeps it polling
+        self._unsubscribe_signals = self.async_add_listener(
+            self._async_signal_changes
+        )
+
+    def _scoped_update_interval(self) -> timedelta:
+        """Poll as often as the most frequently refreshed scope needs."""
+        return min(
+            [
+                self._settings.update_interval,
+                *(scope.interval for scope in self._scopes),
+            ]
+        )
+
+    def _own_update_interval(self) -> timedelta | None:
+        """Shards do not poll on their own, the fleet refreshes them in turn.
+
+        Neither do aligned coordinators, the orchestrator refreshes them.
+        """
+        if self.is_shard or self._aligned:
+            return None
+        return self.refresh_interval
+
+    @property
+    def is_shard(self) -> bool:
+        """Return True if the coordinator holds one shard of the account."""
+        return self._shard_count > 1
+
+    def owns(self, serial_number: str) -> bool:
+        """Return True if the thermostat belongs to the shard."""
+        return (
+            not self.is_shard
+            or shard_of(serial_number, self._shard_count) == self._shard_index
+        )
+
+    def _list_max_age(self) -> timedelta | None:
+        """Shards refreshed in one round share the thermostat list."""
+        if not self.is_shard:
+            return None
+        return self.refresh_interval - SCOPE_DUE_MARGIN
+
+    def _own(self, thermostats: dict[str, Thermostat]) -> dict[str, Thermostat]:
+        """Return the thermostats of the shard."""
+        if not self.is_shard:
+            return thermostats
+        return {
+            serial_number: thermostat
+            for serial_number, thermostat in thermostats.items()
+            if self.owns(serial_number)
+        }
+
+    @callback
+    def async_set_refresh_scopes(self, scopes: Iterable[RefreshScope]) -> None:
+        """Replace the refresh scopes of the running coordinator."""
+        self._scopes = list(scopes)
+        self.refresh_interval = self._scoped_update_interval()
+        self.update_interval = self._own_update_interval()
+        _LOGGER.debug(
+            "Refresh scopes changed to %s, data will be updated every %s",
+            self._scopes,
+            self.refresh_interval,
+        )
+
+    @callback
+    def async_set_refresh_settings(self, settings: RefreshSettings) -> None:
+        """Apply other intervals and timeout to the running coordinator."""
+        if settings == self._settings:
+            return
+        self._settings = settings
+        self.refresh_interval = self._scoped_update_interval()
+        self.update_interval = self._own_update_interval()
+        _LOGGER.debug(
+            "Refresh settings changed to %s, data will be updated every %s",
+            settings,
+            self.refresh_interval,
+        )
+
+    @callback
+    def async_set_aligned(self, aligned: bool) -> None:
+        """Leave the polling to the orchestrator, or take it back."""
+        if aligned == self._aligned:
+            return
+        self._aligned = aligned
+        self.update_interval = self._own_update_interval()
+        if aligned:
+            self._async_unsub_refresh()
+        else:
+            self._schedule_refresh()
+
+    @callback
+    def async_hold_updates(self) -> None:
+        """Hold back the updates of the listeners until released."""
+        self._updates_held = True
+
+    @callback
+    def async_release_updates(self) -> None:
+        """Update the listeners once for the updates held back."""
+        self._updates_held = False
+        if self._update_pending:
+            self._update_pending = False
+            super().async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners, unless the updates are held back."""
+        if self._updates_held:
+            self._update_pending = True
+            return
+        super().async_update_listeners()
+
+    def _scope_for(self, thermostat: Thermostat) -> RefreshScope | None:
+        """Return the scope of a thermostat, a serial number scope wins."""
+        group_scope = None
+        for scope in self._scopes:
+            if scope.contains(thermostat):
+                if scope.serial_number is not None:
+                    return scope
+                group_scope = scope
+        return group_scope
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Update data via schluter library."""
+        now = dt_util.utcnow()
+        full_due = (
+            self.data is None
+            or self._last_full_refresh is None
+            or now - self._last_full_refresh
+            >= self._settings.update_interval - SCOPE_DUE_MARGIN
+        )
+        due_scopes = [scope for scope in self._scopes if scope.is_due(now)]
+        list_due = full_due or any(
+            scope.serial_number is None for scope in due_scopes
+        )
+
+        listed: dict[str, Thermostat] = {}
+        fetched: dict[str, Thermostat] = {}
+        timing = RefreshTiming(now)
+        try:
+            async with asyncio.timeout(self._settings.timeout):
+                sessionid = await self._account.async_ensure_sessionid()
+                timing.lap("auth")
+                if list_due:
+                    listed = self._own(
+                        await self._api.async_get_current_thermostats(
+                            sessionid, self._list_max_age()
+                        )
+                    )
+                else:
+                    for scope in due_scopes:
+                        if not self.owns(scope.serial_number):
+                            continue
+                        fetched[scope.serial_number] = (
+                            await self._api.async_get_thermostat(
+                                sessionid, scope.serial_number
+                            )
+                        )
+        except InvalidSessionIdError as err:
+            self._api.invalidate_sessionid()
+            raise ConfigEntryAuthFailed from err
+        except InvalidUserPasswordError as err:
+            raise ConfigEntryAuthFailed from err
+        except (ApiError, ClientConnectorError) as err:
+            raise UpdateFailed(err) from err
+        timing.lap("fetch")
+
+        if listed or fetched:
+            self.previous_poll_time = self.last_poll_time
+            self.last_poll_time = now
+        for thermostats in (listed, fetched):
+            for serial_number, thermostat in thermostats.items():
+                if thermostat.is_online:
+                    self._last_online[serial_number] = (thermostat, now)
+                # A list shared between shards may have been fetched earlier,
+                # a sample at the time of this poll would shorten its interval
+                sampled = thermostat.fetched_at or now
+                if (model := self.heat_up_models.get(serial_number)) is None:
+                    model = self.heat_up_models[serial_number] = HeatUpRateModel()
+                model.add_sample(
+                    sampled, thermostat.measured_temperature, thermostat.is_heating
+                )
+                if self._anomaly_detector(serial_number).add_sample(
+                    sampled,
+                    thermostat.measured_temperature,
+                    thermostat.is_heating,
+                    thermostat.load_measured_watt,
+                ):
+                    self._async_update_anomaly_issue(thermostat)
+                    self.async_signal_fields(serial_number, (FIELD_ANOMALY,))
+        timing.lap("models")
+        if full_due:
+            self._last_full_refresh = now
+        for scope in due_scopes:
+            scope.last_refresh = now
+
+        if self.data is None:
+            thermostats = listed
+        else:
+            for serial_number, thermostat in listed.items():
+                scope = self._scope_for(thermostat)
+                if (scope is None and full_due) or any(
+                    scope is due_scope for due_scope in due_scopes
+                ):
+                    fetched[serial_number] = thermostat
+            thermostats = self._merge(fetched)
+
+        if thermostats is not self.data:
+            for serial_number, thermostat in thermostats.items():
+                self._attach_energy(serial_number, thermostat)
+        self._async_update_estimates(thermostats, now)
+        self._polled = set(listed if self.data is None else fetched)
+        if thermostats is self.data:
+            # The listeners are not called without a change
+            self._async_signal_polled()
+        self._async_schedule_energy_refresh()
+        timing.lap("merge")
+        self._async_send_due_setpoints(thermostats, now)
+        timing.lap("setpoints")
+        self.refresh_timings.append(timing)
+        return thermostats
+
+    def thermostat(self, serial_number: str) -> Thermostat:
+        """Return a thermostat, as last seen online while it is estimated."""
+        if (estimate := self.offline_estimates.get(serial_number)) is not None:
+            return estimate.thermostat
+        return self.data[serial_number]
+
+    @callback
+    def _async_update_estimates(
+        self, thermostats: Mapping[str, Thermostat], now: datetime
+    ) -> None:
+        """Keep publishing the thermostats that went offline.
+
+        An offline thermostat is published as last seen online, with its
+        energy history continued from its hourly profile, for up to
+        OFFLINE_ESTIMATION_MAX_AGE. Once back online, its history is fetched
+        again and the estimate kept until the hours of the outage arrived.
+        """
+        for serial_number, thermostat in thermostats.items():
+            estimate = self.offline_estimates.get(serial_number)
+            if thermostat.is_online:
+                if estimate is not None:
+                    del self.offline_estimates[serial_number]
+                    self._reconciling[serial_number] = estimate
+                    self._energy_updated.pop(serial_number, None)
+                if serial_number in self._reconciling:
+                    # Rendered along with the online field that changed
+                    self._attach_energy(serial_number, thermostat)
+                continue
+            self._reconciling.pop(serial_number, None)
+            if estimate is None:
+                if not self._settings.offline_estimation or (
+                    last_online := self._last_online.get(serial_number)
+                ) is None:
+                    continue
+                estimate = self.offline_estimates[serial_number] = OfflineEstimate(
+                    *last_online,
+                    hourly_profile(self._energy_usages.get(serial_number) or ()),
+                )
+                _LOGGER.debug(
+                    "Thermostat %s is offline, estimating it since %s",
+                    serial_number,
+                    estimate.last_seen,
+                )
+            elif (
+                not self._settings.offline_estimation
+                or estimate.age(now) > OFFLINE_ESTIMATION_MAX_AGE
+            ):
+                del self.offline_estimates[serial_number]
+                self._last_online.pop(serial_number, None)
+                self.async_signal_fields(serial_number, (FIELD_ONLINE,))
+                continue
+            self._attach_energy(serial_number, estimate.thermostat)
+            self.async_signal_fields(serial_number, (FIELD_ENERGY, FIELD_ESTIMATE))
+
+    @callback
+    def async_signal_fields(self, serial_number: str, fields: Iterable[str]) -> None:
+        """Signal changed fields of a thermostat to the entities rendering them."""
+        changed = frozenset(fields)
+        for field in changed:
+            signal = SIGNAL_THERMOSTAT_UPDATE.format(serial_number, field)
+            async_dispatcher_send(self.hass, signal, changed)
+
+    @callback
+    def _async_signal_changes(self) -> None:
+        """Signal the fields changed by the last update of the data.
+
+        Thermostats that were not replaced are skipped without comparing
+        their fields.
+        """
+        if self.last_update_success != self._signalled_success:
+            # The availability of every entity changed
+            self._signalled_success = self.last_update_success
+            self._signalled.clear()
+        for serial_number, thermostat in (self.data or {}).items():
+            signalled = self._signalled.get(serial_number)
+            if signalled is not None and signalled[0] is thermostat:
+                continue
+            values = tuple(value(thermostat) for value in THERMOSTAT_FIELDS.values())
+            self._signalled[serial_number] = (thermostat, values)
+            if signalled is None:
+                self._polled.discard(serial_number)
+                self.async_signal_fields(serial_number, ALL_FIELDS)
+                continue
+            changed = [
+                field
+                for field, value, previous in zip(
+                    THERMOSTAT_FIELDS, values, signalled[1]
+                )
+                if value != previous
+            ]
+            if changed:
+                if serial_number in self._polled:
+                    self._polled.discard(serial_number)
+                    changed.append(FIELD_POLL)
+                self.async_signal_fields(serial_number, changed)
+        self._async_signal_polled()
+
+    @callback
+    def _async_signal_polled(self) -> None:
+        """Signal the polled thermostats that were not signalled with a change.
+
+        Entities integrating over time, like the energy sensor, sample on
+        every poll even when nothing changed.
+        """
+        for serial_number in self._polled:
+            self.async_signal_fields(serial_number, (FIELD_POLL,))
+        self._polled.clear()
+
+    def _merge(self, fetched: Mapping[str, Thermostat]) -> dict[str, Thermostat]:
+        """Return the data with the fetched thermostats replaced.
+
+        The current data is returned as is when nothing changed, so the
+        entities are not updated.
+        """
+        changed = {
+            serial_number: thermostat
+            for serial_number, thermostat in fetched.items()
+            if self.data.get(serial_number) is not thermostat
+        }
+        if not changed:
+            return self.data
+        return {**self.data, **changed}
+
+    async def async_refresh_thermostat(self, serial_number: str) -> None:
+        """Refresh a single thermostat, after a command was sent to it.
+
+        Only called on demand, the request goes ahead of the polls.
+        """
+        sessionid = await self._account.async_ensure_sessionid()
+        async with asyncio.timeout(self._settings.timeout):
+            thermostat = await self._api.async_get_thermostat(
+                sessionid, serial_number, RequestPriority.COMMAND
+            )
+        self._attach_energy(serial_number, thermostat)
+        self.async_set_updated_data(self._merge({serial_number: thermostat}))
+
+    async def async_refresh_scope(
+        self, group_id: int | None = None, serial_number: str | None = None
+    ) -> None:
+        """Refresh a group or a thermostat now, or everything without either."""
+        if serial_number is not None:
+            await self.async_refresh_thermostat(serial_number)
+            return
+        if group_id is None and not self.is_shard:
+            await self.async_refresh()
+            return
+        sessionid = await self._account.async_ensure_sessionid()
+        # Shards refreshed together still share one request for the list
+        async with asyncio.timeout(self._settings.timeout):
+            listed = await self._api.async_get_current_thermostats(
+                sessionid, SCOPE_DUE_MARGIN if self.is_shard else None
+            )
+        fetched = {
+            serial_number: thermostat
+            for serial_number, thermostat in self._own(listed).items()
+            if group_id is None or thermostat.group_id == group_id
+        }
+        for serial_number, thermostat in fetched.items():
+            self._attach_energy(serial_number, thermostat)
+        self.async_set_updated_data(self._merge(fetched))
+
+    async def _async_call_api(
+        self, action: str, call: Callable[[str], Awaitable[_T]]
+    ) -> _T:
+        """Call the API with a sessionid, raising HomeAssistantError on errors."""
+        try:
+            sessionid = await self._account.async_ensure_sessionid()
+            async with asyncio.timeout(self._settings.timeout):
+                return await call(sessionid)
+        except InvalidSessionIdError as err:
+            self._api.invalidate_sessionid()
+            raise HomeAssistantError(f"Session expired: {err}") from err
+        except (
+            ApiError,
+            InvalidUserPasswordError,
+            ClientConnectorError,
+            asyncio.TimeoutError,
+        ) as err:
+            raise HomeAssistantError(
+                f"Error {action}: {err or type(err).__name__}"
+            ) from err
+
+    async def async_set_temperature(
+        self, serial_number: str, temperature: float
+    ) -> None:
+        """Set the temperature of a thermostat, without refreshing it."""
+        await self._async_call_api(
+            "setting the temperature",
+            lambda sessionid: self._api.async_set_temperature(
+                sessionid, serial_number, temperature
+            ),
+        )
+
+    async def async_set_regulation_mode(
+        self, serial_number: str, regulation_mode: int
+    ) -> None:
+        """Set the regulation mode of a thermostat, without refreshing it."""
+        await self._async_call_api(
+            "setting the regulation mode",
+            lambda sessionid: self._api.async_set_regulation_mode(
+                sessionid, serial_number, regulation_mode
+            ),
+        )
+
+    async def async_set_vacation(
+        self, serial_number: str, vacation: Vacation | None
+    ) -> None:
+        """Start or end the vacation of a thermostat, without refreshing it."""
+
+        async def _async_set_vacation(sessionid: str) -> None:
+            if not await self._api.async_set_vacation(
+                sessionid, serial_number, vacation
+            ):
+                raise ApiError(f"Vacation of {serial_number} was not accepted")
+
+        await self._async_call_api("setting the vacation", _async_set_vacation)
+
+    async def async_get_schedule(
+        self, serial_number: str, refresh: bool = False
+    ) -> WeeklySchedule | None:
+        """Return the weekly schedule of a thermostat, cached by the API."""
+        return await self._async_call_api(
+            "reading the schedule",
+            lambda sessionid: self._api.async_get_schedule(
+                sessionid, serial_number, refresh
+            ),
+        )
+
+    async def async_set_schedule(
+        self, serial_number: str, schedule: WeeklySchedule
+    ) -> None:
+        """Replace the weekly schedule of a thermostat, unless it has it.
+
+        Only a schedule confirmed by the last poll counts as the current one.
+        """
+        if not await self._async_call_api(
+            "setting the schedule",
+            lambda sessionid: self._api.async_set_schedule(
+                sessionid, serial_number, schedule, self.refresh_interval
+            ),
+        ):
+            raise HomeAssistantError(f"Schedule of {serial_number} was not accepted")
+
+    def time_to_setpoint(
+        self, thermostat: Thermostat, temperature: float | None = None
+    ) -> timedelta | None:
+        """Predict how long the floor takes to reach its setpoint.
+
+        None when the heat-up rate of the floor is not known yet.
+        """
+        if (model := self.heat_up_models.get(thermostat.serial_number)) is None:
+            return None
+        return model.time_to_reach(
+            thermostat.measured_temperature,
+            thermostat.set_point_temp if temperature is None else temperature,
+        )
+
+    def _setpoint_start(
+        self, thermostat: Thermostat, setpoint: ScheduledSetpoint
+    ) -> datetime:
+        """Latest time to send a setpoint so it is reached by its deadline."""
+        duration = self.time_to_setpoint(thermostat, setpoint.temperature)
+        if duration is None:
+            duration = heat_up_time(
+                thermostat.measured_temperature,
+                setpoint.temperature,
+                DEFAULT_HEAT_UP_RATE,
+            )
+        return setpoint.ready_by - duration * HEAT_UP_MARGIN
+
+    @callback
+    def async_schedule_setpoint(
+        self, serial_number: str, temperature: float, ready_by: datetime
+    ) -> None:
+        """Reach temperature by ready_by, replacing an earlier schedule."""
+        self.scheduled_setpoints[serial_number] = ScheduledSetpoint(
+            temperature, ready_by
+        )
+        _LOGGER.debug(
+            "Thermostat %s scheduled to reach %s by %s",
+            serial_number,
+            temperature,
+            ready_by,
+        )
+        self.async_signal_fields(serial_number, (FIELD_SCHEDULED_SETPOINT,))
+        self._async_setpoints_changed()
+        self._async_send_due_setpoints(self.data, dt_util.utcnow())
+
+    @callback
+    def _async_setpoints_changed(self) -> None:
+        """Let the owner of the coordinator store the scheduled setpoints."""
+        if self._on_setpoints_change is not None:
+            self._on_setpoints_change()
+
+    @callback
+    def _async_send_due_setpoints(
+        self, thermostats: Mapping[str, Thermostat], now: datetime
+    ) -> None:
+        """Send the scheduled setpoints that have to start heating now.
+
+        The start is predicted again on every poll, from the temperature of
+        the floor at that time.
+        """
+        for serial_number, setpoint in list(self.scheduled_setpoints.items()):
+            if (thermostat := thermostats.get(serial_number)) is None:
+                continue
+            if now < self._setpoint_start(thermostat, setpoint):
+                continue
+            del self.scheduled_setpoints[serial_number]
+            self.async_signal_fields(serial_number, (FIELD_SCHEDULED_SETPOINT,))
+            self._async_setpoints_changed()
+            task = self.hass.async_create_background_task(
+                self._async_send_setpoint(serial_number, setpoint.temperature),
+                f"{DOMAIN} scheduled setpoint {serial_number}",
+            )
+            self._setpoint_tasks.add(task)
+            task.add_done_callback(self._setpoint_tasks.discard)
+
+    async def _async_send_setpoint(
+        self, serial_number: str, temperature: float
+    ) -> None:
+        """Send a scheduled setpoint to the thermostat."""
+        _LOGGER.debug(
+            "Sending scheduled setpoint %s to thermostat %s", temperature, serial_number
+        )
+        try:
+            sessionid = await self._account.async_ensure_sessionid()
+            async with asyncio.timeout(self._settings.timeout):
+                await self._api.async_set_temperature(
+                    sessionid, serial_number, temperature
+                )
+            await self.async_refresh_thermostat(serial_number)
+        except InvalidSessionIdError as err:
+            self._api.invalidate_sessionid()
+            _LOGGER.warning("Session expired while sending a setpoint: %s", err)
+        except (
+            ApiError,
+            InvalidUserPasswordError,
+            ClientConnectorError,
+            asyncio.TimeoutError,
+        ) as err:
+            _LOGGER.warning(
+                "Error sending the scheduled setpoint of %s: %s", serial_number, err
+            )
+
+    def _anomaly_detector(self, serial_number: str) -> AnomalyDetector:
+        """Return the anomaly detector of a thermostat."""
+        if (detector := self.anomaly_detectors.get(serial_number)) is None:
+            detector = self.anomaly_detectors[serial_number] = AnomalyDetector()
+        return detector
+
+    @callback
+    def _async_update_anomaly_issue(self, thermostat: Thermostat) -> None:
+        """Raise a repair issue while a floor heats without warming up."""
+        issue_id = f"heating_without_rise_{thermostat.serial_number}"
+        if self.anomaly_detectors[thermostat.serial_number].heating_without_rise:
+            ir.async_create_issue(
+                self.hass,
+                DOMAIN,
+                issue_id,
+                is_fixable=False,
+                severity=ir.IssueSeverity.WARNING,
+                translation_key="heating_without_rise",
+                translation_placeholders={"name": thermostat.name},
+            )
+        else:
+            ir.async_delete_issue(self.hass, DOMAIN, issue_id)
+
+    def _attach_energy(self, serial_number: str, thermostat: Thermostat) -> None:
+        """Attach the cached energy history and its costs to a thermostat.
+
+        The history of an estimated thermostat is continued up to now.
+        """
+        estimate = self.offline_estimates.get(serial_number) or self._reconciling.get(
+            serial_number
+        )
+        if estimate is not None and self._project_energy(
+            serial_number, thermostat, estimate
+        ):
+            return
+        thermostat.update_energy_usage(
+            self._energy_usages.get(serial_number),
+            self._energy_costs.get(serial_number),
+        )
+
+    def _project_energy(
+        self, serial_number: str, thermostat: Thermostat, estimate: OfflineEstimate
+    ) -> bool:
+        """Attach the estimated energy history, return False without one."""
+        history = self._energy_histories.get(serial_number)
+        if estimate.profile is None or history is None or history.newest is None:
+            return False
+        now = dt_util.now(thermostat.timezone)
+        usages = estimate.project(
+            self._energy_usages[serial_number], history.newest, now
+        )
+        # Priced in full, the running costs only take fetched hours
+        costs = EnergyCostCalculator().update(
+            now, usages, self._tariff.prices(thermostat.kwh_charge)
+        )
+        thermostat.update_energy_usage(usages, costs)
+        return True
+
+    def _update_energy_costs(self, serial_number: str, thermostat: Thermostat) -> None:
+        """Price the hours of the energy history that were not priced yet."""
+        if (calculator := self._cost_calculators.get(serial_number)) is None:
+            calculator = self._cost_calculators[serial_number] = EnergyCostCalculator()
+        self._energy_costs[serial_number] = calculator.update(
+            dt_util.now(thermostat.timezone),
+            self._energy_usages[serial_number],
+            self._tariff.prices(thermostat.kwh_charge),
+        )
+
+    def _reconcile(
+        self,
+        serial_number: str,
+        estimate: OfflineEstimate,
+        usages: list[DayEnergyUsage],
+        thermostat: Thermostat | None,
+    ) -> None:
+        """Compare the energy estimated for an outage with the fetched one."""
+        used_kwh = estimate.used_kwh(
+            usages, dt_util.now(thermostat.timezone if thermostat else None)
+        )
+        self.estimate_errors[serial_number] = estimate.projected_kwh - used_kwh
+        self.outage_energy[serial_number] = used_kwh
+        _LOGGER.debug(
+            "Thermostat %s used %.2f kWh while offline since %s, %.2f kWh estimated",
+            serial_number,
+            used_kwh,
+            estimate.last_seen,
+            estimate.projected_kwh,
+        )
+
+    @callback
+    def async_set_tariff(self, tariff: Tariff) -> None:
+        """Price the energy history with another tariff."""
+        if tariff == self._tariff:
+            return
+        self._tariff = tariff
+        for serial_number, thermostat in (self.data or {}).items():
+            if serial_number in self._energy_usages:
+                self._update_energy_costs(serial_number, thermostat)
+                self._attach_energy(serial_number, thermostat)
+                self.async_signal_fields(serial_number, (FIELD_ENERGY,))
+        # Update the totals of the groups and the account
+        self.async_update_listeners()
+
+    @callback
+    def async_set_history_days(self, history_days: int) -> None:
+        """Retain another number of days of energy history.
+
+        A shorter history is cut right away, a longer one is fetched with the
+        next refresh of the history.
+        """
+        if history_days == self._history_days:
+            return
+        self._history_days = history_days
+        for serial_number, history in self._energy_histories.items():
+            history.resize(history_days)
+            # The first fetch of the history may have failed
+            if len(history) < len(self._energy_usages.get(serial_number, ())):
+                self._energy_usages[serial_number] = history.usages()
+                if (thermostat := (self.data or {}).get(serial_number)) is not None:
+                    self._update_energy_costs(serial_number, thermostat)
+                    self._attach_energy(serial_number, thermostat)
+                    self.async_signal_fields(serial_number, (FIELD_ENERGY,))
+            else:
+                self._energy_updated.pop(serial_number, None)
+        self.async_update_listeners()
+
+    def _energy_interval(self, thermostat: Thermostat) -> timedelta:
+        """Thermostats in a slower scope get their history less often."""
+        energy_interval = self._settings.energy_interval
+        if (scope := self._scope_for(thermostat)) is None:
+            return energy_interval
+        return max(energy_interval, scope.interval)
+
+    @callback
+    def _async_schedule_energy_refresh(self) -> None:
+        """Start a background fetch of the energy history when it is due."""
+        if self._energy_task is not None and not self._energy_task.done():
+            return
+        now = dt_util.utcnow()
+        due = [
+            serial_number
+            for serial_number, thermostat in (self.data or {}).items()
+            if serial_number not in self._energy_updated
+            or now - self._energy_updated[serial_number]
+            >= self._energy_interval(thermostat) - SCOPE_DUE_MARGIN
+        ]
+        if not due:
+            return
+        self._energy_task = self.hass.async_create_background_task(
+            self._async_refresh_energy(due), f"{DOMAIN} energy refresh"
+        )
+
+    async def _async_refresh_energy(self, serial_numbers: list[str]) -> None:
+        """Fetch the energy history of the thermostats and push it out."""
+        timing = RefreshTiming(dt_util.utcnow())
+        try:
+            sessionid = await self._account.async_ensure_sessionid()
+            timing.lap("auth")
+            for serial_number in serial_numbers:
+                started = dt_util.utcnow()
+                if (history := self._energy_histories.get(serial_number)) is None:
+                    history = self._energy_histories[serial_number] = EnergyHistory(
+                        self._history_days
+                    )
+                thermostat = self.data.get(serial_number)
+                today = self.day_boundaries.today(
+                    thermostat.timezone if thermostat is not None else None
+                )
+                async with asyncio.timeout(self._settings.timeout):
+                    fetched = await self._api.async_get_energy_usage(
+                        sessionid, serial_number, history.days_to_fetch(today), today
+                    )
+                timing.lap("fetch")
+                # Only a fetched history counts, a failed one is due again with
+                # the next refresh
+                self._energy_updated[serial_number] = started
+                history.add(today, fetched)
+                usages = self._energy_usages[serial_number] = history.usages()
+                fields = [FIELD_ENERGY]
+                if (estimate := self._reconciling.pop(serial_number, None)) is not None:
+                    self._reconcile(serial_number, estimate, usages, thermostat)
+                    fields.append(FIELD_ESTIMATE)
+                if self._anomaly_detector(serial_number).add_energy_history(
+                    today, [usage.total_kwh for usage in usages]
+                ):
+                    fields.append(FIELD_ANOMALY)
+                if (thermostat := self.data.get(serial_number)) is not None:
+                    self._update_energy_costs(serial_number, thermostat)
+                    self._attach_energy(serial_number, thermostat)
+                    self.async_signal_fields(serial_number, fields)
+                timing.lap("process")
+            self.energy_timings.append(timing)
+        except StaleRequestError as err:
+            # The thermostat and the ones after it are fetched with the next
+            # refresh, once the API is less busy
+            _LOGGER.debug("Energy usage refresh postponed: %s", err)
+        except InvalidSessionIdError as err:
+            self._api.invalidate_sessionid()
+            _LOGGER.warning("Session expired while fetching energy usage: %s", err)
+        except (
+            ApiError,
+            InvalidUserPasswordError,
+            ClientConnectorError,
+            asyncio.TimeoutError,
+        ) as err:
+            _LOGGER.warning("Error fetching energy usage: %s", err)
+        finally:
+            # Update the totals of the groups and the account
+            if self._energy_usages:
+                self.async_update_listeners()
+            if (connection_stats := self._api.connection_stats) is not None:
+                _LOGGER.debug(
+                    "Schluter API connection statistics: %s",
+                    connection_stats.as_dict(),
+                )
+
+    @callback
+    def _async_day_rollover(self, time_zone: tzinfo | None) -> None:
+        """Fetch the new day of the thermostats in a time zone.
+
+        Their energy sensors reset once the history starts with the new day.
+        """
+        for serial_number, thermostat in (self.data or {}).items():
+            if thermostat.timezone == time_zone:
+                self._energy_updated.pop(serial_number, None)
+        self._async_schedule_energy_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Cancel a running energy refresh and the scheduled setpoints.
+
+        The stored setpoints are kept, they are scheduled again on setup.
+        """
+        await super().async_shutdown()
+        self._unsubscribe_signals()
+        self.day_boundaries.async_shutdown()
+        if self._energy_task is not None:
+            self._energy_task.cancel()
+        for task in self._setpoint_tasks:
+            task.cancel()
+        self.scheduled_setpoints.clear()
@@ -0,0 +1,111 @@
+"""Cost of the energy used by Schluter thermostats."""
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime, timedelta
+import re
+
+from .thermostat import DayEnergyUsage
+
+HOURS_PER_DAY = 24
+UNPRICED_DAY = (0.0,) * HOURS_PER_DAY
+
+# A time-of-use period as written in the options, like "07-23=0.15"
+PERIOD_PATTERN = re.compile(
+    r"^\s*(\d{1,2})\s*-\s*(\d{1,2})\s*=\s*(\d+(?:\.\d+)?)\s*$"
+)
+
+
+class Tariff:
+    """Price of a kWh by hour of the day.
+
+    Time-of-use periods run from their start hour up to, not including,
+    their end hour and may wrap around midnight. Hours outside of every
+    period are charged the flat price, the KwhCharge of the thermostat.
+    """
+
+    def __init__(self, periods: Iterable[tuple[int, int, float]] = ()) -> None:
+        """Initialize the tariff from (start hour, end hour, price) periods."""
+        self._periods = tuple(periods)
+        self._hourly: list[float | None] = [None] * HOURS_PER_DAY
+        for start, end, price in self._periods:
+            if not (0 <= start < HOURS_PER_DAY and 0 <= end <= HOURS_PER_DAY):
+                raise ValueError(f"Invalid period {start}-{end}")
+            hour = start
+            while True:
+                self._hourly[hour] = price
+                hour = (hour + 1) % HOURS_PER_DAY
+                if hour == end % HOURS_PER_DAY:
+                    break
+
+    @classmethod
+    def parse(cls, text: str | None) -> Tariff:
+        """Parse comma separated periods like "07-23=0.15, 23-07=0.08"."""
+        periods = []
+        for part in (text or "").split(","):
+            if not part.strip():
+                continue
+            if (match := PERIOD_PATTERN.match(part)) is None:
+                raise ValueError(f"Invalid period {part.strip()!r}")
+            periods.append(
+                (int(match.group(1)), int(match.group(2)), float(match.group(3)))
+            )
+        return cls(periods)
+
+    def prices(self, flat_price: float) -> tuple[float, ...]:
+        """Return the price of every hour of the day."""
+        return tuple(
+            flat_price if price is None else price for price in self._hourly
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Tariffs charging the same prices are equal."""
+        return isinstance(other, Tariff) and self._hourly == other._hourly
+
+
+class EnergyCostCalculator:
+    """Daily costs of the hourly usages of a thermostat.
+
+    The energy priced for every hour of a day is kept along with a running
+    cost per day. An update only prices the difference of the hours whose
+    energy changed since the last one: the current hour, which still grows,
+    and hours the API corrected afterwards.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the calculator without any priced hours."""
+        self._prices: tuple[float, ...] | None = None
+        # Per day, the energy priced for every hour of the day and its cost
+        self._days: dict[date, tuple[list[float], float]] = {}
+
+    def update(
+        self,
+        now: datetime,
+        day_energy_usages: Sequence[DayEnergyUsage],
+        prices: tuple[float, ...],
+    ) -> list[float]:
+        """Return the cost of every day of the usages, newest first.
+
+        The first usage is the one of the day of now.
+        """
+        if prices != self._prices:
+            self._prices = prices
+            self._days = {}
+
+        today = now.date()
+        days: dict[date, tuple[list[float], float]] = {}
+        costs = []
+        for index, day_energy_usage in enumerate(day_energy_usages):
+            day = today - timedelta(days=index)
+            priced, cost = self._days.get(day, (UNPRICED_DAY, 0.0))
+            hours = [0.0] * HOURS_PER_DAY
+            for usage in day_energy_usage.hour_usages:
+                hours[usage.time % HOURS_PER_DAY] = usage.energy_in_kwh
+            # Hours missing from a shortened history count as no energy
+            for hour, kwh in enumerate(hours):
+                if kwh != priced[hour]:
+                    cost += (kwh - priced[hour]) * prices[hour]
+            days[day] = (hours, cost)
+            costs.append(cost)
+        self._days = days
+        return costs
@@ -0,0 +1,69 @@
+"""Day boundaries in the time zones of the thermostats."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import date, datetime, time, timedelta, tzinfo
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+
+class DayBoundaries:
+    """The current day and its start per time zone, updated at midnight.
+
+    Reading the day is a lookup, the boundaries of a time zone are computed
+    when it is first asked for and again by a callback at its midnight,
+    which then calls on_rollover with the time zone. None stands for the
+    time zone of Home Assistant.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, on_rollover: Callable[[tzinfo | None], None]
+    ) -> None:
+        """Initialize without any time zone."""
+        self.hass = hass
+        self._on_rollover = on_rollover
+        self._days: dict[tzinfo | None, tuple[date, datetime]] = {}
+        self._cancel_rollovers: dict[tzinfo | None, CALLBACK_TYPE] = {}
+
+    def today(self, time_zone: tzinfo | None) -> date:
+        """Return the current day in a time zone."""
+        if (day := self._days.get(time_zone)) is None:
+            day = self._async_update(time_zone)
+        return day[0]
+
+    def midnight(self, time_zone: tzinfo | None) -> datetime:
+        """Return the start of the current day in a time zone."""
+        if (day := self._days.get(time_zone)) is None:
+            day = self._async_update(time_zone)
+        return day[1]
+
+    @callback
+    def _async_update(self, time_zone: tzinfo | None) -> tuple[date, datetime]:
+        """Compute the day of a time zone and wait for its next midnight."""
+        zone = time_zone or dt_util.DEFAULT_TIME_ZONE
+        today = dt_util.now(zone).date()
+        day = self._days[time_zone] = (
+            today,
+            datetime.combine(today, time(), tzinfo=zone),
+        )
+        next_midnight = datetime.combine(today + timedelta(days=1), time(), zone)
+
+        @callback
+        def _async_rollover(_now: datetime) -> None:
+            self._async_update(time_zone)
+            self._on_rollover(time_zone)
+
+        self._cancel_rollovers[time_zone] = async_track_point_in_utc_time(
+            self.hass, _async_rollover, dt_util.as_utc(next_midnight)
+        )
+        return day
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop waiting for the midnights."""
+        for cancel in self._cancel_rollovers.values():
+            cancel()
+        self._cancel_rollovers.clear()
+        self._days.clear()
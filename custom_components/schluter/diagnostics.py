@@ -0,0 +1,104 @@
+"""Diagnostics support for the schluter integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from . import SchluterData
+from .const import CONF_SERIAL_NUMBER, DOMAIN
+from .coordinator import SchluterDataUpdateCoordinator
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, CONF_SERIAL_NUMBER, "name", "group_name"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: SchluterData = hass.data[DOMAIN][entry.entry_id]
+    api = data.api
+    connection_stats = api.connection_stats
+    return async_redact_data(
+        {
+            "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+            "api": {
+                "response_cache": api.response_cache_stats,
+                "scheduler": api.scheduler_stats,
+                "payload_sizes": api.payload_stats,
+                "connections": (
+                    connection_stats.as_dict() if connection_stats else None
+                ),
+            },
+            "coordinators": [
+                _coordinator_diagnostics(coordinator)
+                for coordinator in data.coordinators
+            ],
+        },
+        TO_REDACT,
+    )
+
+
+def _coordinator_diagnostics(
+    coordinator: SchluterDataUpdateCoordinator,
+) -> dict[str, Any]:
+    """Return the state of a coordinator and its thermostats."""
+    thermostats = []
+    for serial_number, thermostat in (coordinator.data or {}).items():
+        model = coordinator.heat_up_models.get(serial_number)
+        detector = coordinator.anomaly_detectors.get(serial_number)
+        setpoint = coordinator.scheduled_setpoints.get(serial_number)
+        estimate = coordinator.offline_estimates.get(serial_number)
+        thermostats.append(
+            {
+                "serial_number": serial_number,
+                "name": thermostat.name,
+                "group_id": thermostat.group_id,
+                "group_name": thermostat.group_name,
+                "online": thermostat.is_online,
+                "heating": thermostat.is_heating,
+                "temperature": thermostat.temperature,
+                "set_point": thermostat.set_point_temp,
+                "regulation_mode": thermostat.regulation_mode,
+                "load_measured_watt": thermostat.load_measured_watt,
+                "energy_history_days": len(thermostat.day_energy_usages or ()),
+                "estimated_since": (
+                    estimate.last_seen.isoformat() if estimate else None
+                ),
+                "estimate_error_kwh": coordinator.estimate_errors.get(serial_number),
+                "heat_up_rate": model.rate if model else None,
+                "scheduled_setpoint": (
+                    {
+                        "temperature": setpoint.temperature,
+                        "ready_by": setpoint.ready_by.isoformat(),
+                    }
+                    if setpoint
+                    else None
+                ),
+                "anomalies": (
+                    {
+                        "heating_without_rise": detector.heating_without_rise,
+                        "load_drift": detector.load_drift,
+                        "energy_above_baseline": detector.energy_above_baseline,
+                    }
+                    if detector
+                    else None
+                ),
+            }
+        )
+    return {
+        "name": coordinator.name,
+        "last_update_success": coordinator.last_update_success,
+        "last_exception": (
+            repr(coordinator.last_exception) if coordinator.last_exception else None
+        ),
+        "refresh_interval": coordinator.refresh_interval.total_seconds(),
+        "refresh_timings": [
+            timing.as_dict() for timing in coordinator.refresh_timings
+        ],
+        "energy_timings": [timing.as_dict() for timing in coordinator.energy_timings],
+        "thermostats": thermostats,
+    }
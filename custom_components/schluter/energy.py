@@ -0,0 +1,83 @@
+"""Energy accounting helpers for Schluter thermostats."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta
+
+# Number of (timestamp, watt) samples kept for inspection. Only the last
+# sample is needed to integrate, the rest is kept for diagnostics.
+SAMPLE_BUFFER_SIZE = 60
+
+# Polls further apart than this are not integrated. A longer gap means HA was
+# stopped or the API could not be reached, and guessing the load over that
+# period would make the total drift.
+MAX_SAMPLE_GAP = timedelta(minutes=15)
+
+WATT_SECONDS_PER_KWH = 3_600_000
+
+
+class EnergyIntegrator:
+    """Time-weighted trapezoidal integration of a power reading into kWh."""
+
+    def __init__(
+        self,
+        total_kwh: float = 0.0,
+        max_gap: timedelta = MAX_SAMPLE_GAP,
+        buffer_size: int = SAMPLE_BUFFER_SIZE,
+    ) -> None:
+        """Initialize the integrator, optionally from a restored total."""
+        self._total_kwh = total_kwh
+        self._max_gap = max_gap.total_seconds()
+        self._samples: deque[tuple[datetime, float]] = deque(maxlen=buffer_size)
+
+    @property
+    def total_kwh(self) -> float:
+        """Energy accumulated so far in kWh."""
+        return self._total_kwh
+
+    @property
+    def samples(self) -> list[tuple[datetime, float]]:
+        """Most recent samples, oldest first."""
+        return list(self._samples)
+
+    def add_sample(self, timestamp: datetime, watts: float) -> float:
+        """Add a power sample and return the updated total in kWh.
+
+        The area between the previous and this sample is added to the total.
+        Samples that are out of order or further apart than the maximum gap
+        only start a new integration interval.
+        """
+        if self._samples:
+            last_timestamp, last_watts = self._samples[-1]
+            elapsed = (timestamp - last_timestamp).total_seconds()
+            if elapsed <= 0:
+                return self._total_kwh
+            if elapsed <= self._max_gap:
+                self._total_kwh += (
+                    (last_watts + watts) / 2 * elapsed / WATT_SECONDS_PER_KWH
+                )
+        self._samples.append((timestamp, watts))
+        return self._total_kwh
+
+    def add_energy(self, kwh: float) -> float:
+        """Add energy known from elsewhere and return the total in kWh.
+
+        Negative amounts are ignored, the total never decreases.
+        """
+        self._total_kwh += max(0.0, kwh)
+        return self._total_kwh
+
+    def hold(self, timestamp: datetime) -> float:
+        """Extend the last sample up to timestamp and return the total in kWh.
+
+        Used when the load is known to be unchanged up to timestamp. A gap
+        longer than the maximum, such as an outage or a restart, is not
+        integrated, as the load over it is not known after all.
+        """
+        if self._samples:
+            last_timestamp, last_watts = self._samples[-1]
+            elapsed = (timestamp - last_timestamp).total_seconds()
+            if 0 < elapsed <= self._max_gap:
+                self._total_kwh += last_watts * elapsed / WATT_SECONDS_PER_KWH
+                self._samples.append((timestamp, last_watts))
+        return self._total_kwh
@@ -0,0 +1,68 @@
+"""Base entity of the Schluter thermostats."""
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+
+from .const import SIGNAL_THERMOSTAT_UPDATE
+
+if TYPE_CHECKING:
+    from .coordinator import SchluterDataUpdateCoordinator
+
+
+class SchluterEntity(Entity):
+    """An entity rendering fields of a Schluter thermostat.
+
+    The entity subscribes to the change signals of the fields it renders
+    and is only updated when one of them changed, instead of on every
+    refresh of its coordinator.
+    """
+
+    _attr_should_poll = False
+    _signal_fields: tuple[str, ...] = ()
+
+    def __init__(
+        self, coordinator: SchluterDataUpdateCoordinator, thermostat_id: str
+    ) -> None:
+        """Initialize the entity of a thermostat."""
+        self.coordinator = coordinator
+        self._thermostat_id = thermostat_id
+
+    @property
+    def available(self) -> bool:
+        """Return True if the last refresh succeeded."""
+        return self.coordinator.last_update_success
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the fields rendered by the entity."""
+        await super().async_added_to_hass()
+        for field in self._signal_fields:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    SIGNAL_THERMOSTAT_UPDATE.format(self._thermostat_id, field),
+                    partial(self._handle_field_update, field),
+                )
+            )
+
+    @callback
+    def _handle_field_update(self, field: str, changed: frozenset[str]) -> None:
+        """Handle a changed field, once for all fields of the same update."""
+        rendered = [name for name in self._signal_fields if name in changed]
+        if rendered[0] == field:
+            self._handle_thermostat_update()
+
+    @callback
+    def _handle_thermostat_update(self) -> None:
+        """Handle updated fields of the thermostat."""
+        self.async_write_ha_state()
+
+    async def async_update(self) -> None:
+        """Refresh the thermostats, only used by the update entity service."""
+        if not self.enabled:
+            return
+        await self.coordinator.async_request_refresh()
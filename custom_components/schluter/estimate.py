@@ -0,0 +1,129 @@
+"""Estimates for Schluter thermostats that stopped reporting."""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from .thermostat import DayEnergyUsage, Thermostat
+
+HOURS_PER_DAY = 24
+WATTS_PER_KW = 1000
+
+
+def hourly_profile(
+    day_energy_usages: Sequence[DayEnergyUsage],
+) -> tuple[float, ...] | None:
+    """Return the average energy in kWh of every hour of the day.
+
+    The first usage is the day of the last fetch, which may still grow, only
+    the complete days after it are averaged. None without a complete day.
+    """
+    totals = [0.0] * HOURS_PER_DAY
+    days = 0
+    for day_energy_usage in day_energy_usages[1:]:
+        if len(day_energy_usage.hour_usages) < HOURS_PER_DAY:
+            continue
+        days += 1
+        for usage in day_energy_usage.hour_usages[:HOURS_PER_DAY]:
+            totals[usage.time % HOURS_PER_DAY] += usage.energy_in_kwh
+    if not days:
+        return None
+    return tuple(total / days for total in totals)
+
+
+def _day_energy_usage(hours: Sequence[float]) -> DayEnergyUsage:
+    """Return a day of hourly usages in kWh, in the order of the API."""
+    return DayEnergyUsage(
+        {"Usage": [{"EnergyKWattHour": kwh} for kwh in reversed(hours)]}
+    )
+
+
+@dataclass(slots=True)
+class OfflineEstimate:
+    """The last known state of a thermostat that went offline.
+
+    The thermostat is the one of the last poll that saw it online. Its
+    energy history is continued from the average hour of the day of the
+    history, until the history of the outage is fetched again.
+    """
+
+    thermostat: Thermostat
+    last_seen: datetime
+    profile: tuple[float, ...] | None = None
+    # Energy in kWh of the hours projected since the thermostat was last seen
+    projected_kwh: float = 0.0
+
+    def age(self, now: datetime) -> timedelta:
+        """Return the time since the thermostat was last seen online."""
+        return now - self.last_seen
+
+    def power(self, now: datetime) -> float | None:
+        """Return the average power in W of the hour of now, if known."""
+        if self.profile is None:
+            return None
+        return self.profile[now.hour] * WATTS_PER_KW
+
+    def project(
+        self,
+        day_energy_usages: Sequence[DayEnergyUsage],
+        newest: date,
+        now: datetime,
+    ) -> list[DayEnergyUsage]:
+        """Return the usages with the hours since last seen projected.
+
+        The usages start with the day newest, now is in the time zone of
+        the thermostat. The projected usages start with the day of now and
+        keep the number of days.
+        """
+        if self.profile is None:
+            return list(day_energy_usages)
+        since = self.last_seen.astimezone(now.tzinfo)
+        today = now.date()
+        known: list[DayEnergyUsage | None] = [None] * (today - newest).days
+        known.extend(day_energy_usages)
+        projected_kwh = 0.0
+        usages = []
+        for index, day_energy_usage in enumerate(known[: len(day_energy_usages)]):
+            day = today - timedelta(days=index)
+            if day_energy_usage is not None and day < since.date():
+                usages.append(day_energy_usage)
+                continue
+            first = since.hour if day == since.date() else 0
+            hours = []
+            if day_energy_usage is not None:
+                hours = [
+                    usage.energy_in_kwh
+                    for usage in day_energy_usage.hour_usages[:first]
+                ]
+            hours.extend([0.0] * (first - len(hours)))
+            for hour in range(first, now.hour + 1 if index == 0 else HOURS_PER_DAY):
+                kwh = self.profile[hour]
+                if index == 0 and hour == now.hour:
+                    # The current hour is only partly over
+                    kwh *= (now.minute * 60 + now.second) / 3600
+                hours.append(kwh)
+                projected_kwh += kwh
+            usages.append(_day_energy_usage(hours))
+        self.projected_kwh = projected_kwh
+        return usages
+
+    def used_kwh(
+        self, day_energy_usages: Sequence[DayEnergyUsage], now: datetime
+    ) -> float:
+        """Return the energy in kWh used since last seen, per fetched usages.
+
+        The usages start with the day of now, in the time zone of the
+        thermostat.
+        """
+        since = self.last_seen.astimezone(now.tzinfo)
+        used = 0.0
+        for index, day_energy_usage in enumerate(day_energy_usages):
+            day = now.date() - timedelta(days=index)
+            if day < since.date():
+                break
+            first = since.hour if day == since.date() else 0
+            used += sum(
+                usage.energy_in_kwh for usage in day_energy_usage.hour_usages[first:]
+            )
+        return used
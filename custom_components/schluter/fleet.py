@@ -0,0 +1,244 @@
+"""Thermostats of an account spread over one or more coordinators."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import dataclasses
+from datetime import datetime, timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_HISTORY_DAYS, DOMAIN
+from .coordinator import RefreshScope, RefreshSettings, SchluterDataUpdateCoordinator
+from .cost import Tariff
+
+if TYPE_CHECKING:
+    from .account import SchluterAccount
+
+_LOGGER = logging.getLogger(__name__)
+
+SETPOINTS_STORAGE_VERSION = 1
+SETPOINTS_SAVE_DELAY = 10
+
+
+def setpoints_storage_key(entry_id: str) -> str:
+    """Key of the stored scheduled setpoints of a config entry."""
+    return f"{DOMAIN}.{entry_id}.setpoints"
+
+
+class SchluterFleet:
+    """The coordinators of an account.
+
+    A regular account has a single coordinator polling on its own. With
+    more than one shard, every coordinator keeps the thermostats of its
+    shard and the fleet refreshes one shard per tick, so a round over all
+    shards takes the refresh interval. The work of a refresh, and the
+    energy history fetched after it, is spread over the interval instead of
+    waking up every entity of the account at once.
+
+    With a storage key, the scheduled setpoints of every shard are stored
+    and scheduled again by the first refresh after a restart.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        account: SchluterAccount,
+        scopes: Iterable[RefreshScope] = (),
+        shard_count: int = 1,
+        tariff: Tariff | None = None,
+        history_days: int = DEFAULT_HISTORY_DAYS,
+        settings: RefreshSettings | None = None,
+        storage_key: str | None = None,
+    ) -> None:
+        """Initialize the coordinators of the shards."""
+        self.hass = hass
+        self._setpoint_store: Store[dict[str, dict[str, Any]]] | None = None
+        if storage_key is not None:
+            self._setpoint_store = Store(
+                hass, SETPOINTS_STORAGE_VERSION, storage_key
+            )
+        self._stored_setpoints: dict[str, dict[str, Any]] = {}
+        scopes = list(scopes)
+        # Every shard tracks the last refresh of the scopes on its own
+        self.coordinators = [
+            SchluterDataUpdateCoordinator(
+                hass,
+                account,
+                [dataclasses.replace(scope) for scope in scopes],
+                (index, shard_count),
+                tariff,
+                history_days,
+                settings,
+                self._async_setpoints_changed,
+            )
+            for index in range(shard_count)
+        ]
+        self._next_shard = 0
+        self._refreshing = False
+        self._cancel_timer: CALLBACK_TYPE | None = None
+
+    @property
+    def shard_count(self) -> int:
+        """Number of coordinators of the fleet."""
+        return len(self.coordinators)
+
+    @property
+    def refresh_interval(self) -> timedelta:
+        """Time a round over every shard takes."""
+        return self.coordinators[0].refresh_interval
+
+    @property
+    def last_update_success(self) -> bool:
+        """Return True if the last refresh of every shard succeeded."""
+        return all(
+            coordinator.last_update_success for coordinator in self.coordinators
+        )
+
+    @property
+    def last_exception(self) -> Exception | None:
+        """Error of the first shard that failed to refresh."""
+        for coordinator in self.coordinators:
+            if not coordinator.last_update_success:
+                return coordinator.last_exception
+        return None
+
+    async def async_config_entry_first_refresh(self) -> None:
+        """Refresh every shard for the first time and start the rotation."""
+        for coordinator in self.coordinators:
+            await coordinator.async_config_entry_first_refresh()
+        await self.async_restore_setpoints()
+        self.async_start()
+
+    async def async_restore_setpoints(self) -> None:
+        """Schedule the stored setpoints again on the shards of their thermostat.
+
+        Setpoints whose time passed while Home Assistant was not running, or
+        of thermostats no longer in the account, are dropped.
+        """
+        if self._setpoint_store is None:
+            return
+        stored = await self._setpoint_store.async_load() or {}
+        now = dt_util.utcnow()
+        for serial_number, setpoint in stored.items():
+            ready_by = dt_util.parse_datetime(setpoint["ready_by"])
+            if ready_by is None or ready_by <= now:
+                _LOGGER.debug("Dropping the stored setpoint of %s", serial_number)
+                continue
+            for coordinator in self.coordinators:
+                if serial_number in (coordinator.data or {}):
+                    coordinator.async_schedule_setpoint(
+                        serial_number, setpoint["temperature"], ready_by
+                    )
+        self._async_setpoints_changed()
+
+    @callback
+    def _async_setpoints_changed(self) -> None:
+        """Store the scheduled setpoints of every shard.
+
+        The setpoints are copied right away, the coordinators clear theirs
+        on shutdown and that must not reach the store.
+        """
+        if self._setpoint_store is None:
+            return
+        self._stored_setpoints = {
+            serial_number: {
+                "temperature": setpoint.temperature,
+                "ready_by": setpoint.ready_by.isoformat(),
+            }
+            for coordinator in self.coordinators
+            for serial_number, setpoint in coordinator.scheduled_setpoints.items()
+        }
+        self._setpoint_store.async_delay_save(
+            lambda: self._stored_setpoints, SETPOINTS_SAVE_DELAY
+        )
+
+    async def async_refresh(self) -> None:
+        """Refresh every shard now."""
+        for coordinator in self.coordinators:
+            await coordinator.async_refresh()
+
+    @callback
+    def async_set_refresh_scopes(self, scopes: Iterable[RefreshScope]) -> None:
+        """Replace the refresh scopes of every shard."""
+        scopes = list(scopes)
+        for coordinator in self.coordinators:
+            coordinator.async_set_refresh_scopes(
+                [dataclasses.replace(scope) for scope in scopes]
+            )
+        if self._cancel_timer is not None:
+            self.async_stop()
+            self.async_start()
+
+    @callback
+    def async_set_refresh_settings(self, settings: RefreshSettings) -> None:
+        """Apply other intervals and timeout to every shard."""
+        for coordinator in self.coordinators:
+            coordinator.async_set_refresh_settings(settings)
+        if self._cancel_timer is not None:
+            self.async_stop()
+            self.async_start()
+
+    @callback
+    def async_set_aligned(self, aligned: bool) -> None:
+        """Leave the polling of a single shard to the orchestrator."""
+        for coordinator in self.coordinators:
+            coordinator.async_set_aligned(aligned)
+
+    @callback
+    def async_set_tariff(self, tariff: Tariff) -> None:
+        """Price the energy history of every shard with another tariff."""
+        for coordinator in self.coordinators:
+            coordinator.async_set_tariff(tariff)
+
+    @callback
+    def async_set_history_days(self, history_days: int) -> None:
+        """Retain another number of days of energy history in every shard."""
+        for coordinator in self.coordinators:
+            coordinator.async_set_history_days(history_days)
+
+    @callback
+    def async_start(self) -> None:
+        """Refresh the shards in turn, evenly spread over the interval."""
+        if self.shard_count == 1 or self._cancel_timer is not None:
+            return
+        interval = self.coordinators[0].refresh_interval / self.shard_count
+        _LOGGER.debug(
+            "Refreshing %s shards in turn, one every %s", self.shard_count, interval
+        )
+        self._cancel_timer = async_track_time_interval(
+            self.hass,
+            self._async_refresh_next,
+            interval,
+            name=f"{DOMAIN} fleet refresh",
+            cancel_on_shutdown=True,
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop refreshing the shards."""
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+
+    async def _async_refresh_next(self, _now: datetime) -> None:
+        """Refresh the next shard, unless the previous one is still busy."""
+        if self._refreshing:
+            return
+        coordinator = self.coordinators[self._next_shard]
+        self._next_shard = (self._next_shard + 1) % self.shard_count
+        self._refreshing = True
+        try:
+            await coordinator.async_refresh()
+        finally:
+            self._refreshing = False
+
+    async def async_shutdown(self) -> None:
+        """Stop the rotation and shut down every shard."""
+        self.async_stop()
+        for coordinator in self.coordinators:
+            await coordinator.async_shutdown()
@@ -0,0 +1,90 @@
+"""Heat-up rate model of a Schluter heated floor."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta
+
+# Number of heating intervals kept. At one poll per minute this covers the
+# last four hours of heating, which spans several heat-up cycles.
+HEAT_UP_BUFFER_SIZE = 256
+
+# Polls further apart than this do not tell how fast the floor heats up
+MAX_SAMPLE_GAP = timedelta(minutes=15)
+
+# Heating time observed before the rate is trusted
+MIN_HEATING_TIME = timedelta(minutes=30)
+
+SECONDS_PER_HOUR = 3600
+
+
+class HeatUpRateModel:
+    """Rate a floor heats up at, learned from the polled temperatures.
+
+    Only the intervals between two polls that start while heating are kept,
+    as the temperature rise and the duration of the interval. Running totals
+    make adding a sample and reading the rate constant time.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = HEAT_UP_BUFFER_SIZE,
+        max_gap: timedelta = MAX_SAMPLE_GAP,
+        min_heating_time: timedelta = MIN_HEATING_TIME,
+    ) -> None:
+        """Initialize an empty model."""
+        self._intervals: deque[tuple[float, float]] = deque(maxlen=buffer_size)
+        self._max_gap = max_gap.total_seconds()
+        self._min_heating_time = min_heating_time.total_seconds()
+        self._rise_total = 0.0
+        self._seconds_total = 0.0
+        self._last: tuple[datetime, float, bool] | None = None
+
+    @property
+    def heating_time(self) -> timedelta:
+        """Heating time the rate is learned from."""
+        return timedelta(seconds=self._seconds_total)
+
+    @property
+    def rate(self) -> float | None:
+        """Temperature rise while heating in degrees per hour, if known."""
+        if self._seconds_total < self._min_heating_time or self._rise_total <= 0:
+            return None
+        return self._rise_total / self._seconds_total * SECONDS_PER_HOUR
+
+    def add_sample(
+        self, timestamp: datetime, temperature: float, heating: bool
+    ) -> None:
+        """Add a polled temperature and whether the floor was heating."""
+        if self._last is not None:
+            last_timestamp, last_temperature, last_heating = self._last
+            elapsed = (timestamp - last_timestamp).total_seconds()
+            if elapsed <= 0:
+                return
+            if last_heating and elapsed <= self._max_gap:
+                if len(self._intervals) == self._intervals.maxlen:
+                    rise, seconds = self._intervals[0]
+                    self._rise_total -= rise
+                    self._seconds_total -= seconds
+                rise = temperature - last_temperature
+                self._intervals.append((rise, elapsed))
+                self._rise_total += rise
+                self._seconds_total += elapsed
+        self._last = (timestamp, temperature, heating)
+
+    def time_to_reach(self, temperature: float, target: float) -> timedelta | None:
+        """Return how long heating from temperature to target takes.
+
+        None when the rate is not known yet.
+        """
+        if temperature >= target:
+            return timedelta()
+        if (rate := self.rate) is None:
+            return None
+        return heat_up_time(temperature, target, rate)
+
+
+def heat_up_time(temperature: float, target: float, rate: float) -> timedelta:
+    """Time to heat from temperature to target at rate degrees per hour."""
+    if temperature >= target:
+        return timedelta()
+    return timedelta(hours=(target - temperature) / rate)
@@ -0,0 +1,72 @@
+"""Retained energy history of Schluter thermostats."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Sequence
+from datetime import date
+from itertools import islice
+
+from .thermostat import DayEnergyUsage
+
+
+class EnergyHistory:
+    """Daily energy usages of a thermostat over a retention horizon.
+
+    The days are kept in a ring buffer of a fixed capacity, today first. A
+    refresh only fetches the days since the newest retained one, which it
+    fetches again as its last hours may have changed, and adding days to a
+    full buffer evicts the oldest ones.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty history of capacity days."""
+        self._days: deque[DayEnergyUsage] = deque(maxlen=capacity)
+        self._newest: date | None = None
+        # Whether the whole horizon was requested, after a start or a resize
+        self._complete = False
+
+    @property
+    def capacity(self) -> int:
+        """Number of days retained."""
+        return self._days.maxlen or 0
+
+    @property
+    def newest(self) -> date | None:
+        """Day of the first usage, None while the history is empty."""
+        return self._newest
+
+    def __len__(self) -> int:
+        """Return the number of retained days."""
+        return len(self._days)
+
+    def resize(self, capacity: int) -> None:
+        """Retain another number of days, keeping the newest ones."""
+        if capacity == self.capacity:
+            return
+        if capacity > self.capacity:
+            self._complete = False
+        self._days = deque(islice(self._days, capacity), maxlen=capacity)
+
+    def days_to_fetch(self, today: date) -> int:
+        """Return the number of days, today included, the next refresh needs."""
+        if not self._complete or self._newest is None:
+            return self.capacity
+        return max(1, min(self.capacity, (today - self._newest).days + 1))
+
+    def add(self, today: date, usages: Sequence[DayEnergyUsage]) -> None:
+        """Add the usages fetched for days_to_fetch days, today first."""
+        shift = None if self._newest is None else (today - self._newest).days
+        if not self._complete or shift is None or not 0 <= shift < len(usages):
+            # The whole horizon, or days that do not join the retained ones
+            self._days.clear()
+            shift = 0
+        # Drop the retained days that were fetched again
+        for _ in range(min(len(self._days), len(usages) - shift)):
+            self._days.popleft()
+        self._days.extendleft(reversed(usages[: self.capacity]))
+        self._newest = today
+        self._complete = True
+
+    def usages(self) -> list[DayEnergyUsage]:
+        """Return the retained usages, today first."""
+        return list(self._days)
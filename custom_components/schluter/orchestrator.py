@@ -0,0 +1,112 @@
+"""Refreshes of several Schluter accounts aligned on one timer."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_ORCHESTRATOR, DOMAIN
+from .coordinator import SCOPE_DUE_MARGIN
+from .fleet import SchluterFleet
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RefreshOrchestrator:
+    """Refreshes the accounts that opted in together.
+
+    Every account otherwise polls on its own timer and writes the states of
+    its entities on its own. The orchestrator refreshes every due account on
+    a single timer, with their requests running concurrently, and holds
+    back the updates of their coordinators until all of them are done. The
+    entity states of all accounts are then written in one pass.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the orchestrator without any account."""
+        self.hass = hass
+        # Aligned fleets and the time of their last refresh
+        self._fleets: dict[SchluterFleet, datetime] = {}
+        self._cancel_timer: CALLBACK_TYPE | None = None
+        self._refreshing = False
+
+    @property
+    def fleets(self) -> list[SchluterFleet]:
+        """Fleets refreshed by the orchestrator."""
+        return list(self._fleets)
+
+    @callback
+    def async_add(self, fleet: SchluterFleet) -> None:
+        """Take over the polling of a fleet that was just refreshed."""
+        fleet.async_set_aligned(True)
+        self._fleets.setdefault(fleet, dt_util.utcnow())
+        self.async_reschedule()
+
+    @callback
+    def async_remove(self, fleet: SchluterFleet) -> None:
+        """Hand the polling back to a fleet."""
+        if self._fleets.pop(fleet, None) is None:
+            return
+        fleet.async_set_aligned(False)
+        self.async_reschedule()
+
+    @callback
+    def async_reschedule(self) -> None:
+        """Tick as often as the fleet with the shortest interval needs."""
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+        if not self._fleets:
+            return
+        interval = min(fleet.refresh_interval for fleet in self._fleets)
+        _LOGGER.debug(
+            "Refreshing %s accounts together every %s", len(self._fleets), interval
+        )
+        self._cancel_timer = async_track_time_interval(
+            self.hass,
+            self._async_refresh_due,
+            interval,
+            name=f"{DOMAIN} aligned refresh",
+            cancel_on_shutdown=True,
+        )
+
+    async def _async_refresh_due(self, now: datetime) -> None:
+        """Refresh the due fleets and write their updates in one pass."""
+        if self._refreshing:
+            return
+        due = [
+            fleet
+            for fleet, last_refresh in self._fleets.items()
+            if now - last_refresh >= fleet.refresh_interval - SCOPE_DUE_MARGIN
+        ]
+        if not due:
+            return
+        coordinators = [
+            coordinator for fleet in due for coordinator in fleet.coordinators
+        ]
+        self._refreshing = True
+        for coordinator in coordinators:
+            coordinator.async_hold_updates()
+        try:
+            await asyncio.gather(*(fleet.async_refresh() for fleet in due))
+        finally:
+            for fleet in due:
+                if fleet in self._fleets:
+                    self._fleets[fleet] = now
+            # No await from here on, every listener runs in the same pass
+            for coordinator in coordinators:
+                coordinator.async_release_updates()
+            self._refreshing = False
+
+
+@callback
+def async_get_orchestrator(hass: HomeAssistant) -> RefreshOrchestrator:
+    """Return the orchestrator of the integration, creating it if needed."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if (orchestrator := data.get(DATA_ORCHESTRATOR)) is None:
+        orchestrator = data[DATA_ORCHESTRATOR] = RefreshOrchestrator(hass)
+    return orchestrator
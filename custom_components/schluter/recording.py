@@ -0,0 +1,196 @@
+"""Recording of the Schluter API traffic and its replay, for offline tests.
+
+A recording is a gzip compressed file of JSON lines, one exchange per line,
+with the credentials, session ids and email addresses redacted.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+import gzip
+import json
+from pathlib import Path
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+REDACTED = "**REDACTED**"
+# Keys redacted from request parameters, request bodies and response bodies
+REDACT_KEYS = frozenset({"sessionId", "SessionId", "Email", "Password"})
+# Response headers the API client looks at
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def _redact(data: Any) -> Any:
+    """Return JSON data with the values of REDACT_KEYS replaced."""
+    if isinstance(data, Mapping):
+        return {
+            key: REDACTED if key in REDACT_KEYS else _redact(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [_redact(value) for value in data]
+    return data
+
+
+def _redact_body(body: bytes) -> str:
+    """Return a response body with its JSON redacted and compacted."""
+    text = body.decode()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+    return json.dumps(_redact(data), separators=(",", ":"))
+
+
+@dataclass
+class Exchange:
+    """A request to the API and its response."""
+
+    # Seconds from the start of the recording to the request
+    at: float
+    # Seconds from the request to the response
+    latency: float
+    method: str
+    path: str
+    params: dict[str, Any]
+    json: Any
+    status: int
+    headers: dict[str, str]
+    body: str
+
+    @property
+    def key(self) -> tuple[str, str, Any]:
+        """Requests are replayed in order per method, path and thermostat."""
+        return self.method, self.path, self.params.get("serialnumber")
+
+
+class ApiRecorder:
+    """Collects the exchanges of a SchluterApi while recording."""
+
+    def __init__(self) -> None:
+        """Start a recording."""
+        self._start = time.monotonic()
+        self.exchanges: list[Exchange] = []
+
+    def record(
+        self,
+        method: str,
+        path: str,
+        request: Mapping[str, Any],
+        started: float,
+        status: int,
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> None:
+        """Add an exchange, started at the monotonic time started."""
+        self.exchanges.append(
+            Exchange(
+                at=round(started - self._start, 3),
+                latency=round(time.monotonic() - started, 3),
+                method=method,
+                path=path,
+                params=_redact(dict(request.get("params") or {})),
+                json=_redact(request.get("json")),
+                status=status,
+                headers={
+                    name: headers[name] for name in RECORDED_HEADERS if name in headers
+                },
+                body=_redact_body(body),
+            )
+        )
+
+    def save(self, path: Path | str) -> None:
+        """Write the recording to a file, doing blocking I/O."""
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            for exchange in self.exchanges:
+                file.write(json.dumps(asdict(exchange), separators=(",", ":")))
+                file.write("\n")
+
+
+def load_exchanges(path: Path | str) -> list[Exchange]:
+    """Read the exchanges of a recording, doing blocking I/O."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return [Exchange(**json.loads(line)) for line in file if line.strip()]
+
+
+class ReplayError(Exception):
+    """Raised when a recording has no response for a request."""
+
+
+class ReplayResponse:
+    """The recorded response, with the interface of an aiohttp response."""
+
+    def __init__(self, exchange: Exchange) -> None:
+        """Initialize."""
+        self.status = exchange.status
+        self.headers = exchange.headers
+        self._body = exchange.body.encode()
+
+    async def read(self) -> bytes:
+        """Return the body."""
+        return self._body
+
+    async def json(self) -> Any:
+        """Return the body decoded from JSON."""
+        return json.loads(self._body)
+
+
+class ReplaySession:
+    """Answers the requests of a SchluterApi from a recording.
+
+    Responses are handed out in the recorded order per method, path and
+    thermostat, so concurrent requests get the same responses on every run.
+    At full speed the responses come right away, in real time each one
+    takes the latency it had while recording. With loop, the responses of a
+    request start over once all of them were replayed.
+    """
+
+    def __init__(
+        self,
+        exchanges: Iterable[Exchange],
+        realtime: bool = False,
+        loop: bool = False,
+    ) -> None:
+        """Initialize the replay of the exchanges."""
+        self._exchanges: dict[tuple[str, str, Any], list[Exchange]] = {}
+        for exchange in exchanges:
+            self._exchanges.setdefault(exchange.key, []).append(exchange)
+        self._pending = {
+            key: deque(exchanges) for key, exchanges in self._exchanges.items()
+        }
+        self._realtime = realtime
+        self._loop = loop
+        self.requests = 0
+
+    @classmethod
+    def from_file(
+        cls, path: Path | str, realtime: bool = False, loop: bool = False
+    ) -> ReplaySession:
+        """Replay a recording file, doing blocking I/O."""
+        return cls(load_exchanges(path), realtime, loop)
+
+    def _next(self, key: tuple[str, str, Any]) -> Exchange:
+        """Return the next response for a request."""
+        if (pending := self._pending.get(key)) is None:
+            raise ReplayError(f"No recorded response for {key}")
+        if not pending:
+            if not self._loop:
+                raise ReplayError(f"All recorded responses for {key} were replayed")
+            pending.extend(self._exchanges[key])
+        return pending.popleft()
+
+    @asynccontextmanager
+    async def request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> AsyncIterator[ReplayResponse]:
+        """Answer a request with its next recorded response."""
+        self.requests += 1
+        params = kwargs.get("params") or {}
+        exchange = self._next((method, urlsplit(url).path, params.get("serialnumber")))
+        if self._realtime:
+            await asyncio.sleep(exchange.latency)
+        yield ReplayResponse(exchange)
@@ -0,0 +1,127 @@
+"""Weekly schedule (program) of Schluter thermostats."""
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from datetime import time
+from typing import Any
+
+# Days of the schedule, WeekDayGrpNo 1 to 7 in the API
+WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+# Events the thermostat holds per day
+MAX_EVENTS_PER_DAY = 6
+
+
+@dataclass(frozen=True)
+class ScheduleEvent:
+    """A setpoint the thermostat switches to at a time of the day.
+
+    The schedule type is the slot of the event in the day.
+    """
+
+    clock: time
+    temperature: float
+    schedule_type: int = 0
+    active: bool = True
+    next_day: bool = False
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> ScheduleEvent:
+        """Parse an event of the API."""
+        return cls(
+            time.fromisoformat(data["Clock"]),
+            data["Temperature"] / 100,
+            data["ScheduleType"],
+            data["Active"],
+            data.get("EventIsOnNextDay", False),
+        )
+
+    def as_json(self) -> dict[str, Any]:
+        """Return the event as the API takes it."""
+        return {
+            "ScheduleType": self.schedule_type,
+            "Clock": self.clock.isoformat(timespec="seconds"),
+            "Temperature": round(self.temperature * 100),
+            "Active": self.active,
+            "EventIsOnNextDay": self.next_day,
+        }
+
+
+@dataclass(frozen=True)
+class WeeklySchedule:
+    """The events of every day of the week, from Monday to Sunday.
+
+    Schedules with the same events are equal, which is how a schedule
+    is found unchanged.
+    """
+
+    days: tuple[tuple[ScheduleEvent, ...], ...]
+
+    def __post_init__(self) -> None:
+        """Check there is a day for every weekday."""
+        if len(self.days) != len(WEEKDAYS):
+            raise ValueError(f"A schedule has {len(WEEKDAYS)} days")
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> WeeklySchedule:
+        """Parse the Schedule of a thermostat of the API."""
+        days: list[tuple[ScheduleEvent, ...]] = [()] * len(WEEKDAYS)
+        for day in data["Days"]:
+            days[day["WeekDayGrpNo"] - 1] = tuple(
+                ScheduleEvent.from_json(event) for event in day["Events"]
+            )
+        return cls(tuple(days))
+
+    @classmethod
+    def from_dict(
+        cls, data: Mapping[str, Sequence[Mapping[str, Any]]]
+    ) -> WeeklySchedule:
+        """Build a schedule from events with a time and a temperature per day.
+
+        The events of a day are numbered in the order of their times.
+        """
+        return cls(
+            tuple(
+                tuple(
+                    ScheduleEvent(event["time"], event["temperature"], index)
+                    for index, event in enumerate(
+                        sorted(data.get(weekday, ()), key=lambda e: e["time"])
+                    )
+                )
+                for weekday in WEEKDAYS
+            )
+        )
+
+    def as_json(self) -> dict[str, Any]:
+        """Return the schedule as the API takes it."""
+        return {
+            "Days": [
+                {
+                    "WeekDayGrpNo": number,
+                    "Events": [event.as_json() for event in events],
+                }
+                for number, events in enumerate(self.days, start=1)
+            ]
+        }
+
+    def as_dict(self) -> dict[str, list[dict[str, Any]]]:
+        """Return the active events of every day, as the services take them."""
+        return {
+            weekday: [
+                {
+                    "time": event.clock.isoformat(timespec="minutes"),
+                    "temperature": event.temperature,
+                }
+                for event in events
+                if event.active
+            ]
+            for weekday, events in zip(WEEKDAYS, self.days)
+        }
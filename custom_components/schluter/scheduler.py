@@ -0,0 +1,117 @@
+"""Priority scheduling of the requests to the Schluter API."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from enum import IntEnum
+import heapq
+import itertools
+
+
+class RequestPriority(IntEnum):
+    """Priority classes of the requests, the lowest value goes first."""
+
+    COMMAND = 0
+    POLL = 1
+    BACKFILL = 2
+
+
+class StaleRequestError(Exception):
+    """Raised when a request waited so long its result is of no use anymore."""
+
+
+class RequestScheduler:
+    """Hands out the request slots by priority.
+
+    At most max_concurrency requests are in flight. A freed slot goes to the
+    waiting request of the highest priority, first come first served within
+    a priority. Polls and backfills leave one slot to commands, so a command
+    never waits for a whole fan-out of history requests. A request given a
+    max_wait fails with StaleRequestError when it waited longer than that.
+    """
+
+    def __init__(self, max_concurrency: int) -> None:
+        """Initialize the scheduler with max_concurrency slots."""
+        self._max_concurrency = max_concurrency
+        self._in_flight = 0
+        self._waiting: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self.stale_requests = 0
+
+    @property
+    def max_concurrency(self) -> int:
+        """Number of requests in flight at most."""
+        return self._max_concurrency
+
+    def set_max_concurrency(self, max_concurrency: int) -> None:
+        """Change the number of slots, in flight requests are not cut off."""
+        self._max_concurrency = max_concurrency
+        self._start_waiting()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests holding a slot."""
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting for a slot."""
+        return sum(not future.done() for _, _, future in self._waiting)
+
+    def _limit(self, priority: int) -> int:
+        """Number of slots a request of the priority may use."""
+        if priority == RequestPriority.COMMAND or self._max_concurrency == 1:
+            return self._max_concurrency
+        return self._max_concurrency - 1
+
+    def _start_waiting(self) -> None:
+        """Hand out the free slots to the waiting requests, by priority."""
+        while self._waiting:
+            priority, _, future = self._waiting[0]
+            if future.done():
+                heapq.heappop(self._waiting)
+            elif self._in_flight < self._limit(priority):
+                heapq.heappop(self._waiting)
+                self._in_flight += 1
+                future.set_result(None)
+            else:
+                # Requests of a lower priority may use fewer slots still
+                return
+
+    def _release(self) -> None:
+        """Free a slot for the next waiting request."""
+        self._in_flight -= 1
+        self._start_waiting()
+
+    @asynccontextmanager
+    async def slot(
+        self, priority: RequestPriority, max_wait: timedelta | None = None
+    ) -> AsyncIterator[None]:
+        """Hold a request slot, waiting for one by priority."""
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._order), future))
+        self._start_waiting()
+        if not future.done():
+            try:
+                async with asyncio.timeout(
+                    None if max_wait is None else max_wait.total_seconds()
+                ):
+                    await future
+            except (asyncio.CancelledError, TimeoutError) as err:
+                if future.done() and not future.cancelled():
+                    # The slot was handed over right before giving up
+                    self._release()
+                else:
+                    future.cancel()
+                if isinstance(err, TimeoutError):
+                    self.stale_requests += 1
+                    raise StaleRequestError(
+                        f"Request waited longer than {max_wait} for a slot"
+                    ) from err
+                raise
+        try:
+            yield
+        finally:
+            self._release()
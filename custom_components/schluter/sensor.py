@@ -1,353 +1,532 @@
 """Break out the temperature of the thermostat into a separate sensor entity."""
-from .api import Thermostat
-from typing import Optional
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, replace
 import logging
+from typing import TYPE_CHECKING
 
+from .energy import EnergyIntegrator
 from .thermostat import EnergyCalculationDuration
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.const import UnitOfTemperature, UnitOfEnergy, UnitOfPower
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.typing import StateType
+from homeassistant.util import dt as dt_util
 
 from . import SchluterData
-from .const import DOMAIN, ZERO_WATTS
+from .const import (
+    ATTR_ESTIMATED,
+    ATTR_LAST_SEEN,
+    DOMAIN,
+    FIELD_ENERGY,
+    FIELD_ESTIMATE,
+    FIELD_HEATING,
+    FIELD_LOAD,
+    FIELD_ONLINE,
+    FIELD_POLL,
+    FIELD_PRICE,
+    FIELD_SET_POINT,
+    FIELD_TEMPERATURE,
+)
+from .entity import SchluterEntity
+
+if TYPE_CHECKING:
+    from .aggregate import SchluterAggregator, ThermostatTotals
+    from .coordinator import SchluterDataUpdateCoordinator
+    from .estimate import OfflineEstimate
+    from .thermostat import Thermostat
 
-from datetime import datetime, date
 
 _LOGGER = logging.getLogger(__name__)
 
-def get_todays_midnight():
-    today = date.today()
-    return datetime.combine(today, datetime.min.time())
+ENERGY_USAGE_DAYS = {
+    EnergyCalculationDuration.DAY: 1,
+    EnergyCalculationDuration.WEEK: 7,
+    EnergyCalculationDuration.MONTH: 30,
+}
 
-async def async_setup_entry(hass, config_entry, async_add_entities):
-    """Add sensors for passed config_entry in HA."""
-    data: SchluterData = hass.data[DOMAIN][config_entry.entry_id]
 
-    # await data.coordinator.async_config_entry_first_refresh()
+def _energy_cost(thermostat: Thermostat, number_of_days: int) -> float:
+    """Sum the daily costs of the last number_of_days days."""
+    return sum(thermostat.day_energy_costs[:number_of_days])
 
-    # Add the Temperature Sensor
-    async_add_entities(
-        SchluterTemperatureSensor(data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
-    )
 
-    # Add the Target Temperature Sensor
-    async_add_entities(
-        SchluterTargetTemperatureSensor(data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
+def _energy_used(thermostat: Thermostat, number_of_days: int) -> float:
+    """Sum the daily usages of the last number_of_days days."""
+    return sum(
+        day_energy_usage.total_kwh
+        for day_energy_usage in thermostat.day_energy_usages[:number_of_days]
     )
 
-    # Add the Power Sensor
-    async_add_entities(
-        SchluterPowerSensor(data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
-    )
 
-    # Add the price per kwh Sensor
-    async_add_entities(
-        SchluterEnergyPriceSensor(data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
-    )
+@dataclass(frozen=True, kw_only=True)
+class SchluterSensorEntityDescription(SensorEntityDescription):
+    """Describes a Schluter thermostat sensor."""
 
-    # Add the virtual/calculated KwH Sensor
-    async_add_entities(
-        SchluterEnergySensor(data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
+    value_fn: Callable[[Thermostat], StateType] = lambda thermostat: None
+    available_fn: Callable[[Thermostat], bool] = lambda thermostat: (
+        thermostat.is_online
+    )
+    # Fields of the thermostat the value and the availability depend on
+    signal_fields: tuple[str, ...] = (FIELD_ONLINE,)
+    # Unique ids predate the entity descriptions and are kept as they were
+    unique_id_fn: Callable[[Thermostat, SchluterSensorEntityDescription], str] = (
+        lambda thermostat, description: f"{thermostat.name}-{description.key}"
     )
-    
 
-    for energy_type in EnergyCalculationDuration:
-        async_add_entities(
-            ThermostatSensor(data.coordinator, thermostat_id, energy_type)
-            for thermostat_id in data.coordinator.data
-        )
 
+SENSOR_DESCRIPTIONS: tuple[SchluterSensorEntityDescription, ...] = (
+    SchluterSensorEntityDescription(
+        key="temperature",
+        name="Current Temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda thermostat: thermostat.temperature,
+        signal_fields=(FIELD_TEMPERATURE, FIELD_ONLINE),
+    ),
+    SchluterSensorEntityDescription(
+        key="target-temperature",
+        name="Target Temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda thermostat: thermostat.set_point_temp,
+        signal_fields=(FIELD_SET_POINT, FIELD_ONLINE),
+    ),
+    SchluterSensorEntityDescription(
+        key="power",
+        name="Power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda thermostat: thermostat.power,
+        signal_fields=(FIELD_HEATING, FIELD_LOAD, FIELD_ONLINE),
+    ),
+    SchluterSensorEntityDescription(
+        key="monetary",
+        name="Price",
+        native_unit_of_measurement="$/kWh",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda thermostat: thermostat.kwh_charge,
+        signal_fields=(FIELD_PRICE, FIELD_ONLINE),
+    ),
+)
 
-class SchluterTargetTemperatureSensor(
-    CoordinatorEntity[DataUpdateCoordinator], SensorEntity
-):
-    """Representation of a Sensor."""
+ENERGY_DESCRIPTION = SchluterSensorEntityDescription(
+    key="energy",
+    name="Energy",
+    native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+    device_class=SensorDeviceClass.ENERGY,
+    state_class=SensorStateClass.TOTAL_INCREASING,
+    suggested_display_precision=2,
+    # Sampled on every poll, so the energy of a steady load is recorded in the
+    # hour it was used
+    signal_fields=(FIELD_POLL, FIELD_HEATING, FIELD_LOAD, FIELD_ONLINE, FIELD_ESTIMATE),
+)
 
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_state_class = SensorStateClass.MEASUREMENT
+ENERGY_USAGE_DESCRIPTIONS: tuple[SchluterSensorEntityDescription, ...] = tuple(
+    SchluterSensorEntityDescription(
+        key=energy_type.value,
+        name=name,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        # Only today's energy grows until it resets at midnight. The rolling
+        # windows drop a day at midnight instead, like the costs.
+        state_class=(
+            SensorStateClass.TOTAL_INCREASING
+            if energy_type is EnergyCalculationDuration.DAY
+            else None
+        ),
+        entity_category=EntityCategory.DIAGNOSTIC,
+        suggested_display_precision=2,
+        value_fn=lambda thermostat, days=ENERGY_USAGE_DAYS[energy_type]: (
+            _energy_used(thermostat, days)
+        ),
+        available_fn=lambda thermostat: (
+            thermostat.is_online and thermostat.day_energy_usages is not None
+        ),
+        signal_fields=(FIELD_ENERGY, FIELD_ONLINE),
+        unique_id_fn=lambda thermostat, description: (
+            f"{thermostat.serial_number}-{description.key}"
+        ),
+    )
+    for energy_type, name in (
+        (EnergyCalculationDuration.DAY, "Energy Used Today"),
+        (EnergyCalculationDuration.WEEK, "Energy Used Last 7 Days"),
+        (EnergyCalculationDuration.MONTH, "Energy Used Last 30 Days"),
+    )
+)
 
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
-        thermostat_id: str,
-    ) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._attr_name = coordinator.data[thermostat_id].name + " Target Temperature"
-        self._thermostat_id = thermostat_id
-        self._attr_unique_id = (
-            f"{coordinator.data[thermostat_id].name}-target-{self._attr_device_class}"
-        )
 
-    @property
-    def available(self) -> bool:
-        """Return True if Schluter thermostat is available."""
-        return self.coordinator.data[self._thermostat_id].is_online
+ENERGY_COST_PERIODS = (
+    (EnergyCalculationDuration.DAY, "Energy Cost Today"),
+    (EnergyCalculationDuration.WEEK, "Energy Cost Last 7 Days"),
+    (EnergyCalculationDuration.MONTH, "Energy Cost Last 30 Days"),
+)
 
-    @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
+ENERGY_COST_DESCRIPTIONS: tuple[SchluterSensorEntityDescription, ...] = tuple(
+    SchluterSensorEntityDescription(
+        key=f"cost-{energy_type.value}",
+        name=name,
+        device_class=SensorDeviceClass.MONETARY,
+        # Only today's cost resets, at midnight. The rolling windows drop a
+        # day at midnight instead, they are plain values without statistics.
+        state_class=(
+            SensorStateClass.TOTAL
+            if energy_type is EnergyCalculationDuration.DAY
+            else None
+        ),
+        suggested_display_precision=2,
+        value_fn=lambda thermostat, days=ENERGY_USAGE_DAYS[energy_type]: (
+            _energy_cost(thermostat, days)
+        ),
+        available_fn=lambda thermostat: (
+            thermostat.is_online and thermostat.day_energy_costs is not None
+        ),
+        signal_fields=(FIELD_ENERGY, FIELD_ONLINE),
+        unique_id_fn=lambda thermostat, description: (
+            f"{thermostat.serial_number}-{description.key}"
+        ),
+    )
+    for energy_type, name in ENERGY_COST_PERIODS
+)
 
-    @property
-    def native_value(self) -> float:
-        """Return the state of the sensor."""
-        return self.coordinator.data[self._thermostat_id].set_point_temp
 
+@dataclass(frozen=True, kw_only=True)
+class SchluterAggregateSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor totalling the thermostats of a group or account."""
 
-class SchluterTemperatureSensor(CoordinatorEntity[DataUpdateCoordinator], SensorEntity):
-    """Representation of a Sensor."""
+    value_fn: Callable[[ThermostatTotals], StateType]
+    available_fn: Callable[[ThermostatTotals], bool] = lambda totals: (
+        totals.online > 0
+    )
 
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_state_class = SensorStateClass.MEASUREMENT
 
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
-        thermostat_id: str,
-    ) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._attr_name = coordinator.data[thermostat_id].name + " Current Temperature"
-        self._thermostat_id = thermostat_id
-        self._attr_unique_id = (
-            f"{coordinator.data[thermostat_id].name}-{self._attr_device_class}"
+AGGREGATE_SENSOR_DESCRIPTIONS: tuple[SchluterAggregateSensorEntityDescription, ...] = (
+    SchluterAggregateSensorEntityDescription(
+        key="power",
+        name="Power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda totals: totals.power,
+    ),
+    SchluterAggregateSensorEntityDescription(
+        key="heating",
+        name="Thermostats Heating",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda totals: totals.heating,
+    ),
+    SchluterAggregateSensorEntityDescription(
+        key="average-temperature",
+        name="Average Temperature",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda totals: totals.average_temperature,
+    ),
+    *(
+        SchluterAggregateSensorEntityDescription(
+            key=description.key,
+            name=description.name,
+            native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            device_class=SensorDeviceClass.ENERGY,
+            state_class=description.state_class,
+            suggested_display_precision=2,
+            value_fn=lambda totals, index=index: totals.energy[index],
+            available_fn=lambda totals: totals.has_energy,
         )
+        for index, description in enumerate(ENERGY_USAGE_DESCRIPTIONS)
+    ),
+)
 
-    @property
-    def available(self) -> bool:
-        """Return True if Schluter thermostat is available."""
-        return self.coordinator.data[self._thermostat_id].is_online
-
-    @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
-
-    @property
-    def native_value(self) -> float:
-        """Return the state of the sensor."""
-        return self.coordinator.data[self._thermostat_id].temperature
-
+AGGREGATE_COST_DESCRIPTIONS: tuple[
+    SchluterAggregateSensorEntityDescription, ...
+] = tuple(
+    SchluterAggregateSensorEntityDescription(
+        key=description.key,
+        name=description.name,
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=description.state_class,
+        suggested_display_precision=2,
+        value_fn=lambda totals, index=index: totals.cost[index],
+        available_fn=lambda totals: totals.has_cost,
+    )
+    for index, description in enumerate(ENERGY_COST_DESCRIPTIONS)
+)
 
-class SchluterPowerSensor(CoordinatorEntity[DataUpdateCoordinator], SensorEntity):
-    """Representation of a Sensor."""
 
-    _attr_native_unit_of_measurement = UnitOfPower.WATT
-    _attr_device_class = SensorDeviceClass.POWER
-    _attr_state_class = SensorStateClass.MEASUREMENT
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    """Add sensors for passed config_entry in HA."""
+    # pylint: disable=import-outside-toplevel
+    from .aggregate import SchluterAggregator
 
-    def __init__(
-        self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
-        thermostat_id: str,
-    ) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._attr_name = coordinator.data[thermostat_id].name + " Power"
-        self._thermostat_id = thermostat_id
-        self._attr_unique_id = (
-            f"{coordinator.data[thermostat_id].name}-{self._attr_device_class}"
+    data: SchluterData = hass.data[DOMAIN][config_entry.entry_id]
+    currency = hass.config.currency
+    cost_descriptions = [
+        replace(description, native_unit_of_measurement=currency)
+        for description in ENERGY_COST_DESCRIPTIONS
+    ]
+
+    aggregate_descriptions = [
+        *AGGREGATE_SENSOR_DESCRIPTIONS,
+        *(
+            replace(description, native_unit_of_measurement=currency)
+            for description in AGGREGATE_COST_DESCRIPTIONS
+        ),
+    ]
+
+    # Register every sensor in one batch, each call to async_add_entities
+    # schedules its own round of entity registry and state writes.
+    entities: list[SensorEntity] = []
+    group_names: dict[int, str] = {}
+    for coordinator in data.coordinators:
+        for thermostat_id, thermostat in coordinator.data.items():
+            group_names[thermostat.group_id] = thermostat.group_name
+            entities.extend(
+                SchluterSensor(coordinator, thermostat_id, description)
+                for description in SENSOR_DESCRIPTIONS
+            )
+            entities.append(
+                SchluterEnergySensor(coordinator, thermostat_id, ENERGY_DESCRIPTION)
+            )
+            entities.extend(
+                SchluterEnergyUsageSensor(coordinator, thermostat_id, description)
+                for description in (*ENERGY_USAGE_DESCRIPTIONS, *cost_descriptions)
+            )
+
+    # One aggregator sums up the thermostats for every group and account sensor
+    aggregator = SchluterAggregator(data.coordinators)
+    account_id = config_entry.unique_id or config_entry.entry_id
+    entities.extend(
+        SchluterAggregateSensor(
+            aggregator, None, f"account-{account_id}", config_entry.title, description
         )
+        for description in aggregate_descriptions
+    )
+    for group_id, group_name in group_names.items():
+        entities.extend(
+            SchluterAggregateSensor(
+                aggregator, group_id, f"group-{group_id}", group_name, description
+            )
+            for description in aggregate_descriptions
+        )
+    async_add_entities(entities)
 
-    @property
-    def available(self) -> bool:
-        """Return True if Schluter thermostat is available."""
-        return self.coordinator.data[self._thermostat_id].is_online
-
-    @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
-
-    @property
-    def native_value(self) -> int:
-        """Return the state of the sensor."""
-        if self.coordinator.data[self._thermostat_id].is_heating:
-            return self.coordinator.data[self._thermostat_id].load_measured_watt
-        return ZERO_WATTS
 
+class SchluterSensor(SchluterEntity, SensorEntity):
+    """A sensor showing one value of a Schluter thermostat.
 
-class SchluterEnergySensor(CoordinatorEntity[DataUpdateCoordinator], SensorEntity):
-    """Representation of a PowerSensor."""
+    The thermostat of the latest refresh is looked up once per update of the
+    fields the sensor renders, and the state is computed from it, instead of
+    on every property read.
+    """
 
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.TOTAL
+    entity_description: SchluterSensorEntityDescription
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
+        coordinator: SchluterDataUpdateCoordinator,
         thermostat_id: str,
-        values=60,
+        description: SchluterSensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._attr_name = coordinator.data[thermostat_id].name + " Energy"
-        self._thermostat_id = thermostat_id
-        self._attr_unique_id = (
-            f"{coordinator.data[thermostat_id].name}-{self._attr_device_class}"
-        )
-        self._wattage_list = []
-        self._values = values
-
-    def add(self, watt):
-        """Queue a number wattage for kwh calculation."""
-        self._wattage_list.insert(0, watt)
-        if len(self._wattage_list) == self._values:
-            self._wattage_list.pop()
+        super().__init__(coordinator, thermostat_id)
+        self.entity_description = description
+        self._signal_fields = description.signal_fields
+        self._thermostat: Thermostat = coordinator.data[thermostat_id]
+        self._attr_name = f"{self._thermostat.name} {description.name}"
+        self._attr_unique_id = description.unique_id_fn(self._thermostat, description)
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, thermostat_id)})
+        self._refresh_thermostat()
+
+    def _refresh_thermostat(self) -> None:
+        """Cache the thermostat of the latest refresh and update the state."""
+        self._thermostat = self.coordinator.thermostat(self._thermostat_id)
+        self._attr_extra_state_attributes = None
+        if estimate := self.coordinator.offline_estimates.get(self._thermostat_id):
+            self._attr_extra_state_attributes = {
+                ATTR_ESTIMATED: True,
+                ATTR_LAST_SEEN: estimate.last_seen.isoformat(),
+            }
+        if self.coordinator.last_update_success and (
+            self.entity_description.available_fn(self._thermostat)
+        ):
+            self._update_from_thermostat()
+
+    def _update_from_thermostat(self) -> None:
+        """Compute the state from the cached thermostat."""
+        self._attr_native_value = self.entity_description.value_fn(self._thermostat)
+
+    @callback
+    def _handle_thermostat_update(self) -> None:
+        """Handle updated fields of the thermostat."""
+        self._refresh_thermostat()
+        super()._handle_thermostat_update()
 
     @property
     def available(self) -> bool:
         """Return True if Schluter thermostat is available."""
-        return self.coordinator.data[self._thermostat_id].is_online
-
-    @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
-
-    @property
-    def native_value(self) -> float:
-        """Return the state of the sensor."""
-        if self.coordinator.data[self._thermostat_id].is_heating:
-            self.add(self.coordinator.data[self._thermostat_id].load_measured_watt)
-        return round((sum(self._wattage_list) / self._values) / 1000, 2)
-
+        return super().available and self.entity_description.available_fn(
+            self._thermostat
+        )
 
-class SchluterEnergyPriceSensor(CoordinatorEntity[DataUpdateCoordinator], SensorEntity):
-    """Representation of a Sensor."""
 
-    _attr_native_unit_of_measurement = "$/kWh"
-    _attr_device_class = SensorDeviceClass.MONETARY
-    _attr_state_class = SensorStateClass.TOTAL
+class SchluterEnergySensor(SchluterSensor, RestoreSensor):
+    """Energy consumed by the floor, integrated from the measured load."""
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
+        coordinator: SchluterDataUpdateCoordinator,
         thermostat_id: str,
+        description: SchluterSensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._attr_name = coordinator.data[thermostat_id].name + " Price"
-        self._thermostat_id = thermostat_id
-        self._attr_unique_id = (
-            f"{coordinator.data[thermostat_id].name}-{self._attr_device_class}"
-        )
+        self._integrator = EnergyIntegrator()
+        # Outage being estimated, and the energy integrated for it
+        self._estimate: OfflineEstimate | None = None
+        self._estimated_kwh = 0.0
+        super().__init__(coordinator, thermostat_id, description)
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the accumulated energy and take the first sample."""
+        await super().async_added_to_hass()
+        if (last_data := await self.async_get_last_sensor_data()) is not None:
+            try:
+                total_kwh = float(last_data.native_value)
+            except (TypeError, ValueError):
+                total_kwh = 0.0
+            self._integrator = EnergyIntegrator(total_kwh)
+        self._add_sample()
+
+    def _add_sample(self) -> None:
+        """Feed the current load of the thermostat to the integrator."""
+        # The load of the last sample was confirmed up to the poll before
+        # this one.
+        if (previous_poll_time := self.coordinator.previous_poll_time) is not None:
+            self._integrator.hold(previous_poll_time)
+        watts = self._thermostat.power
+        estimate = self.coordinator.offline_estimates.get(self._thermostat_id)
+        if estimate is not None and estimate is not self._estimate:
+            self._estimate = estimate
+            self._estimated_kwh = 0.0
+        total_kwh = self._integrator.total_kwh
+        if estimate is not None and (
+            power := estimate.power(dt_util.now(self._thermostat.timezone))
+        ) is not None:
+            # The offline thermostat draws its average for the hour of the day
+            watts = power
+        self._integrator.add_sample(dt_util.utcnow(), watts)
+        if estimate is not None:
+            self._estimated_kwh += self._integrator.total_kwh - total_kwh
+        if (
+            used_kwh := self.coordinator.outage_energy.pop(self._thermostat_id, None)
+        ) is not None:
+            # Add what the outage used beyond the estimate, an estimate that
+            # was too high is kept as the total cannot decrease
+            self._integrator.add_energy(used_kwh - self._estimated_kwh)
+            self._estimate = None
+            self._estimated_kwh = 0.0
+        self._attr_native_value = round(self._integrator.total_kwh, 3)
+
+    def _update_from_thermostat(self) -> None:
+        """Integrate the load reported by the latest poll."""
+        # Samples are only taken once the restored total is known
+        if self.hass is not None:
+            self._add_sample()
+
+
+class SchluterEnergyUsageSensor(SchluterSensor):
+    """Energy used over the last days, from the hourly history of the API."""
 
     @property
-    def available(self) -> bool:
-        """Return True if Schluter thermostat is available."""
-        return self.coordinator.data[self._thermostat_id].is_online
+    def last_reset(self):
+        if self.entity_description.state_class is not SensorStateClass.TOTAL:
+            return None
+        # Looked up, the day changes with a callback at the midnight of the
+        # time zone of the thermostat
+        return self.coordinator.day_boundaries.midnight(self._thermostat.timezone)
 
-    @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
 
-    @property
-    def native_value(self) -> float:
-        """Return the state of the sensor."""
-        return self.coordinator.data[self._thermostat_id].kwh_charge
+class SchluterAggregateSensor(SensorEntity):
+    """A sensor totalling the thermostats of a group, or of the account.
 
-# SchluterTotalEnergySensor
-class ThermostatSensor(CoordinatorEntity[DataUpdateCoordinator], SensorEntity):
-    """Representation of a sensors"""
+    The thermostats of a group can be spread over the shards of a large
+    account, the totals are computed by the aggregator of the entry once
+    for every coordinator update.
+    """
 
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.TOTAL
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+    entity_description: SchluterAggregateSensorEntityDescription
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
-        thermostat_id,
-        energy_type
-    ):
-        """Pass coordinator to CoordinatorEntity."""
-        super().__init__(coordinator)
-        self._thermostat = coordinator.data[thermostat_id]
-        self._energy_type = energy_type
-        self._attr_unique_id = f"{self._thermostat.serial_number}-{self._energy_type.value}"
-        self._attr_suggested_display_precision = 2
-        self._attr_name = self._get_name(energy_type)
-        self._thermostat_id = thermostat_id
+        aggregator: SchluterAggregator,
+        group_id: int | None,
+        device_id: str,
+        device_name: str,
+        description: SchluterAggregateSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor of a group, or of the account without one."""
+        self.entity_description = description
+        self._aggregator = aggregator
+        self._group_id = group_id
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_unique_id = f"{device_id}-{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, device_id)},
+            name=device_name,
+            manufacturer="Schluter",
+        )
+        self._update_from_totals()
+
+    def _totals(self) -> ThermostatTotals | None:
+        """Latest totals of the group or account."""
+        if self._group_id is None:
+            return self._aggregator.account
+        return self._aggregator.groups.get(self._group_id)
+
+    def _update_from_totals(self) -> None:
+        """Compute the state from the latest totals."""
+        if (totals := self._totals()) is not None:
+            self._attr_native_value = self.entity_description.value_fn(totals)
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the updates of the totals."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._aggregator.async_add_listener(self._handle_totals_update)
+        )
 
-    @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
-
-    @property
-    def last_reset(self):
-        return get_todays_midnight()
+    @callback
+    def _handle_totals_update(self) -> None:
+        """Handle updated totals."""
+        self._update_from_totals()
+        self.async_write_ha_state()
 
     @property
     def available(self) -> bool:
-        """Return True if Schluter thermostat is available."""
-        return self._thermostat.is_online
+        """Return True if the totals are up to date and cover the value."""
+        return (
+            self._aggregator.available
+            and (totals := self._totals()) is not None
+            and self.entity_description.available_fn(totals)
+        )
 
     @property
-    def native_value(self) -> float:
-        return self._calculate_energy_usage(self._energy_type)
-
-    def _calculate_energy_usage(self, energy_type) -> float:
-        number_of_days = 1
-
-        match energy_type:
-            case EnergyCalculationDuration.DAY:
-                number_of_days = 1
-            case EnergyCalculationDuration.WEEK:
-                number_of_days = 7
-            case EnergyCalculationDuration.MONTH:
-                number_of_days = 30
-
-        energy_usage_total = 0
-        for index in range(0, number_of_days):
-            if index >= len(self._thermostat.day_energy_usages):
-                break
-            hour_usages = self._thermostat.day_energy_usages[index].hour_usages
-            for usage in hour_usages:
-                energy_usage_total += usage.energy_in_kwh
-
-        return energy_usage_total
-
-    def _get_name(self, energy_type):
-        name = self._thermostat.name
-
-        match energy_type:
-            case EnergyCalculationDuration.DAY:
-                name += " Energy Used Today"
-            case EnergyCalculationDuration.WEEK:
-                name += " Energy Used Last 7 Days"
-            case EnergyCalculationDuration.MONTH:
-                name += " Energy Used Last 30 Days"
-        return name
\ No newline at end of file
+    def last_reset(self):
+        if self.entity_description.state_class is SensorStateClass.TOTAL:
+            return self._aggregator.midnight
+        return None
@@ -0,0 +1,447 @@
+"""Services for the schluter integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientError
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_TEMPERATURE
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_COUNT,
+    ATTR_READY_BY,
+    ATTR_SCHEDULE,
+    ATTR_TIME,
+    ATTR_VACATION_BEGIN,
+    ATTR_VACATION_END,
+    CONF_GROUP_ID,
+    CONF_INTERVAL,
+    CONF_REFRESH_SCOPES,
+    CONF_SERIAL_NUMBER,
+    DOMAIN,
+    UPDATE_CONCURRENCY,
+)
+from .schedule import MAX_EVENTS_PER_DAY, WEEKDAYS, WeeklySchedule
+from .thermostat import Vacation
+
+if TYPE_CHECKING:
+    from . import SchluterData
+    from .coordinator import SchluterDataUpdateCoordinator
+    from .thermostat import Thermostat
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_REFRESH = "refresh"
+SERVICE_SET_REFRESH_INTERVAL = "set_refresh_interval"
+SERVICE_SCHEDULE_SETPOINT = "schedule_setpoint"
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+SERVICE_SET_VACATION = "set_vacation"
+SERVICE_END_VACATION = "end_vacation"
+SERVICE_GET_SCHEDULE = "get_schedule"
+SERVICE_SET_SCHEDULE = "set_schedule"
+
+TARGET_SCHEMA = {
+    vol.Exclusive(CONF_GROUP_ID, "target"): vol.Coerce(int),
+    vol.Exclusive(CONF_SERIAL_NUMBER, "target"): cv.string,
+}
+
+REFRESH_SCHEMA = vol.Schema(TARGET_SCHEMA)
+
+SET_REFRESH_INTERVAL_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            **TARGET_SCHEMA,
+            vol.Required(CONF_INTERVAL): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        }
+    ),
+    cv.has_at_least_one_key(CONF_GROUP_ID, CONF_SERIAL_NUMBER),
+)
+
+SCHEDULE_SETPOINT_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            **TARGET_SCHEMA,
+            vol.Required(ATTR_TEMPERATURE): vol.All(
+                vol.Coerce(float), vol.Range(min=5, max=40)
+            ),
+            vol.Required(ATTR_READY_BY): cv.datetime,
+        }
+    ),
+    cv.has_at_least_one_key(CONF_GROUP_ID, CONF_SERIAL_NUMBER),
+)
+
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_COUNT, default=5): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
+
+SET_VACATION_SCHEMA = vol.Schema(
+    {
+        **TARGET_SCHEMA,
+        vol.Required(ATTR_VACATION_BEGIN): cv.datetime,
+        vol.Required(ATTR_VACATION_END): cv.datetime,
+        vol.Required(ATTR_TEMPERATURE): vol.All(
+            vol.Coerce(float), vol.Range(min=5, max=40)
+        ),
+    }
+)
+
+END_VACATION_SCHEMA = vol.Schema(TARGET_SCHEMA)
+
+GET_SCHEDULE_SCHEMA = vol.Schema({vol.Required(CONF_SERIAL_NUMBER): cv.string})
+
+SCHEDULE_EVENT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_TIME): cv.time,
+        vol.Required(ATTR_TEMPERATURE): vol.All(
+            vol.Coerce(float), vol.Range(min=5, max=40)
+        ),
+    }
+)
+
+SET_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        **TARGET_SCHEMA,
+        vol.Required(ATTR_SCHEDULE): {
+            vol.Required(weekday): vol.All(
+                cv.ensure_list,
+                [SCHEDULE_EVENT_SCHEMA],
+                vol.Length(max=MAX_EVENTS_PER_DAY),
+            )
+            for weekday in WEEKDAYS
+        },
+    }
+)
+
+
+def _matching_entries(
+    hass: HomeAssistant, group_id: int | None, serial_number: str | None
+) -> list[tuple[ConfigEntry, SchluterData]]:
+    """Return the loaded entries that know the group or thermostat."""
+    matches = []
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if (data := hass.data.get(DOMAIN, {}).get(entry.entry_id)) is None:
+            continue
+        thermostats = {
+            serial_number: thermostat
+            for coordinator in data.coordinators
+            for serial_number, thermostat in (coordinator.data or {}).items()
+        }
+        if (
+            (group_id is None and serial_number is None)
+            or serial_number in thermostats
+            or any(
+                thermostat.group_id == group_id for thermostat in thermostats.values()
+            )
+        ):
+            matches.append((entry, data))
+    if not matches:
+        raise ServiceValidationError(
+            f"No Schluter thermostat found for group {group_id} "
+            f"or serial number {serial_number}"
+        )
+    return matches
+
+
+def _matching_thermostats(
+    hass: HomeAssistant, group_id: int | None, serial_number: str | None
+) -> list[tuple[SchluterDataUpdateCoordinator, Thermostat]]:
+    """Return the thermostats of a group, a thermostat or all thermostats."""
+    return [
+        (coordinator, thermostat)
+        for _, data in _matching_entries(hass, group_id, serial_number)
+        for coordinator in data.coordinators
+        for thermostat in (coordinator.data or {}).values()
+        if thermostat.serial_number == serial_number
+        or (serial_number is None and group_id in (None, thermostat.group_id))
+    ]
+
+
+def _thermostat_time(value: datetime, thermostat: Thermostat) -> datetime:
+    """Return a time in the local time of a thermostat.
+
+    Times without a zone are taken as the local time of the thermostat, the
+    local time of Home Assistant stands in for an unknown zone.
+    """
+    if value.tzinfo is None:
+        return value
+    if (zone := thermostat.timezone) is None:
+        return dt_util.as_local(value).replace(tzinfo=None)
+    return value.astimezone(zone).replace(tzinfo=None)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_refresh_targets(
+        group_id: int | None, serial_number: str | None
+    ) -> None:
+        """Refresh a group, a thermostat or everything right away."""
+        coordinators = {
+            id(coordinator): coordinator
+            for _, data in _matching_entries(hass, group_id, serial_number)
+            for coordinator in data.coordinators
+            if serial_number is None or coordinator.owns(serial_number)
+        }
+        # Shards of an account refreshed together share the thermostat list
+        await asyncio.gather(
+            *(
+                coordinator.async_refresh_scope(group_id, serial_number)
+                for coordinator in coordinators.values()
+            )
+        )
+
+    async def async_refresh(call: ServiceCall) -> None:
+        """Refresh a group, a thermostat or everything right away."""
+        await async_refresh_targets(
+            call.data.get(CONF_GROUP_ID), call.data.get(CONF_SERIAL_NUMBER)
+        )
+
+    async def async_set_refresh_interval(call: ServiceCall) -> None:
+        """Store the refresh interval of a group or thermostat in the options."""
+        group_id = call.data.get(CONF_GROUP_ID)
+        serial_number = call.data.get(CONF_SERIAL_NUMBER)
+        for entry, _ in _matching_entries(hass, group_id, serial_number):
+            scopes: list[dict[str, Any]] = [
+                scope
+                for scope in entry.options.get(CONF_REFRESH_SCOPES, [])
+                if scope.get(CONF_GROUP_ID) != group_id
+                or scope.get(CONF_SERIAL_NUMBER) != serial_number
+            ]
+            # An interval of 0 puts the target back on the default interval
+            if interval := call.data[CONF_INTERVAL]:
+                scope = {CONF_INTERVAL: interval}
+                if group_id is not None:
+                    scope[CONF_GROUP_ID] = group_id
+                else:
+                    scope[CONF_SERIAL_NUMBER] = serial_number
+                scopes.append(scope)
+            hass.config_entries.async_update_entry(
+                entry, options={**entry.options, CONF_REFRESH_SCOPES: scopes}
+            )
+
+    async def async_schedule_setpoint(call: ServiceCall) -> None:
+        """Reach a temperature by a given time, starting as late as possible."""
+        group_id = call.data.get(CONF_GROUP_ID)
+        serial_number = call.data.get(CONF_SERIAL_NUMBER)
+        ready_by = dt_util.as_utc(call.data[ATTR_READY_BY])
+        if ready_by <= dt_util.utcnow():
+            raise ServiceValidationError(f"{ready_by} is not in the future")
+        for coordinator, thermostat in _matching_thermostats(
+            hass, group_id, serial_number
+        ):
+            coordinator.async_schedule_setpoint(
+                thermostat.serial_number, call.data[ATTR_TEMPERATURE], ready_by
+            )
+
+    async def async_update_thermostats(
+        call: ServiceCall,
+        what: str,
+        update: Callable[[SchluterDataUpdateCoordinator, str], Awaitable[None]],
+    ) -> ServiceResponse:
+        """Update the targeted thermostats and refresh them.
+
+        A few thermostats are updated at once, a failing thermostat does not
+        stop the others. The result of every thermostat is returned, even if
+        the refresh after the updates fails.
+        """
+        # pylint: disable=import-outside-toplevel
+        from .api import ApiError, InvalidSessionIdError, InvalidUserPasswordError
+        from .scheduler import StaleRequestError
+
+        group_id = call.data.get(CONF_GROUP_ID)
+        serial_number = call.data.get(CONF_SERIAL_NUMBER)
+        semaphore = asyncio.Semaphore(UPDATE_CONCURRENCY)
+
+        async def async_apply(
+            coordinator: SchluterDataUpdateCoordinator, serial: str
+        ) -> dict[str, Any]:
+            async with semaphore:
+                try:
+                    await update(coordinator, serial)
+                except HomeAssistantError as err:
+                    _LOGGER.warning("%s of %s not updated: %s", what, serial, err)
+                    return {"success": False, "error": str(err)}
+            return {"success": True, "error": None}
+
+        thermostats = _matching_thermostats(hass, group_id, serial_number)
+        results = await asyncio.gather(
+            *(
+                async_apply(coordinator, thermostat.serial_number)
+                for coordinator, thermostat in thermostats
+            )
+        )
+        try:
+            await async_refresh_targets(group_id, serial_number)
+        except (
+            ApiError,
+            ClientError,
+            HomeAssistantError,
+            InvalidSessionIdError,
+            InvalidUserPasswordError,
+            StaleRequestError,
+            TimeoutError,
+        ) as err:
+            _LOGGER.warning(
+                "Refresh after updating the %s failed, waiting for the next "
+                "poll: %s",
+                what.lower(),
+                err,
+            )
+        return {
+            "thermostats": {
+                thermostat.serial_number: result
+                for (_, thermostat), result in zip(thermostats, results)
+            }
+        }
+
+    async def async_set_vacation(call: ServiceCall) -> ServiceResponse:
+        """Put a group, a thermostat or all thermostats on vacation."""
+        begin: datetime = call.data[ATTR_VACATION_BEGIN]
+        end: datetime = call.data[ATTR_VACATION_END]
+        if dt_util.as_utc(end) <= dt_util.as_utc(begin):
+            raise ServiceValidationError(f"{end} is not after {begin}")
+
+        def vacation(thermostat: Thermostat) -> Vacation:
+            return Vacation(
+                _thermostat_time(begin, thermostat),
+                _thermostat_time(end, thermostat),
+                call.data[ATTR_TEMPERATURE],
+            )
+
+        return await async_update_thermostats(
+            call,
+            "Vacation",
+            lambda coordinator, serial: coordinator.async_set_vacation(
+                serial, vacation(coordinator.thermostat(serial))
+            ),
+        )
+
+    async def async_end_vacation(call: ServiceCall) -> ServiceResponse:
+        """End the vacation of a group, a thermostat or all thermostats."""
+        return await async_update_thermostats(
+            call,
+            "Vacation",
+            lambda coordinator, serial: coordinator.async_set_vacation(serial, None),
+        )
+
+    async def async_get_schedule(call: ServiceCall) -> ServiceResponse:
+        """Return the weekly schedule of a thermostat."""
+        serial_number = call.data[CONF_SERIAL_NUMBER]
+        for coordinator, thermostat in _matching_thermostats(
+            hass, None, serial_number
+        ):
+            schedule = await coordinator.async_get_schedule(thermostat.serial_number)
+            if schedule is None:
+                raise HomeAssistantError(f"{serial_number} has no schedule")
+            return {ATTR_SCHEDULE: schedule.as_dict()}
+        raise ServiceValidationError(f"No Schluter thermostat {serial_number}")
+
+    async def async_set_schedule(call: ServiceCall) -> ServiceResponse:
+        """Replace the weekly schedule of a group, a thermostat or all of them."""
+        schedule = WeeklySchedule.from_dict(call.data[ATTR_SCHEDULE])
+        return await async_update_thermostats(
+            call,
+            "Schedule",
+            lambda coordinator, serial: coordinator.async_set_schedule(
+                serial, schedule
+            ),
+        )
+
+    async def async_profile_refresh(call: ServiceCall) -> None:
+        """Profile consecutive refreshes of every thermostat to a file."""
+        # pylint: disable=import-outside-toplevel
+        import cProfile
+
+        coordinators = [
+            coordinator
+            for _, data in _matching_entries(hass, None, None)
+            for coordinator in data.coordinators
+        ]
+        count = call.data[ATTR_COUNT]
+        profiler = cProfile.Profile()
+        for _ in range(count):
+            # Other work on the event loop while a refresh waits is included
+            try:
+                profiler.enable()
+            except ValueError as err:
+                raise HomeAssistantError(f"Cannot start profiling: {err}") from err
+            try:
+                for coordinator in coordinators:
+                    await coordinator.async_refresh()
+            finally:
+                profiler.disable()
+        path = hass.config.path(f"{DOMAIN}_profile.{int(time.time() * 1000000)}.cprof")
+        await hass.async_add_executor_job(profiler.dump_stats, path)
+        _LOGGER.info("Profile of %s refreshes written to %s", count, path)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH, async_refresh, schema=REFRESH_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_REFRESH_INTERVAL,
+        async_set_refresh_interval,
+        schema=SET_REFRESH_INTERVAL_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SCHEDULE_SETPOINT,
+        async_schedule_setpoint,
+        schema=SCHEDULE_SETPOINT_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        async_profile_refresh,
+        schema=PROFILE_REFRESH_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_VACATION,
+        async_set_vacation,
+        schema=SET_VACATION_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_END_VACATION,
+        async_end_vacation,
+        schema=END_VACATION_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SCHEDULE,
+        async_get_schedule,
+        schema=GET_SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_SCHEDULE,
+        async_set_schedule,
+        schema=SET_SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
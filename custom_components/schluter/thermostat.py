@@ -1,8 +1,13 @@
 """ A single instance of a Schluter Thermostat """
 
+from dataclasses import dataclass
+from datetime import datetime, tzinfo
 from enum import Enum
+from functools import lru_cache
 import logging
 
+from .schedule import WeeklySchedule
+
 class EnergyCalculationDuration(Enum):
     DAY = "Day"
     WEEK = "Week"
@@ -10,6 +15,9 @@ class EnergyCalculationDuration(Enum):
 
 
 class DayEnergyUsage:
+    # Kept for every day of the retained history, slots keep them small
+    __slots__ = ("hour_usages", "total_kwh")
+
     def __init__(self, json):
         usage_jsons = list(json["Usage"])
         usage_jsons.reverse()
@@ -23,14 +31,36 @@ class DayEnergyUsage:
                 hour_usages.append(HourEnergyUsage(usage_json, index))
 
         self.hour_usages = hour_usages
+        self.total_kwh = sum(usage.energy_in_kwh for usage in hour_usages)
 
 class HourEnergyUsage:
+    __slots__ = ("energy_in_kwh", "time")
+
     def __init__(self, json, time):
         self.energy_in_kwh = json["EnergyKWattHour"]
         self.time = time
 
 _LOGGER = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=32)
+def parse_tz_offset(tz_offset: str) -> tzinfo | None:
+    """Return the fixed time zone of an offset such as +01:00, if valid."""
+    try:
+        return datetime.fromisoformat(f"2000-01-01T00:00:00{tz_offset}").tzinfo
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class Vacation:
+    """A vacation of a thermostat, in the local time of the thermostat."""
+
+    begin: datetime
+    end: datetime
+    temperature: float
+
+
 class Thermostat:
     """A Schluter Thermostat"""
 
@@ -52,7 +82,7 @@ class Thermostat:
         self._manual_temp = data["ManualTemperature"]
         self._is_online = data["Online"]
         self._is_heating = data["Heating"]
-        self._is_early_start_of_heating = ["EarlyStartOfHeating"]
+        self._is_early_start_of_heating = data["EarlyStartOfHeating"]
         self._max_temp = data["MaxTemp"]
         self._min_temp = data["MinTemp"]
         self._error_code = data["ErrorCode"]
@@ -67,19 +97,30 @@ class Thermostat:
         self._is_assigned = data["HasBeenAssigned"]
         self._distributer_id = data["DistributerId"]
         self._support = data["Support"]
+        self._schedule = data.get("Schedule")
+        self._day_energy_usages = None
+        self._day_energy_costs = None
+        # Time the API last confirmed the data, set by the API
+        self.fetched_at = None
 
     def __repr__(self):
         """Print Method."""
         return f"Thermostat: {self._serial_number}, {self._name}"
     
-    def update_energy_usage(self, day_energy_usages):
+    def update_energy_usage(self, day_energy_usages, day_energy_costs=None):
         self._day_energy_usages = day_energy_usages
+        self._day_energy_costs = day_energy_costs
 
     @property
     def day_energy_usages(self):
-        """."""
+        """Daily energy usages, newest first. None until fetched."""
         return self._day_energy_usages
 
+    @property
+    def day_energy_costs(self):
+        """Daily energy costs, newest first. None until fetched."""
+        return self._day_energy_costs
+
     @property
     def serial_number(self):
         """Serial Number."""
@@ -105,6 +146,11 @@ class Thermostat:
         """Temperature."""
         return round((self._temperature / 100) * 2) / 2
 
+    @property
+    def measured_temperature(self):
+        """Temperature as measured, without rounding to half degrees."""
+        return self._temperature / 100
+
     @property
     def set_point_temp(self):
         """Set Point Temperature."""
@@ -120,6 +166,24 @@ class Thermostat:
         """Manual Temperature."""
         return round((self._manual_temp / 100) * 2) / 2
 
+    @property
+    def vacation(self):
+        """Vacation of the Thermostat. None when no vacation is set."""
+        if not self._vacation_enabled:
+            return None
+        return Vacation(
+            datetime.fromisoformat(self._vacation_begin_day),
+            datetime.fromisoformat(self._vacation_end_day),
+            round((self._vacation_temperature / 100) * 2) / 2,
+        )
+
+    @property
+    def schedule(self):
+        """Weekly Schedule. None when the API did not send it."""
+        if self._schedule is None:
+            return None
+        return WeeklySchedule.from_json(self._schedule)
+
     @property
     def is_online(self):
         """Is Thermostat Online."""
@@ -130,6 +194,16 @@ class Thermostat:
         """Is Thermostat Heating."""
         return self._is_heating
 
+    @property
+    def is_early_start_of_heating(self):
+        """Is the Thermostat Heating Ahead of a Scheduled Comfort Period."""
+        return self._is_early_start_of_heating
+
+    @property
+    def power(self):
+        """Power Drawn by the Floor, only while Heating."""
+        return self._load_measured_watt if self._is_heating else 0
+
     @property
     def max_temp(self):
         """Maximum Temperature."""
@@ -145,6 +219,11 @@ class Thermostat:
         """KwH Charge."""
         return self._kwh_charge
 
+    @property
+    def timezone(self):
+        """Time zone of the thermostat, None if its offset is unknown."""
+        return parse_tz_offset(self._tz_offset)
+
     @property
     def load_measured_watt(self):
         """Measured Load in Watt."""
@@ -0,0 +1,41 @@
+"""Timing of the phases of a refresh, for the diagnostics."""
+from __future__ import annotations
+
+from datetime import datetime
+import time
+from typing import Any
+
+# Number of refreshes whose timings are kept per coordinator
+TIMINGS_KEPT = 20
+
+
+class RefreshTiming:
+    """Wall time spent in the phases of one refresh."""
+
+    def __init__(self, started: datetime) -> None:
+        """Start timing a refresh."""
+        self.started = started
+        self.phases: dict[str, float] = {}
+        self._start = self._lap = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """Add the time since the previous lap to a phase."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._lap
+        self._lap = now
+
+    @property
+    def total(self) -> float:
+        """Seconds from the start to the last lap."""
+        return self._lap - self._start
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the timing in milliseconds."""
+        return {
+            "started": self.started.isoformat(),
+            "total_ms": round(self.total * 1000, 1),
+            **{
+                f"{phase}_ms": round(seconds * 1000, 1)
+                for phase, seconds in self.phases.items()
+            },
+        }
@@ -2,6 +2,23 @@
 import pytest
 
 
+def pytest_addoption(parser):
+    """Add the option running the slow tests."""
+    parser.addoption(
+        "--run-slow", action="store_true", help="run the slow soak tests"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the slow tests unless asked for."""
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations):  # noqa: F811
     """Auto add enable_custom_integrations."""
@@ -0,0 +1,145 @@
+"""Local stub of the Schluter API for tests and benchmarks."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import json
+from typing import Any
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.schluter.const import (
+    API_AUTH_PATH,
+    API_GET_ENERGY_USAGE_PATH,
+    API_GET_THERMOSTAT_PATH,
+    API_GET_THERMOSTATS_PATH,
+)
+
+THERMOSTATS_PER_GROUP = 10
+HOURS_PER_DAY = 24
+DAYS_OF_HISTORY = 30
+
+
+def thermostat_data(index: int) -> dict[str, Any]:
+    """Return the API data of a simulated thermostat."""
+    return {
+        "SerialNumber": f"{index:06d}",
+        "Room": f"Room {index}",
+        "GroupName": f"Floor {index // THERMOSTATS_PER_GROUP}",
+        "GroupId": index // THERMOSTATS_PER_GROUP,
+        "Temperature": 2100,
+        "SetPointTemp": 2200,
+        "RegulationMode": 1,
+        "VacationEnabled": False,
+        "VacationBeginDay": "1970-01-01T00:00:00",
+        "VacationEndDay": "1970-01-01T00:00:00",
+        "VacationTemperature": 1500,
+        "ComfortTemperature": 2200,
+        "ComfortEndTime": "1970-01-01T00:00:00",
+        "ManualTemperature": 2200,
+        "Online": True,
+        "Heating": index % 2 == 0,
+        "EarlyStartOfHeating": False,
+        "MaxTemp": 4000,
+        "MinTemp": 500,
+        "ErrorCode": 0,
+        "Confirmed": True,
+        "Email": "user@example.com",
+        "TZOffset": "+01:00",
+        "KwhCharge": 0.1,
+        "LoadMeasuringActive": True,
+        "LoadManuallySetWatt": 0,
+        "LoadMeasuredWatt": 600,
+        "SWVersion": "1.0",
+        "HasBeenAssigned": True,
+        "DistributerId": 0,
+        "Support": {},
+    }
+
+
+class StubSchluterApi:
+    """Serves a fleet of simulated thermostats and counts the requests.
+
+    Responses are encoded up front, so the CPU time spent by the stub in the
+    test process stays small next to the client's.
+    """
+
+    def __init__(self, thermostat_count: int) -> None:
+        """Initialize the thermostats."""
+        self.thermostats = [thermostat_data(index) for index in range(thermostat_count)]
+        self.requests: dict[str, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._thermostats_body = b""
+        self._energy_body = json.dumps(
+            {
+                "EnergyUsage": [
+                    {"Usage": [{"EnergyKWattHour": 0.1}] * HOURS_PER_DAY}
+                    for _ in range(DAYS_OF_HISTORY)
+                ]
+            }
+        ).encode()
+        self.encode()
+
+    def encode(self) -> None:
+        """Encode the thermostats after they were changed."""
+        groups: dict[int, list[dict[str, Any]]] = {}
+        for thermostat in self.thermostats:
+            groups.setdefault(thermostat["GroupId"], []).append(thermostat)
+        self._thermostats_body = json.dumps(
+            {
+                "Groups": [
+                    {"GroupId": group_id, "Thermostats": thermostats}
+                    for group_id, thermostats in groups.items()
+                ]
+            }
+        ).encode()
+
+    @web.middleware
+    async def _count(self, request: web.Request, handler) -> web.StreamResponse:
+        """Count the requests per path and the requests in flight."""
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _authenticate(self, request: web.Request) -> web.Response:
+        return web.json_response({"SessionId": "stub-session", "ErrorCode": 0})
+
+    async def _thermostats(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self._thermostats_body, content_type="application/json"
+        )
+
+    async def _thermostat(self, request: web.Request) -> web.Response:
+        serial_number = request.query["serialnumber"]
+        for thermostat in self.thermostats:
+            if thermostat["SerialNumber"] == serial_number:
+                return web.json_response(thermostat)
+        raise web.HTTPNotFound
+
+    async def _energy_usage(self, request: web.Request) -> web.Response:
+        return web.Response(body=self._energy_body, content_type="application/json")
+
+    def app(self) -> web.Application:
+        """Return the application serving the API."""
+        app = web.Application(middlewares=[self._count])
+        app.router.add_post(API_AUTH_PATH, self._authenticate)
+        app.router.add_get(API_GET_THERMOSTATS_PATH, self._thermostats)
+        app.router.add_get(API_GET_THERMOSTAT_PATH, self._thermostat)
+        app.router.add_get(API_GET_ENERGY_USAGE_PATH, self._energy_usage)
+        return app
+
+    @asynccontextmanager
+    async def serve(self) -> AsyncIterator[str]:
+        """Serve the API on localhost and yield its base url."""
+        server = TestServer(self.app())
+        await server.start_server()
+        try:
+            yield str(server.make_url("")).rstrip("/")
+        finally:
+            await server.close()
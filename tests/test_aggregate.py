@@ -0,0 +1,46 @@
+"""Test the totals over groups and accounts."""
+from custom_components.schluter.aggregate import summarize
+from custom_components.schluter.thermostat import DayEnergyUsage, Thermostat
+
+from .stub_api import thermostat_data
+
+
+def _thermostat(index, online=True, kwh_per_day=None):
+    data = thermostat_data(index)
+    data["Online"] = online
+    data["Temperature"] = 2000 + 100 * index
+    thermostat = Thermostat(data)
+    if kwh_per_day is not None:
+        thermostat.update_energy_usage(
+            [
+                DayEnergyUsage({"Usage": [{"EnergyKWattHour": kwh}]})
+                for kwh in kwh_per_day
+            ],
+            [kwh * 0.1 for kwh in kwh_per_day],
+        )
+    return thermostat
+
+
+def test_summarize_groups_and_account():
+    """Test live values and energy totals add up per group and account."""
+    account, groups = summarize(
+        [
+            _thermostat(0, kwh_per_day=[1.0] * 30),
+            _thermostat(1, kwh_per_day=[2.0] * 10),
+            _thermostat(2, online=False),
+            _thermostat(10),
+        ]
+    )
+
+    assert set(groups) == {0, 1}
+    group = groups[0]
+    # Even thermostats are heating at 600W in the stub
+    assert (group.online, group.heating, group.power) == (2, 1, 600)
+    assert group.average_temperature == 20.5
+    assert group.energy == [3.0, 21.0, 50.0]
+    assert [round(cost, 6) for cost in group.cost] == [0.3, 2.1, 5.0]
+
+    assert (account.online, account.heating, account.power) == (3, 2, 1200)
+    assert account.has_energy
+    assert not groups[1].has_energy
+    assert groups[1].energy == [0.0, 0.0, 0.0]
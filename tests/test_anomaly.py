@@ -0,0 +1,82 @@
+"""Test the anomaly detection of the thermostats."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from custom_components.schluter.anomaly import AnomalyDetector, RollingStats
+
+START = datetime(2025, 1, 1, 6, 0)
+TODAY = date(2025, 1, 31)
+
+
+def _poll(detector, minute, temperature, heating=True, load_watt=600):
+    return detector.add_sample(
+        START + timedelta(minutes=minute), temperature, heating, load_watt
+    )
+
+
+def test_rolling_stats_window():
+    """Test the window drops its oldest values."""
+    stats = RollingStats(3)
+    for value in (10, 1, 2, 3):
+        stats.add(value)
+    assert stats.count == 3
+    assert stats.mean == 2
+    assert stats.stdev == pytest.approx((2 / 3) ** 0.5)
+
+
+def test_heating_without_rise():
+    """Test a floor heating for hours without warming up is reported."""
+    detector = AnomalyDetector()
+    changed = [_poll(detector, minute, 20.0) for minute in range(0, 181, 10)]
+    assert detector.heating_without_rise
+    assert changed.count(True) == 1
+
+    # Warming up clears the anomaly, a new heating run starts over
+    assert _poll(detector, 190, 21.0, heating=False)
+    assert not detector.heating_without_rise
+    for minute in range(200, 381, 10):
+        _poll(detector, minute, 21.0 + minute / 200)
+    assert not detector.heating_without_rise
+
+
+def test_heating_run_ends_on_poll_gap():
+    """Test a gap between polls starts a new heating run."""
+    detector = AnomalyDetector()
+    _poll(detector, 0, 20.0)
+    _poll(detector, 120, 20.0)
+    _poll(detector, 200, 20.0)
+    assert not detector.heating_without_rise
+
+
+def test_load_drift():
+    """Test a load moving away from its baseline is reported."""
+    detector = AnomalyDetector()
+    for minute in range(100):
+        _poll(detector, minute, 20.0 + minute / 100)
+    assert not detector.load_drift
+    # Idle polls do not feed the load
+    _poll(detector, 100, 21.0, heating=False, load_watt=0)
+    assert not detector.load_drift
+    for minute in range(101, 111):
+        _poll(detector, minute, 21.0, load_watt=400)
+    assert detector.load_drift
+
+
+def test_energy_above_baseline():
+    """Test a day far above the last 30 days is reported once."""
+    detector = AnomalyDetector()
+    history = [5.0 + 0.5 * (day % 3) for day in range(31)]
+    assert not detector.add_energy_history(TODAY, [3.0, *history[1:]])
+    assert detector.energy_baseline == pytest.approx(5.5)
+    assert detector.add_energy_history(TODAY, [20.0, *history[1:]])
+    assert detector.energy_above_baseline
+
+    # Completed days only enter the baseline once
+    assert not detector.add_energy_history(TODAY, [25.0, *history[1:]])
+    assert detector.energy_baseline == pytest.approx(5.5)
+
+    # The next day starts below the baseline again
+    next_day = TODAY + timedelta(days=1)
+    assert detector.add_energy_history(next_day, [1.0, 25.0, *history[1:30]])
+    assert not detector.energy_above_baseline
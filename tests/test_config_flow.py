@@ -1,7 +1,25 @@
 """Test config flow."""
+from unittest.mock import patch
+
+import pytest
+
 from homeassistant import config_entries, setup
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.schluter import config_flow
+from custom_components.schluter.account import (
+    async_acquire_account,
+    async_release_account,
+)
+from custom_components.schluter.api import InvalidUserPasswordError
 from custom_components.schluter.const import DOMAIN
 
+USER_INPUT = {CONF_USERNAME: "user@example.com", CONF_PASSWORD: "password"}
+
+# A released account is kept for a grace period
+keeps_account = pytest.mark.parametrize("expected_lingering_timers", [True])
+
 
 async def test_form(hass):
     """Test we get the form."""
@@ -11,3 +29,62 @@ async def test_form(hass):
     )
     assert result["type"] == "form"
     assert result["errors"] == {}
+
+
+async def test_create_entry(hass):
+    """Test valid credentials create an entry, named by the lowercase email."""
+    assert config_flow.async_validate_credentials is not None
+    with (
+        patch(
+            "custom_components.schluter.api.SchluterApi.async_get_sessionid",
+            return_value="session",
+        ) as get_sessionid,
+        patch("custom_components.schluter.async_setup_entry", return_value=True),
+    ):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": config_entries.SOURCE_USER},
+            data={**USER_INPUT, CONF_USERNAME: "User@Example.com"},
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["result"].unique_id == "user@example.com"
+    get_sessionid.assert_awaited_once_with("User@Example.com", "password")
+
+
+async def test_invalid_credentials(hass):
+    """Test a rejected password shows an error."""
+    with patch(
+        "custom_components.schluter.api.SchluterApi.async_get_sessionid",
+        side_effect=InvalidUserPasswordError("Invalid"),
+    ):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}, data=USER_INPUT
+        )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_user_pass"}
+
+
+@keeps_account
+async def test_invalid_credentials_keep_shared_account(hass):
+    """Test a rejected password leaves the account of a running entry alone."""
+    account = async_acquire_account(hass, "user@example.com", "password")
+    with (
+        patch(
+            "custom_components.schluter.api.SchluterApi.async_get_sessionid",
+            side_effect=InvalidUserPasswordError("Invalid"),
+        ),
+        patch.object(account.api, "invalidate_sessionid") as invalidate_sessionid,
+    ):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": config_entries.SOURCE_USER},
+            data={**USER_INPUT, CONF_PASSWORD: "wrong"},
+        )
+    async_release_account(account)
+
+    assert result["errors"] == {"base": "invalid_user_pass"}
+    assert account.password == "password"
+    invalidate_sessionid.assert_not_called()
@@ -0,0 +1,122 @@
+"""Test the coordinator of the thermostats of an account."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from aiohttp import ClientSession
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.schluter.account import SchluterAccount
+from custom_components.schluter.api import ApiError, SchluterApi
+from custom_components.schluter.coordinator import ScheduledSetpoint
+from custom_components.schluter.fleet import (
+    SETPOINTS_SAVE_DELAY,
+    SETPOINTS_STORAGE_VERSION,
+    SchluterFleet,
+    setpoints_storage_key,
+)
+
+from .stub_api import StubSchluterApi
+
+
+async def test_history_days_after_failed_first_fetch(hass, socket_enabled):
+    """Test the days of history change while no history was fetched yet."""
+    stub = StubSchluterApi(2)
+    async with stub.serve() as base_url, ClientSession() as session:
+        account = SchluterAccount(hass, "user@example.com", "password")
+        account.api = SchluterApi(session, base_url=base_url)
+        fleet = SchluterFleet(hass, account)
+        coordinator = fleet.coordinators[0]
+        with patch.object(
+            account.api, "async_get_energy_usage", side_effect=ApiError("Failed")
+        ):
+            await fleet.async_refresh()
+            await hass.async_block_till_done(wait_background_tasks=True)
+        assert coordinator.data["000000"].day_energy_usages is None
+
+        fleet.async_set_history_days(60)
+        # The history is fetched again with the next refresh
+        await fleet.async_refresh()
+        await hass.async_block_till_done(wait_background_tasks=True)
+        await fleet.async_shutdown()
+
+    assert len(coordinator.data["000000"].day_energy_usages) == 30
+
+
+async def test_failed_energy_fetch_is_due_again(hass, socket_enabled):
+    """Test a failed energy fetch is retried by the next refresh."""
+    stub = StubSchluterApi(2)
+    async with stub.serve() as base_url, ClientSession() as session:
+        account = SchluterAccount(hass, "user@example.com", "password")
+        account.api = SchluterApi(session, base_url=base_url)
+        fleet = SchluterFleet(hass, account)
+        coordinator = fleet.coordinators[0]
+        with patch.object(
+            account.api, "async_get_energy_usage", side_effect=ApiError("Failed")
+        ):
+            await fleet.async_refresh()
+            await hass.async_block_till_done(wait_background_tasks=True)
+        assert coordinator.data["000000"].day_energy_usages is None
+
+        # Well within the energy interval, the failed thermostats are due
+        await fleet.async_refresh()
+        await hass.async_block_till_done(wait_background_tasks=True)
+        await fleet.async_shutdown()
+
+    assert coordinator.data["000000"].day_energy_usages is not None
+
+
+async def test_scheduled_setpoints_survive_restart(
+    hass, hass_storage, freezer, socket_enabled
+):
+    """Test scheduled setpoints are stored and scheduled again on setup."""
+    key = setpoints_storage_key("entry")
+    now = dt_util.utcnow()
+    hass_storage[key] = {
+        "version": SETPOINTS_STORAGE_VERSION,
+        "key": key,
+        "data": {
+            "000000": {
+                "temperature": 22.0,
+                "ready_by": (now + timedelta(days=1)).isoformat(),
+            },
+            "000001": {
+                "temperature": 22.0,
+                "ready_by": (now - timedelta(hours=1)).isoformat(),
+            },
+        },
+    }
+    stub = StubSchluterApi(2)
+    async with stub.serve() as base_url, ClientSession() as session:
+        account = SchluterAccount(hass, "user@example.com", "password")
+        account.api = SchluterApi(session, base_url=base_url)
+        fleet = SchluterFleet(hass, account, storage_key=key)
+        coordinator = fleet.coordinators[0]
+        await fleet.async_refresh()
+        await fleet.async_restore_setpoints()
+
+        # Setpoints whose time passed during the restart are dropped
+        assert coordinator.scheduled_setpoints == {
+            "000000": ScheduledSetpoint(22.0, now + timedelta(days=1))
+        }
+
+        coordinator.async_schedule_setpoint(
+            "000001", 21.0, now + timedelta(days=2)
+        )
+        await fleet.async_shutdown()
+        freezer.tick(timedelta(seconds=SETPOINTS_SAVE_DELAY))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    # Shutting down keeps the stored setpoints
+    assert hass_storage[key]["data"] == {
+        "000000": {
+            "temperature": 22.0,
+            "ready_by": (now + timedelta(days=1)).isoformat(),
+        },
+        "000001": {
+            "temperature": 21.0,
+            "ready_by": (now + timedelta(days=2)).isoformat(),
+        },
+    }
@@ -0,0 +1,83 @@
+"""Test the energy cost engine."""
+from datetime import datetime
+
+import pytest
+
+from custom_components.schluter.cost import EnergyCostCalculator, Tariff
+from custom_components.schluter.thermostat import DayEnergyUsage
+
+NOW = datetime(2025, 1, 2, 10, 30)
+
+
+def _day(kwh_per_hour):
+    """Return a day of usages, given from the first hour of the day on."""
+    # The API lists the hours of a day from the last one to the first one
+    return DayEnergyUsage(
+        {"Usage": [{"EnergyKWattHour": kwh} for kwh in reversed(kwh_per_hour)]}
+    )
+
+
+def test_tariff_periods():
+    """Test time-of-use periods wrap around midnight and fall back to flat."""
+    tariff = Tariff.parse("07-23=0.2, 23-01=0.05")
+    prices = tariff.prices(0.1)
+    assert prices[0] == 0.05
+    assert prices[1:7] == (0.1,) * 6
+    assert prices[7:23] == (0.2,) * 16
+    assert prices[23] == 0.05
+    assert Tariff.parse("") == Tariff()
+    assert Tariff.parse("").prices(0.1) == (0.1,) * 24
+    with pytest.raises(ValueError):
+        Tariff.parse("7h-23h=0.2")
+    with pytest.raises(ValueError):
+        Tariff.parse("07-25=0.2")
+
+
+def test_prices_hours_incrementally():
+    """Test only the hours changed since the last update are priced."""
+    prices = Tariff.parse("00-12=1").prices(2)
+    calculator = EnergyCostCalculator()
+    yesterday = _day([1.0] * 24)
+    today = _day([1.0] * 10 + [0.5])
+    assert calculator.update(NOW, [today, yesterday], prices) == [10.5, 36.0]
+
+    # The current hour grew and the next one started
+    later = NOW.replace(hour=11, minute=5)
+    today = _day([1.0] * 11 + [0.25])
+    assert calculator.update(later, [today, yesterday], prices) == [11.25, 36.0]
+
+
+def test_reprices_on_new_prices_and_new_day():
+    """Test changed prices price every hour again and days move on."""
+    calculator = EnergyCostCalculator()
+    today = _day([1.0] * 10)
+    assert calculator.update(NOW, [today], Tariff().prices(1)) == [10.0]
+    assert calculator.update(NOW, [today], Tariff().prices(2)) == [20.0]
+
+    tomorrow = NOW.replace(day=3, hour=1)
+    assert calculator.update(tomorrow, [_day([3.0]), today], Tariff().prices(2)) == [
+        6.0,
+        20.0,
+    ]
+
+
+def test_reprices_corrected_hours():
+    """Test hours whose energy the API corrected later are priced again."""
+    prices = Tariff.parse("00-12=1").prices(2)
+    calculator = EnergyCostCalculator()
+    yesterday = _day([1.0] * 24)
+    assert calculator.update(NOW, [_day([1.0] * 10), yesterday], prices) == [
+        10.0,
+        36.0,
+    ]
+
+    # A late report of the thermostats raised hours of both days
+    yesterday = _day([1.0] * 23 + [2.0])
+    today = _day([1.0] * 8 + [1.5, 1.0])
+    assert calculator.update(NOW, [today, yesterday], prices) == [10.5, 38.0]
+
+    # And the history was shortened again
+    assert calculator.update(NOW, [_day([1.0] * 8), yesterday], prices) == [
+        8.0,
+        38.0,
+    ]
@@ -0,0 +1,32 @@
+"""Test the day boundaries per time zone."""
+from datetime import date, datetime, timedelta, timezone
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.schluter.days import DayBoundaries
+
+
+async def test_rollover_at_midnight_of_time_zone(hass, freezer):
+    """Test the day of a time zone changes at its own midnight."""
+    eastern = timezone(timedelta(hours=-5))
+    freezer.move_to(datetime(2025, 1, 1, 23, 30, tzinfo=timezone.utc))
+    rollovers = []
+    days = DayBoundaries(hass, rollovers.append)
+
+    assert days.today(eastern) == date(2025, 1, 1)
+    assert days.midnight(eastern) == datetime(2025, 1, 1, tzinfo=eastern)
+    assert days.today(timezone.utc) == date(2025, 1, 1)
+
+    # Midnight in UTC, still the evening before in the eastern time zone
+    freezer.move_to(datetime(2025, 1, 2, 0, 0, 1, tzinfo=timezone.utc))
+    async_fire_time_changed(hass)
+    assert rollovers == [timezone.utc]
+    assert days.today(timezone.utc) == date(2025, 1, 2)
+    assert days.today(eastern) == date(2025, 1, 1)
+
+    freezer.move_to(datetime(2025, 1, 2, 5, 0, 1, tzinfo=timezone.utc))
+    async_fire_time_changed(hass)
+    assert rollovers == [timezone.utc, eastern]
+    assert days.midnight(eastern) == datetime(2025, 1, 2, tzinfo=eastern)
+
+    days.async_shutdown()
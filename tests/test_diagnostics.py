@@ -0,0 +1,61 @@
+"""Test the diagnostics of the integration."""
+from functools import partial
+import json
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+
+from custom_components.schluter.api import SchluterApi
+from custom_components.schluter.const import (
+    CONF_INTERVAL,
+    CONF_REFRESH_SCOPES,
+    CONF_SERIAL_NUMBER,
+    DOMAIN,
+)
+from custom_components.schluter.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+from .stub_api import StubSchluterApi
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_diagnostics_are_redacted(hass, socket_enabled):
+    """Test credentials, the session and serial numbers are left out."""
+    stub = StubSchluterApi(2)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "secret"},
+        options={
+            CONF_REFRESH_SCOPES: [{CONF_SERIAL_NUMBER: "000001", CONF_INTERVAL: 30}]
+        },
+    )
+    entry.add_to_hass(hass)
+    async with stub.serve() as base_url:
+        with patch(
+            "custom_components.schluter.account.SchluterApi",
+            partial(SchluterApi, base_url=base_url),
+        ):
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done(wait_background_tasks=True)
+
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert diagnostics["entry"]["data"] == {
+        CONF_USERNAME: REDACTED,
+        CONF_PASSWORD: REDACTED,
+    }
+    thermostats = diagnostics["coordinators"][0]["thermostats"]
+    assert [thermostat["serial_number"] for thermostat in thermostats] == [
+        REDACTED,
+        REDACTED,
+    ]
+    dumped = json.dumps(diagnostics)
+    for secret in ("user@example.com", "secret", "stub-session", "000000", "000001"):
+        assert secret not in dumped
@@ -0,0 +1,60 @@
+"""Test the energy integrator."""
+from datetime import datetime, timedelta
+
+from custom_components.schluter.energy import EnergyIntegrator
+
+START = datetime(2025, 1, 1, 12, 0)
+
+
+def test_integrates_irregular_intervals():
+    """Test the trapezoidal area is weighted by the elapsed time."""
+    integrator = EnergyIntegrator()
+    integrator.add_sample(START, 1000)
+    integrator.add_sample(START + timedelta(minutes=10), 1000)
+    integrator.add_sample(START + timedelta(minutes=12), 0)
+    # 10 minutes at 1kW plus 2 minutes ramping from 1kW to 0W
+    assert abs(integrator.total_kwh - (1 / 6 + 1 / 60)) < 1e-9
+
+
+def test_skips_gaps_and_out_of_order_samples():
+    """Test long gaps and stale samples do not add energy."""
+    integrator = EnergyIntegrator(total_kwh=2.0)
+    integrator.add_sample(START, 1000)
+    integrator.add_sample(START + timedelta(hours=3), 1000)
+    integrator.add_sample(START + timedelta(hours=2), 1000)
+    assert integrator.total_kwh == 2.0
+    integrator.add_sample(START + timedelta(hours=3, minutes=6), 1000)
+    assert abs(integrator.total_kwh - 2.1) < 1e-9
+
+
+def test_sample_buffer_is_bounded():
+    """Test only the most recent samples are kept."""
+    integrator = EnergyIntegrator(buffer_size=3)
+    for minute in range(10):
+        integrator.add_sample(START + timedelta(minutes=minute), minute)
+    assert [watts for _, watts in integrator.samples] == [7, 8, 9]
+
+
+def test_hold_extends_last_sample():
+    """Test a confirmed unchanged load is integrated up to the hold."""
+    integrator = EnergyIntegrator()
+    integrator.add_sample(START, 1000)
+    integrator.hold(START + timedelta(minutes=10))
+    integrator.add_sample(START + timedelta(minutes=12), 1000)
+    assert abs(integrator.total_kwh - 12 / 60) < 1e-9
+
+
+def test_hold_skips_gap():
+    """Test the load before an outage is not integrated over the outage."""
+    integrator = EnergyIntegrator()
+    integrator.add_sample(START, 1000)
+    integrator.hold(START + timedelta(hours=3))
+    integrator.add_sample(START + timedelta(hours=3, minutes=1), 1000)
+    assert integrator.total_kwh == 0
+
+
+def test_add_energy_never_decreases():
+    """Test energy known from elsewhere is added, but never subtracted."""
+    integrator = EnergyIntegrator(1.0)
+    assert integrator.add_energy(0.5) == 1.5
+    assert integrator.add_energy(-0.25) == 1.5
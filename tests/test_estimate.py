@@ -0,0 +1,51 @@
+"""Test the estimates of offline thermostats."""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.schluter.estimate import OfflineEstimate, hourly_profile
+from custom_components.schluter.thermostat import DayEnergyUsage
+
+ZONE = timezone(timedelta(hours=1))
+
+
+def _day(hours):
+    """Return a day of hourly usages in kWh, in the order of the API."""
+    return DayEnergyUsage(
+        {"Usage": [{"EnergyKWattHour": kwh} for kwh in reversed(hours)]}
+    )
+
+
+def _hours(usage):
+    return [hour.energy_in_kwh for hour in usage.hour_usages]
+
+
+def test_hourly_profile():
+    """Test only the complete days are averaged per hour."""
+    assert hourly_profile([_day([1.0] * 24)]) is None
+
+    profile = hourly_profile(
+        [_day([5.0] * 3), _day([0.0] * 12 + [1.0] * 12), _day([1.0] * 24)]
+    )
+    assert profile == (0.5,) * 12 + (1.0,) * 12
+
+
+def test_project_and_reconcile():
+    """Test the hours since last seen are projected, across midnight."""
+    profile = tuple(float(hour) for hour in range(24))
+    estimate = OfflineEstimate(
+        None, datetime(2025, 1, 1, 22, 10, tzinfo=ZONE), profile
+    )
+    usages = [_day([0.5] * 23), _day([0.25] * 24)]
+
+    now = datetime(2025, 1, 2, 1, 30, tzinfo=ZONE)
+    projected = estimate.project(usages, date(2025, 1, 1), now)
+
+    assert len(projected) == 2
+    assert _hours(projected[0]) == [0.0, 0.5]
+    assert _hours(projected[1]) == [0.5] * 22 + [22.0, 23.0]
+    assert estimate.projected_kwh == pytest.approx(45.5)
+    assert estimate.power(now) == 1000
+
+    fetched = [_day([1.0, 1.0]), _day([0.5] * 22 + [2.0, 2.0])]
+    assert estimate.used_kwh(fetched, now) == pytest.approx(6.0)
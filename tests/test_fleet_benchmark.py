@@ -0,0 +1,70 @@
+"""Benchmark the refresh of a fleet of thermostats against a local stub API."""
+from datetime import timedelta
+import time
+
+from aiohttp import ClientSession
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.schluter.account import SchluterAccount
+from custom_components.schluter.api import SchluterApi
+from custom_components.schluter.const import (
+    API_GET_THERMOSTATS_PATH,
+    API_MAX_CONNECTIONS,
+)
+from custom_components.schluter.coordinator import UPDATE_INTERVAL, RefreshSettings
+from custom_components.schluter.fleet import SchluterFleet
+
+from .stub_api import StubSchluterApi
+
+THERMOSTAT_COUNT = 500
+SHARD_COUNT = 10
+ROUNDS = 10
+
+# CPU time of one round over every shard, with one thermostat changed per
+# round and without the energy history. Documented in the README, update it
+# there as well.
+REFRESH_CPU_BUDGET = 0.2
+
+
+async def test_fleet_refresh_cpu_budget(hass, freezer, socket_enabled):
+    """Test a refresh round of 500 thermostats stays within the CPU budget."""
+    stub = StubSchluterApi(THERMOSTAT_COUNT)
+    async with stub.serve() as base_url, ClientSession() as session:
+        account = SchluterAccount(hass, "user@example.com", "password")
+        account.api = SchluterApi(session, base_url=base_url)
+        fleet = SchluterFleet(hass, account, shard_count=SHARD_COUNT)
+
+        # The first refresh shares one list for every shard and fetches the
+        # energy history of every thermostat in the background.
+        await fleet.async_refresh()
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert fleet.last_update_success
+        assert all(coordinator.data for coordinator in fleet.coordinators)
+        assert (
+            sum(len(coordinator.data) for coordinator in fleet.coordinators)
+            == THERMOSTAT_COUNT
+        )
+        assert stub.requests[API_GET_THERMOSTATS_PATH] == 1
+        assert stub.max_in_flight <= API_MAX_CONNECTIONS
+
+        fleet.async_set_refresh_settings(
+            RefreshSettings(energy_interval=timedelta(days=1))
+        )
+        fleet.async_start()
+        elapsed = 0.0
+        for index in range(ROUNDS):
+            stub.thermostats[index]["Temperature"] += 50
+            stub.encode()
+            for _ in range(SHARD_COUNT):
+                freezer.tick(UPDATE_INTERVAL / SHARD_COUNT)
+                start = time.process_time()
+                async_fire_time_changed(hass)
+                await hass.async_block_till_done()
+                elapsed += time.process_time() - start
+
+        await fleet.async_shutdown()
+
+    assert fleet.last_update_success
+    assert stub.requests[API_GET_THERMOSTATS_PATH] == 1 + ROUNDS
+    assert stub.max_in_flight <= API_MAX_CONNECTIONS
+    assert elapsed / ROUNDS < REFRESH_CPU_BUDGET
@@ -0,0 +1,56 @@
+"""Test the heat-up rate model."""
+from datetime import datetime, timedelta
+
+from custom_components.schluter.heatup import HeatUpRateModel, heat_up_time
+
+START = datetime(2025, 1, 1, 6, 0)
+
+
+def _heat(model, start, minutes, rate, heating=True, step=1):
+    """Poll every step minutes from start on, rising rate degrees per hour."""
+    for minute in range(0, minutes + 1, step):
+        model.add_sample(
+            START + timedelta(minutes=start + minute),
+            18.0 + rate * (start + minute) / 60,
+            heating,
+        )
+
+
+def test_learns_rate_from_heating_intervals():
+    """Test the rate is the rise over the heating time."""
+    model = HeatUpRateModel()
+    _heat(model, 0, 20, 2.0)
+    # Not enough heating observed yet
+    assert model.rate is None
+    assert model.time_to_reach(18.0, 21.0) is None
+
+    _heat(model, 21, 40, 2.0)
+    assert abs(model.rate - 2.0) < 1e-9
+    assert model.time_to_reach(20.0, 21.0) == timedelta(minutes=30)
+    assert model.time_to_reach(21.0, 20.0) == timedelta()
+
+
+def test_ignores_idle_intervals_and_gaps():
+    """Test cooling while idle and polls too far apart are not learned."""
+    model = HeatUpRateModel()
+    _heat(model, 0, 60, -1.0, heating=False)
+    assert model.heating_time == timedelta()
+    _heat(model, 100, 120, 1.0, step=10)
+    assert model.heating_time == timedelta(minutes=120)
+    _heat(model, 240, 120, 1.0, step=30)
+    assert model.heating_time == timedelta(minutes=120)
+
+
+def test_buffer_forgets_old_intervals():
+    """Test the rate follows the recent heating intervals."""
+    model = HeatUpRateModel(buffer_size=30)
+    _heat(model, 0, 60, 1.0)
+    _heat(model, 100, 60, 3.0)
+    assert model.heating_time == timedelta(minutes=30)
+    assert abs(model.rate - 3.0) < 1e-9
+
+
+def test_heat_up_time():
+    """Test the heat-up time at a given rate."""
+    assert heat_up_time(18.0, 21.0, 1.5) == timedelta(hours=2)
+    assert heat_up_time(22.0, 21.0, 1.5) == timedelta()
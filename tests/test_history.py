@@ -0,0 +1,58 @@
+"""Test the retained energy history of the thermostats."""
+from datetime import date, timedelta
+
+from custom_components.schluter.history import EnergyHistory
+from custom_components.schluter.thermostat import DayEnergyUsage
+
+TODAY = date(2025, 1, 31)
+
+
+def _days(*kwh):
+    """Return days using kwh each, today first."""
+    return [DayEnergyUsage({"Usage": [{"EnergyKWattHour": value}]}) for value in kwh]
+
+
+def _totals(history):
+    return [usage.total_kwh for usage in history.usages()]
+
+
+def test_fetches_only_new_days():
+    """Test a refresh only fetches the days since the newest retained one."""
+    history = EnergyHistory(7)
+    assert history.days_to_fetch(TODAY) == 7
+    history.add(TODAY, _days(7, 6, 5, 4, 3, 2, 1))
+    assert history.days_to_fetch(TODAY) == 1
+
+    history.add(TODAY, _days(7.5))
+    assert _totals(history) == [7.5, 6, 5, 4, 3, 2, 1]
+
+    tomorrow = TODAY + timedelta(days=1)
+    assert history.days_to_fetch(tomorrow) == 2
+    history.add(tomorrow, _days(0.5, 8))
+    # The oldest day was evicted
+    assert _totals(history) == [0.5, 8, 6, 5, 4, 3, 2]
+    assert history.days_to_fetch(TODAY + timedelta(days=30)) == 7
+
+
+def test_resize():
+    """Test a shorter horizon keeps the newest days, a longer one backfills."""
+    history = EnergyHistory(7)
+    history.add(TODAY, _days(7, 6, 5, 4, 3, 2, 1))
+    history.resize(3)
+    assert _totals(history) == [7, 6, 5]
+    assert history.days_to_fetch(TODAY) == 1
+
+    history.resize(10)
+    assert history.days_to_fetch(TODAY) == 10
+    history.add(TODAY, _days(*range(10, 0, -1)))
+    assert len(history) == 10
+
+
+def test_short_response_replaces_history():
+    """Test days that do not join the retained ones replace them."""
+    history = EnergyHistory(7)
+    history.add(TODAY, _days(2, 1))
+    later = TODAY + timedelta(days=3)
+    assert history.days_to_fetch(later) == 4
+    history.add(later, _days(4))
+    assert _totals(history) == [4]
@@ -0,0 +1,88 @@
+"""Test the import cost of the integration."""
+import subprocess
+import sys
+
+INTEGRATION = "custom_components.schluter"
+
+# Self time of every module of the integration imported by the platforms,
+# summed from -X importtime. Generous so a slow machine stays within it, a
+# heavy import at module level does not. Documented in the README, update it
+# there as well.
+IMPORT_BUDGET_US = 250_000
+
+# Modules of the account and the coordinators, only needed once an entry is
+# set up
+ENTRY_MODULES = (
+    f"{INTEGRATION}.account",
+    f"{INTEGRATION}.coordinator",
+    f"{INTEGRATION}.fleet",
+)
+# The API client, whose errors the platforms handle
+API_MODULES = (
+    f"{INTEGRATION}.api",
+    f"{INTEGRATION}.recording",
+)
+
+PRELOAD = """
+import homeassistant.components.binary_sensor
+import homeassistant.components.climate
+import homeassistant.components.sensor
+import homeassistant.helpers.update_coordinator
+"""
+
+PLATFORMS = f"""
+import {INTEGRATION}.binary_sensor
+import {INTEGRATION}.climate
+import {INTEGRATION}.sensor
+"""
+
+
+def _import(statement: str, *options: str) -> subprocess.CompletedProcess[str]:
+    """Import in a fresh interpreter, print the loaded modules."""
+    code = PRELOAD + statement + "\nimport sys\nprint(','.join(sys.modules))"
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+
+def _modules(statement: str) -> set[str]:
+    """Return the modules loaded by a statement in a fresh interpreter."""
+    return set(_import(statement).stdout.strip().split(","))
+
+
+def _self_time_us(importtime: str) -> int:
+    """Sum the self time of the integration modules in -X importtime output."""
+    total = 0
+    for line in importtime.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, _, package = line.removeprefix("import time:").split("|")
+        package = package.strip()
+        if package == INTEGRATION or package.startswith(f"{INTEGRATION}."):
+            total += int(self_time)
+    return total
+
+
+def test_platform_import_budget():
+    """Test the integration and its platforms import within the budget."""
+    result = _import(PLATFORMS, "-X", "importtime")
+    total = _self_time_us(result.stderr)
+    assert 0 < total < IMPORT_BUDGET_US, f"{total} us"
+
+
+def test_integration_import_is_lazy():
+    """Test the API client is only imported when an entry is set up."""
+    modules = _modules(f"import {INTEGRATION}")
+    assert INTEGRATION in modules
+    assert not modules.intersection(ENTRY_MODULES + API_MODULES)
+
+
+def test_platform_import_is_lazy():
+    """Test the platforms leave the account and coordinators to the setup."""
+    modules = _modules(PLATFORMS)
+    assert f"{INTEGRATION}.sensor" in modules
+    assert not modules.intersection(ENTRY_MODULES)
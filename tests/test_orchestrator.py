@@ -0,0 +1,57 @@
+"""Test the aligned refresh of several accounts."""
+from aiohttp import ClientSession
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.schluter.account import SchluterAccount
+from custom_components.schluter.api import SchluterApi
+from custom_components.schluter.coordinator import UPDATE_INTERVAL
+from custom_components.schluter.fleet import SchluterFleet
+from custom_components.schluter.orchestrator import RefreshOrchestrator
+
+from .stub_api import StubSchluterApi
+
+
+async def test_aligned_refresh_updates_in_one_pass(hass, freezer, socket_enabled):
+    """Test the accounts are refreshed before the listeners of any of them run."""
+    stubs = [StubSchluterApi(2), StubSchluterApi(2)]
+    async with (
+        stubs[0].serve() as first_url,
+        stubs[1].serve() as second_url,
+        ClientSession() as session,
+    ):
+        fleets = []
+        for index, base_url in enumerate((first_url, second_url)):
+            account = SchluterAccount(hass, f"user{index}@example.com", "password")
+            account.api = SchluterApi(session, base_url=base_url)
+            fleet = SchluterFleet(hass, account)
+            await fleet.async_refresh()
+            fleets.append(fleet)
+
+        orchestrator = RefreshOrchestrator(hass)
+        for fleet in fleets:
+            orchestrator.async_add(fleet)
+        assert fleets[0].coordinators[0].update_interval is None
+
+        seen = []
+
+        def listener():
+            seen.append(
+                [fleet.coordinators[0].data["000000"].temperature for fleet in fleets]
+            )
+
+        for fleet in fleets:
+            fleet.coordinators[0].async_add_listener(listener)
+        for stub in stubs:
+            stub.thermostats[0]["Temperature"] += 100
+            stub.encode()
+
+        freezer.tick(UPDATE_INTERVAL)
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert seen == [[22.0, 22.0], [22.0, 22.0]]
+
+        for fleet in fleets:
+            orchestrator.async_remove(fleet)
+        assert fleets[0].coordinators[0].update_interval == UPDATE_INTERVAL
+        for fleet in fleets:
+            await fleet.async_shutdown()
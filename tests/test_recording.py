@@ -0,0 +1,98 @@
+"""Test the recording and replay of the API traffic."""
+from aiohttp import ClientSession
+import pytest
+
+from custom_components.schluter.api import SchluterApi
+from custom_components.schluter.recording import (
+    REDACTED,
+    ApiRecorder,
+    ReplayError,
+    ReplaySession,
+    load_exchanges,
+)
+
+from .stub_api import StubSchluterApi
+
+THERMOSTATS_PATH = "/api/thermostats"
+
+
+def _record(recorder, temperature, etag=None):
+    headers = {"Content-Type": "application/json", "Server": "stub"}
+    if etag:
+        headers["ETag"] = etag
+    recorder.record(
+        "GET",
+        THERMOSTATS_PATH,
+        {"params": {"sessionId": "secret"}},
+        0.0,
+        200,
+        headers,
+        b'{"Groups": [{"Thermostats": [{"Email": "user@example.com", '
+        b'"Temperature": %d}]}]}' % temperature,
+    )
+
+
+async def test_records_redacted_and_replays_in_order(tmp_path):
+    """Test a saved recording is redacted and replayed in the recorded order."""
+    recorder = ApiRecorder()
+    _record(recorder, 2100, etag='"1"')
+    _record(recorder, 2150)
+    recorder.save(tmp_path / "recording.jsonl.gz")
+
+    exchanges = load_exchanges(tmp_path / "recording.jsonl.gz")
+    assert exchanges[0].params == {"sessionId": REDACTED}
+    assert exchanges[0].headers == {"Content-Type": "application/json", "ETag": '"1"'}
+    assert "user@example.com" not in exchanges[0].body
+
+    replay = ReplaySession(exchanges)
+    temperatures = []
+    for _ in range(2):
+        async with replay.request(
+            "GET", f"https://example.com{THERMOSTATS_PATH}", params={}
+        ) as resp:
+            data = await resp.json()
+            temperatures.append(data["Groups"][0]["Thermostats"][0]["Temperature"])
+    assert temperatures == [2100, 2150]
+
+    with pytest.raises(ReplayError):
+        async with replay.request("GET", f"https://example.com{THERMOSTATS_PATH}"):
+            pass
+
+
+async def test_replay_loops():
+    """Test a looping replay starts over with the first response."""
+    recorder = ApiRecorder()
+    _record(recorder, 2100)
+    replay = ReplaySession(recorder.exchanges, loop=True)
+    for _ in range(3):
+        async with replay.request("GET", THERMOSTATS_PATH) as resp:
+            assert resp.status == 200
+    assert replay.requests == 3
+
+    with pytest.raises(ReplayError):
+        async with replay.request("GET", "/api/energyusage"):
+            pass
+
+
+async def test_api_round_trip(socket_enabled):
+    """Test a recorded session of the API client replays offline."""
+    stub = StubSchluterApi(3)
+    async with stub.serve() as base_url, ClientSession() as session:
+        api = SchluterApi(session, base_url=base_url)
+        api.start_recording()
+        sessionid = await api.async_ensure_sessionid("user@example.com", "password")
+        live = await api.async_get_current_thermostats(sessionid)
+        live_usages = await api.async_get_energy_usage(sessionid, "000001")
+    recorder = api.stop_recording()
+    assert "password" not in str(recorder.exchanges)
+
+    replayed_api = SchluterApi(ReplaySession(recorder.exchanges))
+    sessionid = await replayed_api.async_ensure_sessionid(
+        "user@example.com", "password"
+    )
+    replayed = await replayed_api.async_get_current_thermostats(sessionid)
+    usages = await replayed_api.async_get_energy_usage(sessionid, "000001")
+    assert replayed.keys() == live.keys()
+    assert [usage.total_kwh for usage in usages] == [
+        usage.total_kwh for usage in live_usages
+    ]
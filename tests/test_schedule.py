@@ -0,0 +1,65 @@
+"""Test the weekly schedule of the thermostats."""
+from datetime import time
+
+import pytest
+
+from custom_components.schluter.schedule import (
+    WEEKDAYS,
+    ScheduleEvent,
+    WeeklySchedule,
+)
+
+API_SCHEDULE = {
+    "Days": [
+        {
+            "WeekDayGrpNo": number,
+            "Events": [
+                {
+                    "ScheduleType": 0,
+                    "Clock": "06:00:00",
+                    "Temperature": 2333,
+                    "Active": True,
+                    "EventIsOnNextDay": False,
+                },
+                {
+                    "ScheduleType": 1,
+                    "Clock": "22:30:00",
+                    "Temperature": 1800,
+                    "Active": number < 6,
+                    "EventIsOnNextDay": False,
+                },
+            ],
+        }
+        for number in range(1, 8)
+    ]
+}
+
+
+def test_api_round_trip():
+    """Test a schedule of the API is sent back unchanged."""
+    schedule = WeeklySchedule.from_json(API_SCHEDULE)
+    assert schedule.days[0][0] == ScheduleEvent(time(6), 23.33, 0)
+    assert schedule.as_json() == API_SCHEDULE
+    assert schedule == WeeklySchedule.from_json(API_SCHEDULE)
+
+
+def test_services_round_trip():
+    """Test the events given to the services are numbered by time."""
+    schedule = WeeklySchedule.from_dict(
+        {
+            weekday: [
+                {"time": time(22, 30), "temperature": 18.0},
+                {"time": time(6), "temperature": 23.33},
+            ]
+            for weekday in WEEKDAYS[:5]
+        }
+    )
+    assert schedule.days[5] == schedule.days[6] == ()
+    assert schedule.days[0] == WeeklySchedule.from_json(API_SCHEDULE).days[0]
+    assert schedule.as_dict()["monday"] == [
+        {"time": "06:00", "temperature": 23.33},
+        {"time": "22:30", "temperature": 18.0},
+    ]
+
+    with pytest.raises(ValueError):
+        WeeklySchedule(((),))
@@ -0,0 +1,102 @@
+"""Test the priority scheduling of the API requests."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from custom_components.schluter.scheduler import (
+    RequestPriority,
+    RequestScheduler,
+    StaleRequestError,
+)
+
+
+async def _hold(scheduler, priority, started, release, name):
+    async with scheduler.slot(priority):
+        started.append(name)
+        await release.wait()
+
+
+async def test_commands_pass_waiting_backfill():
+    """Test a command gets the reserved slot and goes ahead of the backfill."""
+    scheduler = RequestScheduler(3)
+    started = []
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(
+            _hold(scheduler, RequestPriority.BACKFILL, started, release, index)
+        )
+        for index in range(4)
+    ]
+    await asyncio.sleep(0)
+    # Backfills leave one slot to commands
+    assert started == [0, 1]
+    assert scheduler.waiting == 2
+
+    poll = asyncio.create_task(
+        _hold(scheduler, RequestPriority.POLL, started, release, "poll")
+    )
+    command = asyncio.create_task(
+        _hold(scheduler, RequestPriority.COMMAND, started, release, "command")
+    )
+    await asyncio.sleep(0)
+    assert started == [0, 1, "command"]
+
+    release.set()
+    await asyncio.gather(*tasks, poll, command)
+    assert started.index("poll") < started.index(2)
+    assert scheduler.in_flight == 0
+    assert scheduler.waiting == 0
+
+
+async def test_stale_backfill_and_cancellation():
+    """Test waiting requests can time out or be cancelled without a leak."""
+    scheduler = RequestScheduler(1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(
+        _hold(scheduler, RequestPriority.POLL, [], release, "poll")
+    )
+    await asyncio.sleep(0)
+
+    with pytest.raises(StaleRequestError):
+        async with scheduler.slot(RequestPriority.BACKFILL, timedelta(seconds=0.01)):
+            pass
+    assert scheduler.stale_requests == 1
+
+    cancelled = asyncio.create_task(
+        _hold(scheduler, RequestPriority.POLL, [], release, "cancelled")
+    )
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    release.set()
+    await holder
+    async with scheduler.slot(RequestPriority.POLL):
+        assert scheduler.in_flight == 1
+    assert scheduler.in_flight == 0
+
+
+async def test_raise_max_concurrency():
+    """Test raising the max concurrency starts the waiting requests."""
+    scheduler = RequestScheduler(2)
+    started = []
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(
+            _hold(scheduler, RequestPriority.POLL, started, release, index)
+        )
+        for index in range(3)
+    ]
+    await asyncio.sleep(0)
+    assert started == [0]
+
+    scheduler.set_max_concurrency(4)
+    await asyncio.sleep(0)
+    assert started == [0, 1, 2]
+    assert scheduler.max_concurrency == 4
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert scheduler.in_flight == 0
@@ -0,0 +1,109 @@
+"""Test the services of the integration."""
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import ATTR_TEMPERATURE, CONF_PASSWORD, CONF_USERNAME
+
+from custom_components.schluter.api import ApiError, SchluterApi
+from custom_components.schluter.const import (
+    ATTR_COUNT,
+    ATTR_VACATION_BEGIN,
+    ATTR_VACATION_END,
+    CONF_SERIAL_NUMBER,
+    DOMAIN,
+)
+from custom_components.schluter.services import (
+    SERVICE_PROFILE_REFRESH,
+    SERVICE_SET_VACATION,
+)
+from custom_components.schluter.thermostat import Vacation
+
+from .stub_api import StubSchluterApi
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_profile_refresh(hass, socket_enabled):
+    """Test the profile refresh refreshes every thermostat and writes a profile."""
+    stub = StubSchluterApi(2)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "password"},
+    )
+    entry.add_to_hass(hass)
+    async with stub.serve() as base_url:
+        with patch(
+            "custom_components.schluter.account.SchluterApi",
+            partial(SchluterApi, base_url=base_url),
+        ):
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done(wait_background_tasks=True)
+
+        with patch(
+            "custom_components.schluter.coordinator."
+            "SchluterDataUpdateCoordinator.async_refresh"
+        ) as refresh:
+            await hass.services.async_call(
+                DOMAIN, SERVICE_PROFILE_REFRESH, {ATTR_COUNT: 3}, blocking=True
+            )
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert refresh.await_count == 3
+    assert len(list(Path(hass.config.path()).glob(f"{DOMAIN}_profile.*.cprof"))) == 1
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_set_vacation_in_thermostat_time(hass, socket_enabled):
+    """Test a vacation is sent in the time zone of the thermostat.
+
+    The results are returned even though the refresh after it fails.
+    """
+    stub = StubSchluterApi(2)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "password"},
+    )
+    entry.add_to_hass(hass)
+    async with stub.serve() as base_url:
+        with patch(
+            "custom_components.schluter.account.SchluterApi",
+            partial(SchluterApi, base_url=base_url),
+        ):
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done(wait_background_tasks=True)
+
+        with patch(
+            "custom_components.schluter.coordinator."
+            "SchluterDataUpdateCoordinator.async_set_vacation",
+            AsyncMock(),
+        ) as set_vacation, patch(
+            "custom_components.schluter.coordinator."
+            "SchluterDataUpdateCoordinator.async_refresh_scope",
+            AsyncMock(side_effect=ApiError("Refresh failed")),
+        ):
+            response = await hass.services.async_call(
+                DOMAIN,
+                SERVICE_SET_VACATION,
+                {
+                    CONF_SERIAL_NUMBER: "000001",
+                    # The stub thermostats are at +01:00
+                    ATTR_VACATION_BEGIN: "2026-01-10T12:00:00+00:00",
+                    ATTR_VACATION_END: "2026-01-17 18:00:00",
+                    ATTR_TEMPERATURE: 12,
+                },
+                blocking=True,
+                return_response=True,
+            )
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    set_vacation.assert_awaited_once_with(
+        "000001",
+        Vacation(datetime(2026, 1, 10, 13), datetime(2026, 1, 17, 18), 12),
+    )
+    assert response == {"thermostats": {"000001": {"success": True, "error": None}}}
@@ -0,0 +1,77 @@
+"""Test the change signals of the thermostat fields."""
+from aiohttp import ClientSession
+
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from custom_components.schluter.account import SchluterAccount
+from custom_components.schluter.api import SchluterApi
+from custom_components.schluter.const import (
+    FIELD_HEATING,
+    FIELD_POLL,
+    FIELD_TEMPERATURE,
+    SIGNAL_THERMOSTAT_UPDATE,
+)
+from custom_components.schluter.coordinator import UPDATE_INTERVAL
+from custom_components.schluter.fleet import SchluterFleet
+
+from .stub_api import StubSchluterApi
+
+
+async def test_signals_changed_fields_only(hass, freezer, socket_enabled):
+    """Test a refresh signals the changed fields of the changed thermostats."""
+    stub = StubSchluterApi(3)
+    received = []
+    for serial_number in ("000000", "000001"):
+        for field in (FIELD_TEMPERATURE, FIELD_HEATING):
+            async_dispatcher_connect(
+                hass,
+                SIGNAL_THERMOSTAT_UPDATE.format(serial_number, field),
+                lambda changed, key=(serial_number, field): received.append(
+                    (*key, changed)
+                ),
+            )
+
+    async with stub.serve() as base_url, ClientSession() as session:
+        account = SchluterAccount(hass, "user@example.com", "password")
+        account.api = SchluterApi(session, base_url=base_url)
+        fleet = SchluterFleet(hass, account)
+        await fleet.async_refresh()
+        # New thermostats signal every field
+        assert len(received) == 4
+        received.clear()
+
+        stub.thermostats[0]["Temperature"] += 50
+        stub.thermostats[0]["Heating"] = False
+        stub.encode()
+        freezer.tick(UPDATE_INTERVAL)
+        await fleet.async_refresh()
+        await fleet.async_shutdown()
+
+    changed = frozenset({FIELD_TEMPERATURE, FIELD_HEATING, FIELD_POLL})
+    assert sorted(received) == [
+        ("000000", FIELD_HEATING, changed),
+        ("000000", FIELD_TEMPERATURE, changed),
+    ]
+
+
+async def test_signals_every_poll(hass, freezer, socket_enabled):
+    """Test every poll is signalled, also when nothing changed."""
+    stub = StubSchluterApi(2)
+    received = []
+    async_dispatcher_connect(
+        hass,
+        SIGNAL_THERMOSTAT_UPDATE.format("000000", FIELD_POLL),
+        received.append,
+    )
+
+    async with stub.serve() as base_url, ClientSession() as session:
+        account = SchluterAccount(hass, "user@example.com", "password")
+        account.api = SchluterApi(session, base_url=base_url)
+        fleet = SchluterFleet(hass, account)
+        await fleet.async_refresh()
+        for _ in range(2):
+            freezer.tick(UPDATE_INTERVAL)
+            await fleet.async_refresh()
+        await fleet.async_shutdown()
+
+    assert received[1:] == [frozenset({FIELD_POLL})] * 2
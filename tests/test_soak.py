@@ -0,0 +1,191 @@
+"""Soak test of the sensor platform polling a local stub API for a simulated week."""
+from __future__ import annotations
+
+from datetime import timedelta
+from functools import partial
+import gc
+import os
+from pathlib import Path
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import NamedTuple
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.schluter.api import SchluterApi
+from custom_components.schluter.const import (
+    API_GET_THERMOSTATS_PATH,
+    CONF_ENERGY_INTERVAL,
+    CONF_OFFLINE_ESTIMATION,
+    CONF_UPDATE_INTERVAL,
+    DOMAIN,
+)
+
+from .stub_api import StubSchluterApi
+
+THERMOSTAT_COUNT = 20
+SIMULATED_DAYS = 7
+POLL_INTERVAL = timedelta(minutes=5)
+ENERGY_INTERVAL = timedelta(hours=1)
+POLLS_PER_DAY = timedelta(days=1) // POLL_INTERVAL
+# Polls of every day the last thermostat is offline, an hour in the evening
+OUTAGE_POLLS = range(POLLS_PER_DAY * 3 // 4, POLLS_PER_DAY * 3 // 4 + 12)
+# The first thermostat heats all week long with its measured load
+HEATING_WATTS = 600
+
+# Growth allowed between the end of the first day, once every cache and
+# history is filled, and the end of the last day. Documented in the README,
+# update it there as well.
+MEMORY_GROWTH_BUDGET = 256 * 1024
+BLOCK_GROWTH_BUDGET = 2000
+RSS_GROWTH_BUDGET = 32 * 1024 * 1024
+# The median refresh latency of the last days may be at most this factor of
+# the median of the first days
+LATENCY_DRIFT_BUDGET = 1.5
+LATENCY_WINDOW_DAYS = 2
+# Below this, latency differences are timer noise
+LATENCY_SLACK = 0.002
+
+INTEGRATION_DIR = Path(sys.modules[SchluterApi.__module__].__file__).parent
+
+
+class SoakDay(NamedTuple):
+    """Measurements at the end of a simulated day."""
+
+    median_latency: float
+    memory: int
+    blocks: int
+    energy: float
+    outage_energy: float
+    rss: int | None
+
+
+def _rss() -> int | None:
+    """Return the resident set size of the process, None if not known."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _integration_memory() -> tuple[int, int]:
+    """Return the size and number of live blocks allocated by the integration."""
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, f"{INTEGRATION_DIR}{os.sep}*")]
+    )
+    stats = snapshot.statistics("filename")
+    return sum(stat.size for stat in stats), sum(stat.count for stat in stats)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_week_of_polls_stays_flat(hass, freezer, socket_enabled):
+    """Test a week of polls of the sensor platform leaks no memory.
+
+    Every poll changes a thermostat, so the thermostats are parsed again,
+    the last one goes offline for an hour every day and is estimated, and
+    the days roll over at midnight. The energy sensors integrate the load of
+    every poll, and the refreshes do not get slower over the week.
+    """
+    stub = StubSchluterApi(THERMOSTAT_COUNT)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "password"},
+        options={
+            CONF_UPDATE_INTERVAL: int(POLL_INTERVAL.total_seconds()),
+            CONF_ENERGY_INTERVAL: int(ENERGY_INTERVAL.total_seconds()),
+            CONF_OFFLINE_ESTIMATION: True,
+        },
+    )
+    entry.add_to_hass(hass)
+    days: list[SoakDay] = []
+    tracemalloc.start()
+    try:
+        async with stub.serve() as base_url:
+            with patch(
+                "custom_components.schluter.account.SchluterApi",
+                partial(SchluterApi, base_url=base_url),
+            ):
+                assert await hass.config_entries.async_setup(entry.entry_id)
+                await hass.async_block_till_done(wait_background_tasks=True)
+
+            entity_registry = er.async_get(hass)
+            energy_id = entity_registry.async_get_entity_id(
+                Platform.SENSOR, DOMAIN, "Room 0-energy"
+            )
+            outage_energy_id = entity_registry.async_get_entity_id(
+                Platform.SENSOR, DOMAIN, f"Room {THERMOSTAT_COUNT - 1}-energy"
+            )
+            used_today_id = entity_registry.async_get_entity_id(
+                Platform.SENSOR, DOMAIN, "000000-Day"
+            )
+            start_energy = float(hass.states.get(energy_id).state)
+
+            for _ in range(SIMULATED_DAYS):
+                latencies: list[float] = []
+                for poll in range(POLLS_PER_DAY):
+                    stub.thermostats[poll % THERMOSTAT_COUNT]["Temperature"] = (
+                        2100 + poll % 10 * 10
+                    )
+                    stub.thermostats[-1]["Online"] = poll not in OUTAGE_POLLS
+                    stub.encode()
+                    freezer.tick(POLL_INTERVAL)
+                    start = time.perf_counter()
+                    async_fire_time_changed(hass)
+                    await hass.async_block_till_done(wait_background_tasks=True)
+                    latencies.append(time.perf_counter() - start)
+                gc.collect()
+                memory, blocks = _integration_memory()
+                days.append(
+                    SoakDay(
+                        statistics.median(latencies),
+                        memory,
+                        blocks,
+                        float(hass.states.get(energy_id).state),
+                        float(hass.states.get(outage_energy_id).state),
+                        _rss(),
+                    )
+                )
+
+            used_today = hass.states.get(used_today_id).state
+            assert await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+    finally:
+        tracemalloc.stop()
+
+    assert entry.state is ConfigEntryState.NOT_LOADED
+    polls = SIMULATED_DAYS * POLLS_PER_DAY
+    assert stub.requests[API_GET_THERMOSTATS_PATH] >= polls * 0.95
+    # Every poll was integrated, none was skipped as a gap
+    assert days[-1].energy - start_energy == pytest.approx(
+        HEATING_WATTS * SIMULATED_DAYS * 24 / 1000, abs=0.01
+    )
+    # The energy of the outages was estimated and corrected, never decreasing
+    assert days[0].outage_energy > 0
+    assert all(
+        day.outage_energy <= next_day.outage_energy
+        for day, next_day in zip(days, days[1:])
+    )
+    assert float(used_today) == pytest.approx(2.4)
+
+    first, last = days[0], days[-1]
+    assert last.memory - first.memory < MEMORY_GROWTH_BUDGET, days
+    assert last.blocks - first.blocks < BLOCK_GROWTH_BUDGET, days
+    if first.rss is not None and last.rss is not None:
+        assert last.rss - first.rss < RSS_GROWTH_BUDGET, days
+    early = statistics.median(day.median_latency for day in days[:LATENCY_WINDOW_DAYS])
+    late = statistics.median(day.median_latency for day in days[-LATENCY_WINDOW_DAYS:])
+    assert late < early * LATENCY_DRIFT_BUDGET + LATENCY_SLACK, days
@@ -0,0 +1,32 @@
+"""Test the parsing of the thermostat data."""
+from datetime import datetime, timedelta, timezone
+
+from custom_components.schluter.thermostat import Thermostat, Vacation
+
+from .stub_api import thermostat_data
+
+
+def test_vacation():
+    """Test the vacation is parsed in the local time of the thermostat."""
+    data = thermostat_data(1)
+    assert Thermostat(data).vacation is None
+
+    data.update(
+        VacationEnabled=True,
+        VacationBeginDay="2025-01-01T07:00:00",
+        VacationEndDay="2025-01-08T18:00:00",
+        VacationTemperature=1230,
+    )
+    assert Thermostat(data).vacation == Vacation(
+        datetime(2025, 1, 1, 7), datetime(2025, 1, 8, 18), 12.5
+    )
+
+
+def test_timezone():
+    """Test the time zone is taken from the offset of the thermostat."""
+    data = thermostat_data(1)
+    data.update(TZOffset="-05:30")
+    assert Thermostat(data).timezone == timezone(-timedelta(hours=5, minutes=30))
+
+    data.update(TZOffset="")
+    assert Thermostat(data).timezone is None
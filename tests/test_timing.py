@@ -0,0 +1,21 @@
+"""Test the timing of the refresh phases."""
+from datetime import datetime
+from unittest.mock import patch
+
+from custom_components.schluter.timing import RefreshTiming
+
+
+def test_phases_add_up():
+    """Test laps are added to their phase and to the total."""
+    clock = iter([10.0, 10.25, 11.0, 11.5])
+    with patch("time.perf_counter", lambda: next(clock)):
+        timing = RefreshTiming(datetime(2025, 1, 1, 12, 0))
+        timing.lap("auth")
+        timing.lap("fetch")
+        timing.lap("auth")
+    assert timing.as_dict() == {
+        "started": "2025-01-01T12:00:00",
+        "total_ms": 1500.0,
+        "auth_ms": 750.0,
+        "fetch_ms": 750.0,
+    }